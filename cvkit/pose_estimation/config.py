@@ -1,8 +1,12 @@
+import hashlib
 import os
 
+import cv2
 import numpy as np
 import yaml as yml
 
+from cvkit.utils import build_intrinsic
+
 DEFAULT_THRESHOLD = 0.6 #: Default likelihood threshold value
 
 
@@ -13,12 +17,16 @@ class CameraViews:
     :type data_dictionary: dict
     :param framerate: Project level Framerate. (Assumes equal framerate for all views)
     :type framerate: float
+    :param name: Name of the view, used for the undistortion grid cache file.
+    :type name: str
+    :param cache_folder: Folder of the undistortion grid cache file, usually the folder of the project config. Not cached if None.
+    :type cache_folder: str
     """
 
-    def __init__(self, data_dictionary, framerate):
+    def __init__(self, data_dictionary, framerate, name=None, cache_folder=None):
 
         self.axes = data_dictionary.get('axes', {}) #: Contains 2D x_max, y_max, and origin. This can be used to create a coordinate system for the reconstructed data.
-        self.dlt_coefficients = np.array(data_dictionary.get('dlt_coefficients', [])) #: DLT co-efficients generated by the EasyWand package.
+        self.dlt_coefficients = np.array(data_dictionary.get('dlt_coefficients', [])) #: DLT co-efficients generated by the EasyWand package or :py:func:`~cvkit.pose_estimation.reconstruction.EasyWand_tools.calibrate_dlt_coeffs`.
         self.framerate = framerate
         self.pos = np.array(data_dictionary.get('pos', [])) #: Extrinsic data: Position of the camera in world coordinates.
         self.resolution = np.array(data_dictionary.get('resolution', [-1,-1])) #: Intrinsic Data: Resolution of the captured video.
@@ -27,6 +35,104 @@ class CameraViews:
         if self.distortion.ndim ==1 :
             self.distortion = np.expand_dims(self.distortion,0)
         self.f_px = data_dictionary.get('f_px', -1) #: Focal length in pixels
+        self.frame_offset = float(data_dictionary.get('frame_offset', 0.0)) #: Frame i of the project corresponds to frame i * (1 + frame_drift) + frame_offset of this view.
+        self.frame_drift = float(data_dictionary.get('frame_drift', 0.0)) #: Relative framerate difference to the reference view, see :py:attr:`frame_offset`.
+        self.undistortion_grid = data_dictionary.get('undistortion_grid', False) #: Undistort points by bilinear lookup in a precomputed grid instead of the iterative solver.
+        self.name = name
+        self.cache_folder = cache_folder
+        self._grid = None
+
+    def __getstate__(self):
+        # The grid is reloaded from the cache file instead of being copied to worker processes.
+        state = self.__dict__.copy()
+        state['_grid'] = None
+        return state
+
+    def get_intrinsic(self):
+        """
+        :return: 3x3 camera matrix built from the focal length and the principal point.
+        :rtype: numpy.ndarray
+        """
+        return build_intrinsic(self.f_px, self.principal_point)
+
+    def _get_grid_path(self):
+        if self.cache_folder is None:
+            return None
+        return os.path.join(self.cache_folder, f'.{self.name}_undistortion_grid.npz')
+
+    def _get_grid_key(self):
+        content = np.concatenate([np.ravel(self.f_px), self.principal_point.ravel(), self.distortion.ravel(),
+                                  self.resolution.ravel()]).astype(np.float64)
+        return hashlib.sha256(content.tobytes()).hexdigest()
+
+    def get_undistortion_grid(self):
+        """Undistorted positions of all integer pixel coordinates in [0, width] x [0, height]. Computed once with
+        :py:func:`cv2.undistortPoints` and cached in the cache folder. The cache is rebuilt if the camera parameters change.
+
+        :return: (height+1)x(width+1)x2 array
+        :rtype: numpy.ndarray
+        """
+        if self._grid is not None:
+            return self._grid
+        key = self._get_grid_key()
+        path = self._get_grid_path()
+        if path is not None and os.path.exists(path):
+            try:
+                with np.load(path, allow_pickle=False) as archive:
+                    if str(archive['key']) == key:
+                        self._grid = archive['grid']
+                        return self._grid
+            except (OSError, ValueError, KeyError):
+                pass
+        width, height = int(self.resolution[0]), int(self.resolution[1])
+        x, y = np.meshgrid(np.arange(width + 1, dtype=np.float64), np.arange(height + 1, dtype=np.float64))
+        points = np.stack([x, y], axis=-1).reshape(-1, 1, 2)
+        matrix = self.get_intrinsic()
+        self._grid = cv2.undistortPoints(points, matrix, self.distortion, None, matrix).reshape(height + 1, width + 1,
+                                                                                                2).astype(np.float32)
+        if path is not None:
+            try:
+                temp_path = f'{path}.{os.getpid()}.tmp.npz'
+                np.savez(temp_path, key=key, grid=self._grid)
+                os.replace(temp_path, path)
+            except OSError:
+                pass
+        return self._grid
+
+    def undistort_points(self, points):
+        """Removes lens distortion from 2D points. If :py:attr:`undistortion_grid` is enabled and the resolution is known,
+        points inside the frame are interpolated bilinearly from :py:meth:`get_undistortion_grid`, the remaining points
+        use the iterative solver of :py:func:`cv2.undistortPoints`.
+
+        :param points: nx2 array of distorted points
+        :type points: numpy.ndarray
+        :return: nx2 array of undistorted points
+        :rtype: numpy.ndarray
+        """
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        output = np.empty_like(points)
+        inside = np.zeros(len(points), dtype=bool)
+        if self.undistortion_grid and np.all(self.resolution > 0):
+            grid = self.get_undistortion_grid()
+            width, height = grid.shape[1] - 1, grid.shape[0] - 1
+            inside = (points[:, 0] >= 0) & (points[:, 0] <= width) & (points[:, 1] >= 0) & (points[:, 1] <= height)
+            x, y = points[inside, 0], points[inside, 1]
+            x0 = np.minimum(x.astype(np.int64), width - 1)
+            y0 = np.minimum(y.astype(np.int64), height - 1)
+            fx, fy = x - x0, y - y0
+            # Flat indices with take are considerably faster than 2D fancy indexing for millions of points.
+            index = y0 * (width + 1) + x0
+            for axis in range(2):
+                plane = grid[..., axis].ravel()
+                top = plane.take(index) * (1 - fx) + plane.take(index + 1) * fx
+                bottom = plane.take(index + width + 1) * (1 - fx) + plane.take(index + width + 2) * fx
+                output[inside, axis] = top * (1 - fy) + bottom * fy
+        if not np.all(inside):
+            matrix = self.get_intrinsic()
+            output[~inside] = cv2.undistortPoints(points[~inside].reshape(-1, 1, 2), matrix, self.distortion, None,
+                                                  matrix).reshape(-1, 2)
+        return output
+
     def is_dlt_valid(self):
         return self.dlt_coefficients.shape == (12,)
     
@@ -38,7 +144,10 @@ class CameraViews:
             'resolution': self.resolution.tolist(),
             'f_px': self.f_px,
             'principal_point': self.principal_point.tolist(),
-            'distortion': self.distortion.tolist()
+            'distortion': self.distortion.tolist(),
+            'undistortion_grid': self.undistortion_grid,
+            'frame_offset': self.frame_offset,
+            'frame_drift': self.frame_drift
         }
 
 
@@ -114,12 +223,17 @@ class PoseEstimationConfig:
             # Unscaled length of the y-axis
             y_len: <length>
 
-            # Reconstruction algorithm, accepts 'default' or 'auto_subset'              #
+            # Reconstruction algorithm, accepts 'default', 'auto_subset',              #
+            # 'robust_subset' or 'weighted_subset'                                      #
             # default: Reconstructs if likelihood is higher than the threshold for all  #
             # views.                                                                    #
             # auto_subset: Automatically creates a subset of 'accurate' viewpoints      #
             # based on the threshold value. The reconstruction is performed if the      #
             # number of viewpoints is more than 2.                                      #
+            # robust_subset: Same as auto_subset, but views whose reprojection error    #
+            # disagrees with the best pair of views are excluded.                       #
+            # weighted_subset: Same views as auto_subset, the contribution of each view #
+            # to the least squares solution is weighted by its likelihood.              #
             reconstruction_algorithm: default # Optional
 
             # Rotation Matrix to align 3D reconstructed data. It will be multiplied     #
@@ -175,6 +289,13 @@ class PoseEstimationConfig:
                 pos: [ ] # Position of the camera in world coordinates.
                 principal_point: [ ] # Principal point of the camera.
                 resolution: [ ] # Resolution of the captured frames.
+                # Undistort points by lookup in a precomputed grid. The grid is cached  #
+                # next to this file. Optional.                                          #
+                undistortion_grid: false
+                # Synchronization relative to the reference view, frame i of the project  #
+                # is frame i * (1 + frame_drift) + frame_offset of this view. Optional.   #
+                frame_offset: 0
+                frame_drift: 0
                 
             # Repeat for each camera.
 
@@ -213,7 +334,8 @@ class PoseEstimationConfig:
         self.views = {} #: A dictionary mapping view names to camera information - :py:class:`~cvkit.pose_estimation.config.CameraViews`.
         if 'views' in self.data_dictionary:
             for view in self.data_dictionary['views']:
-                self.views[view] = CameraViews(self.data_dictionary['views'][view], self.framerate)
+                self.views[view] = CameraViews(self.data_dictionary['views'][view], self.framerate, view,
+                                               os.path.dirname(os.path.abspath(path)))
         self.rotation_matrix = np.array(self.data_dictionary['Reconstruction'].get('rotation_matrix', np.identity(3)),
                                         dtype=np.float32) #: 3x3 Rotation matrix for aligning reconstructed data.
         assert self.rotation_matrix.shape == (3, 3)
@@ -223,7 +345,7 @@ class PoseEstimationConfig:
         self.computed_scale = self.data_dictionary['Reconstruction'].get('computed_scale', self.scale) #: Computed scale factor based on pre-known distances to reduce reconstruction noise
         self.translation_vector = np.array(self.data_dictionary['Reconstruction'].get('translation_vector', [0, 0, 0]),
                                            dtype=np.float32) #: Fixed 3-D translational vector for reconstructed data.
-        self.reconstruction_algorithm = self.data_dictionary['Reconstruction'].get('reconstruction_algorithm', 'default') #: Reconstruction algorithm. Auto-Subset: Picks at least 2 views based on likelihood values. Regular: Only reconstructs if all views have likelihood higher than the threshold.
+        self.reconstruction_algorithm = self.data_dictionary['Reconstruction'].get('reconstruction_algorithm', 'default') #: Reconstruction algorithm. Auto-Subset: Picks at least 2 views based on likelihood values. Robust-Subset: Auto-Subset excluding views inconsistent with the best pair of views. Weighted-Subset: Auto-Subset with views weighted by likelihood. Regular: Only reconstructs if all views have likelihood higher than the threshold.
 
     def export_dict(self):
         return {'name': self.project_name,
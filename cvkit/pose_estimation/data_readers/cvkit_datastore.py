@@ -29,9 +29,11 @@ class CVKitDataStore3D(DataStoreInterface):
 
     def delete_part(self, index, name, force_remove=False):
         if force_remove or index in self.data.index:
+            self.mark_dirty(index)
             self.data.loc[index, name] = pd.NA
 
     def set_behaviour(self, index, behaviour: list) -> None:
+        self.mark_dirty(index)
         self.data.loc[index, 'behaviour'] = self.BEHAVIOUR_SEP.join(behaviour)
 
     def get_behaviour(self, index) -> list:
@@ -45,8 +47,10 @@ class CVKitDataStore3D(DataStoreInterface):
             lambda x: self.build_part(x, name)).to_numpy()
 
     def set_part_slice(self, slice_indices: list, name: str, data: np.ndarray) -> None:
+        self.mark_dirty(slice_indices[0], slice_indices[1])
         place_holder = np.empty((data.shape[0],), dtype=object)
-        place_holder[:] = data.tolist()
+        # Cells are stored as strings, same as set_part. Lists cannot be hashed by compute_data_hash.
+        place_holder[:] = [str(row) for row in np.asarray(data).tolist()]
         self.data.loc[slice_indices[0]:slice_indices[1] - 1, name] = place_holder
 
     def get_part(self, index, name) -> Part:
@@ -57,11 +61,31 @@ class CVKitDataStore3D(DataStoreInterface):
             return Part([self.MAGIC_NUMBER] * self.DIMENSIONS, name, 0.0)
 
     def set_part(self, index, part: Part) -> None:
+        self.mark_dirty(index)
         name = part.name
         self.data.loc[index, name] = str(part.tolist())
         if not self.data.index.is_monotonic_increasing:
             self.data.sort_index(inplace=True)
 
+    def get_part_array(self, name: str):
+        positions = np.array([convert_to_numpy(cell, self.DIMENSIONS) for cell in self.data[name]],
+                             dtype=float).reshape(-1, self.DIMENSIONS)
+        likelihoods = (~np.all(positions == self.MAGIC_NUMBER, axis=1)).astype(float)
+        return self.data.index.to_numpy(), positions, likelihoods
+
+    def set_part_array(self, name: str, positions: np.ndarray, likelihoods: np.ndarray, index=None) -> None:
+        if index is None:
+            index = self.data.index
+        else:
+            index = pd.Index(index)
+            if not index.isin(self.data.index).all():
+                self.data = self.data.reindex(self.data.index.union(index))
+        self.mark_dirty(index)
+        place_holder = np.empty((len(positions),), dtype=object)
+        place_holder[:] = [str(position.tolist()) if likelihood > 0 else pd.NA for position, likelihood in
+                           zip(np.asarray(positions), likelihoods)]
+        self.data.loc[index, name] = place_holder
+
     def build_skeleton(self, row) -> Skeleton:
         part_map = {}
         likelihood_map = {}
@@ -94,4 +118,5 @@ class CVKitDataStore3D(DataStoreInterface):
 
     @staticmethod
     def convert_to_list(index, skeleton, threshold=0.8):
-        return [skeleton[part].tolist() if skeleton[part] > threshold else None for part in skeleton.body_parts]
+        # Cells are stored as strings, identical to the data read from files, to keep the dataframe hashable.
+        return [str(skeleton[part].tolist()) if skeleton[part] > threshold else None for part in skeleton.body_parts]
@@ -1,3 +1,4 @@
+import copy
 import os.path
 import pickle
 from abc import ABC, abstractmethod
@@ -7,6 +8,8 @@ import pandas as pd
 
 from cvkit import MAGIC_NUMBER
 from cvkit.pose_estimation import Skeleton, Part
+from cvkit.pose_estimation.instrumentation import instrument_access
+from cvkit.utils import IntervalSet
 
 
 class DataStoreInterface(ABC):
@@ -29,19 +32,88 @@ class DataStoreInterface(ABC):
     BEHAVIOUR_SEP = '~'
     #: Magic number to represent invalid data
     MAGIC_NUMBER = MAGIC_NUMBER
+    #: :py:class:`~cvkit.pose_estimation.instrumentation.Instrumentation` counting reads and writes. Disabled if None.
+    INSTRUMENTATION = None
+    #: Methods counted as reads by the instrumentation
+    READ_METHODS = ['get_skeleton', 'get_numpy', 'get_behaviour', 'get_part_slice', 'get_part_array', 'get_part',
+                    'row_iterator', 'part_iterator']
+    #: Methods counted as writes by the instrumentation
+    WRITE_METHODS = ['set_skeleton', 'delete_skeleton', 'set_behaviour', 'set_part_slice', 'set_part_array', 'set_part',
+                     'delete_part', 'set_frame_range']
+    #: Number of consecutive frame indices sharing one cached hash in :py:meth:`compute_data_hash`
+    HASH_CHUNK_SIZE = 4096
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._instrument_methods()
+
+    @classmethod
+    def _instrument_methods(cls):
+        for kind, methods in [('reads', cls.READ_METHODS), ('writes', cls.WRITE_METHODS)]:
+            for name in methods:
+                method = cls.__dict__.get(name, None)
+                if callable(method) and not getattr(method, '__instrumented__', False):
+                    setattr(cls, name, instrument_access(method, kind))
 
     def __init__(self, body_parts, path, dimension=3):
 
         self.body_parts = body_parts
+        #: Mutation counter, incremented by every setter and every assignment of :py:attr:`data`.
+        self.version = 0
+        self._verified_version = None
         self.data = None
         self.path = path
         self.base_file_path = os.path.splitext(self.path)[0] if self.path is not None else None
         self.DIMENSIONS = dimension
-        try:
-            self.stats: DataStoreStats = pickle.load(open(f'{self.base_file_path}_stats.bin', 'rb'))
-        except:
-            self.stats = DataStoreStats(body_parts)
-
+        #: Frame indices modified through the setters. Consumers (e.g. incremental pipelines) clear it after processing the changes.
+        self.dirty = IntervalSet()
+        self._stats = None
+
+    @property
+    def stats(self):
+        """Datastore statistics (:py:class:`DataStoreStats`). Loaded from the stats file of the data file on first access,
+        "<file>_stats.npz" is preferred over the legacy pickled "<file>_stats.bin"."""
+        if self._stats is None:
+            self._stats = self.load_stats()
+        return self._stats
+
+    @stats.setter
+    def stats(self, stats):
+        # Replaced statistics have not been verified against the data.
+        self._stats = stats
+        self._verified_version = None
+
+    def load_stats(self):
+        """
+        Reads the persisted statistics of the data file.
+
+        :return: Persisted statistics or empty statistics if no valid file exists.
+        :rtype: :py:class:`DataStoreStats`
+        """
+        if self.base_file_path is not None:
+            try:
+                return DataStoreStats.load(f'{self.base_file_path}_stats.npz')
+            except Exception:
+                pass
+            try:
+                return pickle.load(open(f'{self.base_file_path}_stats.bin', 'rb'))
+            except Exception:
+                pass
+        return DataStoreStats(self.body_parts)
+
+    @property
+    def data(self):
+        """Underlying dataframe. Assigning a new dataframe invalidates all cached hashes. Code modifying the dataframe
+        in-place without the setters has to call :py:meth:`mark_dirty`."""
+        return self._data
+
+    @data.setter
+    def data(self, data):
+        self._data = data
+        self.version += 1
+        self._chunk_hashes = {}
+        self._modified = IntervalSet()
+        self._hash = None
 
     def get_skeleton(self, index) -> Skeleton:
         """
@@ -139,6 +211,105 @@ class DataStoreInterface(ABC):
         """
         pass
 
+    def get_part_array(self, name: str):
+        """
+        Get all data of given part as Numpy arrays. Implementations should override this method with a vectorized version.
+
+        :param name: Name of the body part
+        :return: Tuple of frame indices (n,), positions (nxd) and likelihood values (n,)
+        """
+        index, positions, likelihoods = [], [], []
+        for i, part in self.part_iterator(name):
+            index.append(i)
+            positions.append(np.array(part, dtype=float))
+            likelihoods.append(part.likelihood)
+        return np.array(index), np.array(positions, dtype=float).reshape(-1, self.DIMENSIONS), np.array(likelihoods,
+                                                                                                        dtype=float)
+
+    def set_part_array(self, name: str, positions: np.ndarray, likelihoods: np.ndarray, index=None) -> None:
+        """
+        Set all data of given part from Numpy arrays. Parts with likelihood less than or equal to 0 are treated as deleted.
+        Implementations should override this method with a vectorized version.
+
+        :param name: Name of the body part
+        :param positions: nxd dimensional numpy array where n is the number of frames and d is the dimension of the data.
+        :param likelihoods: Numpy array of n likelihood values.
+        :param index: Frame indices of the data. If None, the data should be aligned with the existing indices.
+        """
+        if index is None:
+            index = self.data.index
+        self.mark_dirty(index)
+        for i, position, likelihood in zip(index, positions, likelihoods):
+            if likelihood > 0:
+                self.set_part(i, Part(position, name, likelihood))
+            else:
+                self.delete_part(i, name, True)
+
+    def get_frame_range(self, begin, end):
+        """
+        Creates a detached datastore of the same flavor containing a copy of the frames in [begin, end).
+        The returned datastore has empty statistics that are not persisted and can be processed independently, e.g. in a worker process.
+
+        :param begin: First frame index
+        :param end: Last frame index (non-inclusive)
+        :return: Datastore containing the selected frames
+        :rtype: :py:class:`DataStoreInterface`
+        """
+        data_store = copy.copy(self)
+        # Frames outside of the datastore are ignored, i.e. the range is clamped to its index.
+        index = self.data.index
+        data_store.data = self.data[(index >= begin) & (index < end)].copy()
+        data_store.dirty = IntervalSet()
+        data_store.base_file_path = None
+        data_store.stats = DataStoreStats(self.body_parts)
+        return data_store
+
+    def set_frame_range(self, data_store):
+        """
+        Replaces the frames covered by a datastore created with :py:meth:`get_frame_range`.
+
+        :param data_store: Datastore of the same flavor
+        :type data_store: :py:class:`DataStoreInterface`
+        """
+        index = data_store.data.index
+        if len(index) == 0:
+            return
+        outside = (self.data.index < index.min()) | (self.data.index > index.max())
+        self.data = pd.concat([self.data.loc[outside], data_store.data]).sort_index()
+        self.mark_dirty(index.min(), index.max() + 1)
+
+    def mark_dirty(self, begin, end=None):
+        """
+        Records modified frames in :py:attr:`dirty` and increments :py:attr:`version`. Called by the setters of the
+        implementations.
+
+        :param begin: First modified frame index or an iterable of frame indices
+        :param end: Last modified frame index (non-inclusive). If None, only the first frame is marked.
+        """
+        self.version += 1
+        if np.ndim(begin) > 0 or isinstance(begin, pd.Index):
+            modified = IntervalSet.from_indices(begin)
+            self.dirty.update(modified)
+            self._modified.update(modified)
+        else:
+            self.dirty.add(begin, end)
+            self._modified.add(begin, end)
+
+    def get_changed_frames(self, data_store):
+        """
+        Compares the data with another datastore of the same flavor.
+
+        :param data_store: Datastore to compare with
+        :type data_store: :py:class:`DataStoreInterface`
+        :return: Frame indices whose data differ or exist only in one of the datastores
+        :rtype: :py:class:`~cvkit.utils.IntervalSet`
+        """
+        if list(self.data.columns) != list(data_store.data.columns):
+            return IntervalSet.from_indices(self.data.index.union(data_store.data.index))
+        own, other = pd.util.hash_pandas_object(self.data, index=False).align(
+            pd.util.hash_pandas_object(data_store.data, index=False))
+        return IntervalSet.from_indices(own.index[(own != other).to_numpy()])
+
     def row_iterator(self):
         """
         Generates and iterator which yields index and corresponding :py:class:`Skeleton` sequentially.
@@ -239,10 +410,12 @@ class DataStoreInterface(ABC):
 
         :param stats: :py:class:`DataStoreStats` object
         """
-        if stats.register(self.compute_data_hash()):
-            del self.stats
+        # The content hash is only required to validate persisted statistics, in-memory statistics are validated by the version.
+        if stats.register(self.compute_data_hash() if self.base_file_path is not None else None):
             self.stats = stats
-            pickle.dump(self.stats, open(f'{self.base_file_path}_stats.bin', 'wb'))
+            self._verified_version = self.version
+            if self.base_file_path is not None:
+                self.stats.save(f'{self.base_file_path}_stats.npz')
 
     def build_empty_skeleton(self):
         """
@@ -264,21 +437,48 @@ class DataStoreInterface(ABC):
     def compute_data_hash(self):
         """
         Computes a hash value of the dataframe. Used to detect changes.
+        The value is the sum of the row hashes, hence it is computed per chunk of :py:attr:`HASH_CHUNK_SIZE` frame indices
+        and only the chunks modified since the previous call are hashed again.
 
         :return: hash value
         """
-        return int(pd.util.hash_pandas_object(self.data).sum())
+        if self._hash is not None and self._hash[0] == self.version:
+            return self._hash[1]
+        index = self.data.index
+        # Frame indices may be stored with object dtype, e.g. after reindexing an empty dataframe.
+        if not (index.inferred_type == 'integer' and index.is_monotonic_increasing):
+            data_hash = int(pd.util.hash_pandas_object(self.data).sum())
+        else:
+            keys = index.to_numpy(dtype=np.int64) // self.HASH_CHUNK_SIZE
+            boundaries = np.flatnonzero(np.diff(keys)) + 1
+            chunk_hashes = {}
+            for begin, end in zip(np.concatenate([[0], boundaries]), np.concatenate([boundaries, [len(keys)]])):
+                key = int(keys[begin])
+                chunk_hash = self._chunk_hashes.get(key, None)
+                if chunk_hash is None or self._modified.intersects(key * self.HASH_CHUNK_SIZE,
+                                                                   (key + 1) * self.HASH_CHUNK_SIZE):
+                    chunk_hash = int(pd.util.hash_pandas_object(self.data.iloc[begin:end]).sum())
+                chunk_hashes[key] = chunk_hash
+            self._chunk_hashes = chunk_hashes
+            self._modified = IntervalSet()
+            # Same wrap around as the 64 bit sum over all rows
+            data_hash = (sum(chunk_hashes.values()) + 2 ** 63) % 2 ** 64 - 2 ** 63
+        self._hash = (self.version, data_hash)
+        return data_hash
 
     def verify_stats(self):
         """
-        Verify whether current datastore statistics are valid.
+        Verify whether current datastore statistics are valid. Free if the datastore was not modified since the last verification.
 
         :return: datastore statistics validity
         :rtype: boolean
         """
+        if self._verified_version == self.version:
+            return True
         if not (self.compute_data_hash() == self.stats.data_frame_hash) and (self.stats.body_parts == self.body_parts):
             self.stats.registered = False
             return False
+        self._verified_version = self.version
         return True
 
     @staticmethod
@@ -308,7 +508,12 @@ class DataStoreInterface(ABC):
         self.data.sort_index(inplace=True)
 
 
+DataStoreInterface._instrument_methods()
+
+
 class DataStoreStats:
+    #: Layout version of the files written by :py:meth:`save`
+    FILE_VERSION = 1
 
     def __init__(self, body_parts):
         """
@@ -328,6 +533,57 @@ class DataStoreStats:
         self._accurate_cluster = {'begin': -2, 'end': -2}
         self.registered = False
 
+    @staticmethod
+    def _clusters_to_array(clusters):
+        return np.array([[cluster['begin'], cluster['end']] for cluster in clusters], dtype=np.int64).reshape(-1, 2)
+
+    @staticmethod
+    def _array_to_clusters(array):
+        return [{'begin': int(begin), 'end': int(end)} for begin, end in array]
+
+    def save(self, path):
+        """
+        Writes registered statistics to a numpy archive. Clusters are stored as (n,2) arrays of begin and end indices.
+
+        :param path: Output path, should end with ".npz".
+        :type path: str
+        """
+        if not self.registered:
+            raise ValueError("Only registered statistics can be saved")
+        arrays = {'file_version': np.array(self.FILE_VERSION),
+                  'body_parts': np.array(self.body_parts, dtype=str),
+                  'data_frame_hash': np.array(self.data_frame_hash or 0, dtype=np.int64),
+                  'has_hash': np.array(self.data_frame_hash is not None),
+                  'accurate_data_points': self._clusters_to_array(self.accurate_data_points),
+                  'occupancy_data': np.array(self.occupancy_data, dtype=float)}
+        for position, part in enumerate(self.body_parts):
+            arrays[f'na_data_points_{position}'] = self._clusters_to_array(self.na_data_points[part])
+        with open(path, 'wb') as output:
+            np.savez(output, **arrays)
+
+    @staticmethod
+    def load(path):
+        """
+        Reads statistics written by :py:meth:`save`. The archive is read without unpickling objects.
+
+        :param path: Path of the archive
+        :type path: str
+        :rtype: :py:class:`DataStoreStats`
+        """
+        with np.load(path, allow_pickle=False) as archive:
+            if int(archive['file_version']) > DataStoreStats.FILE_VERSION:
+                raise ValueError(f"Unsupported statistics file version {int(archive['file_version'])}")
+            stats = DataStoreStats(archive['body_parts'].tolist())
+            for position, part in enumerate(stats.body_parts):
+                stats.na_data_points[part] = stats._array_to_clusters(archive[f'na_data_points_{position}'])
+            stats.accurate_data_points = stats._array_to_clusters(archive['accurate_data_points'])
+            stats.occupancy_data = archive['occupancy_data'].tolist()
+            stats.data_frame_hash = int(archive['data_frame_hash']) if bool(archive['has_hash']) else None
+        # Same state as after register
+        del stats._na_current_cluster, stats._accurate_cluster
+        stats.registered = True
+        return stats
+
     def add_occupancy_data(self, fraction):
         self.occupancy_data.append(fraction)
 
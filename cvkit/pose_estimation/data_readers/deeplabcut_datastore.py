@@ -65,9 +65,11 @@ class DeeplabcutDataStore(DataStoreInterface):
 
     def delete_part(self, index, name, force_remove=False):
         if force_remove or index in self.data.index:
+            self.mark_dirty(index)
             self.data.loc[index, (self.scorer, name, 'likelihood')] = 0.0
 
     def set_behaviour(self, index, behaviour) -> None:
+        self.mark_dirty(index)
         self.data.loc[index, (self.scorer, 'behaviour', 'name')] = self.BEHAVIOUR_SEP.join(behaviour)
 
     def get_behaviour(self, index) -> list:
@@ -85,6 +87,7 @@ class DeeplabcutDataStore(DataStoreInterface):
             return Part([self.MAGIC_NUMBER] * self.DIMENSIONS, name, 0.0)
 
     def set_part(self, index, part: Part) -> None:
+        self.mark_dirty(index)
         name = part.name
         self.data.loc[index, (self.scorer, name, 'x')] = part[0]
         self.data.loc[index, (self.scorer, name, 'y')] = part[1]
@@ -104,11 +107,29 @@ class DeeplabcutDataStore(DataStoreInterface):
             lambda x: self.build_part(x, name), axis=1).to_numpy()
 
     def set_part_slice(self, slice_indices: list, name: str, data: np.ndarray) -> None:
+        self.mark_dirty(slice_indices[0], slice_indices[1])
         self.data.loc[slice_indices[0]:slice_indices[1] - 1, (self.scorer, name, 'x')] = data[:, 0]
         self.data.loc[slice_indices[0]:slice_indices[1] - 1, (self.scorer, name, 'y')] = data[:, 1]
         self.data.loc[slice_indices[0]:slice_indices[1] - 1, (self.scorer, name, 'likelihood')] = [d.likelihood for d in
                                                                                                    data]
 
+    def get_part_array(self, name: str):
+        positions = self.data.loc[:, [(self.scorer, name, 'x'), (self.scorer, name, 'y')]].to_numpy(dtype=float)
+        likelihoods = self.data.loc[:, (self.scorer, name, 'likelihood')].to_numpy(dtype=float)
+        return self.data.index.to_numpy(), positions, likelihoods
+
+    def set_part_array(self, name: str, positions: np.ndarray, likelihoods: np.ndarray, index=None) -> None:
+        if index is None:
+            index = self.data.index
+        else:
+            index = pd.Index(index)
+            if not index.isin(self.data.index).all():
+                self.data = self.data.reindex(self.data.index.union(index))
+        self.mark_dirty(index)
+        self.data.loc[index, (self.scorer, name, 'x')] = positions[:, 0]
+        self.data.loc[index, (self.scorer, name, 'y')] = positions[:, 1]
+        self.data.loc[index, (self.scorer, name, 'likelihood')] = np.maximum(likelihoods, 0.0)
+
     def build_skeleton(self, row) -> Skeleton:
         part_map = {}
         likelihood_map = {}
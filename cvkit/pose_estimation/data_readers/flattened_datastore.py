@@ -48,9 +48,11 @@ class FlattenedDataStore(DataStoreInterface):
 
     def delete_part(self, index, name, force_remove=False):
         if force_remove or index in self.data.index:
+            self.mark_dirty(index)
             self.data.loc[index, [f"{name}_{i}" for i in range(1, self.DIMENSIONS + 1)]] = pd.NA
 
     def set_behaviour(self, index, behaviour: list) -> None:
+        self.mark_dirty(index)
         self.data.loc[index, 'behaviour'] = self.BEHAVIOUR_SEP.join(behaviour)
 
     def get_behaviour(self, index) -> list:
@@ -65,6 +67,7 @@ class FlattenedDataStore(DataStoreInterface):
             lambda x: self.build_part(x, name), axis=1).to_numpy()
 
     def set_part_slice(self, slice_indices: list, name: str, data: np.ndarray) -> None:
+        self.mark_dirty(slice_indices[0], slice_indices[1])
         for i in range(1, self.DIMENSIONS + 1):
             self.data.loc[slice_indices[0]:slice_indices[1] - 1, f"{name}_{i}"] = [d[i - 1] for d in data]
 
@@ -78,12 +81,36 @@ class FlattenedDataStore(DataStoreInterface):
             return Part([self.MAGIC_NUMBER] * self.DIMENSIONS, name, 0.0)
 
     def set_part(self, index, part: Part) -> None:
+        self.mark_dirty(index)
         name = part.name
         for i in range(1, part.shape[0] + 1):
             self.data.loc[index, f"{name}_{i}"] = part[i - 1] if part[i - 1] != self.MAGIC_NUMBER else pd.NA
         if not self.data.index.is_monotonic_increasing:
             self.data.sort_index(inplace=True)
 
+    def get_part_array(self, name: str):
+        columns = [f"{name}_{i}" for i in range(1, self.DIMENSIONS + 1)]
+        positions = self.data.loc[:, columns].apply(pd.to_numeric, errors='coerce').to_numpy(dtype=float)
+        positions[np.isnan(positions).any(axis=1)] = self.MAGIC_NUMBER
+        likelihoods = (~np.all(positions == self.MAGIC_NUMBER, axis=1)).astype(float)
+        return self.data.index.to_numpy(), positions, likelihoods
+
+    def set_part_array(self, name: str, positions: np.ndarray, likelihoods: np.ndarray, index=None) -> None:
+        if index is None:
+            index = self.data.index
+        else:
+            index = pd.Index(index)
+            if not index.isin(self.data.index).all():
+                self.data = self.data.reindex(self.data.index.union(index))
+        self.mark_dirty(index)
+        positions = np.array(positions, dtype=float)
+        positions[positions == self.MAGIC_NUMBER] = np.nan
+        positions[np.asarray(likelihoods) <= 0] = np.nan
+        for i in range(1, self.DIMENSIONS + 1):
+            self.data.loc[index, f"{name}_{i}"] = positions[:, i - 1]
+            if self.data[f"{name}_{i}"].dtype == object:
+                self.data[f"{name}_{i}"] = pd.to_numeric(self.data[f"{name}_{i}"], errors='coerce')
+
     def build_skeleton(self, row) -> Skeleton:
         part_map = {}
         likelihood_map = {}
@@ -0,0 +1,256 @@
+import functools
+import inspect
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:
+    # Peak memory is not reported on this platform
+    resource = None
+
+
+def get_peak_rss():
+    """Peak resident set size of the current process in bytes, None if it is not supported by the platform.
+
+    :rtype: int
+    """
+    if resource is None:
+        return None
+    # ru_maxrss is reported in kilobytes on Linux and in bytes on macOS
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * (1 if sys.platform == 'darwin' else 1024)
+
+
+class Instrumentation:
+    """Records wall time, throughput, peak memory and datastore accesses of processors.
+    Every call of :py:meth:`~cvkit.pose_estimation.processors.processor_interface.Processor.process` becomes a record, reads and
+    writes through the datastore interface are counted for all active records. Nested calls of datastore methods
+    (e.g. ``set_skeleton`` calling ``set_part``) are counted once.
+
+    .. highlight:: python
+    .. code-block:: python
+
+        with Instrumentation() as instrumentation:
+            pipeline.run()
+        instrumentation.save_json('profile.json')
+        # Open with chrome://tracing or https://ui.perfetto.dev
+        instrumentation.save_chrome_trace('trace.json')
+
+    """
+
+    def __init__(self):
+        self.records = []
+        self._origin = time.perf_counter()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._installed = None
+
+    def install(self):
+        """Registers this object as the instrumentation hook of processors and datastores."""
+        from cvkit.pose_estimation.data_readers import DataStoreInterface
+        from cvkit.pose_estimation.processors.processor_interface import Processor
+        self._installed = (Processor.INSTRUMENTATION, DataStoreInterface.INSTRUMENTATION)
+        Processor.INSTRUMENTATION = self
+        DataStoreInterface.INSTRUMENTATION = self
+
+    def uninstall(self):
+        """Restores the previously registered hooks."""
+        from cvkit.pose_estimation.data_readers import DataStoreInterface
+        from cvkit.pose_estimation.processors.processor_interface import Processor
+        if self._installed is not None:
+            Processor.INSTRUMENTATION, DataStoreInterface.INSTRUMENTATION = self._installed
+            self._installed = None
+
+    def __enter__(self):
+        self.install()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.uninstall()
+
+    def _stack(self):
+        if not hasattr(self._local, 'stack'):
+            self._local.stack = []
+            self._local.depth = 0
+        return self._local.stack
+
+    @contextmanager
+    def span(self, name, category='stage', **args):
+        """Records the execution of a code block.
+
+        :param name: Name of the record
+        :type name: str
+        :param category: Category of the record, e.g. "processor" or "stage".
+        :type category: str
+        :param args: Additional values stored in the record
+        :return: The record, values can be added while the block is executed.
+        :rtype: dict
+        """
+        stack = self._stack()
+        record = {'name': name, 'category': category, 'thread': threading.get_ident(), 'reads': 0, 'writes': 0,
+                  'accesses': {}, 'frames': None, **args}
+        peak_rss = get_peak_rss()
+        stack.append(record)
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            end = time.perf_counter()
+            stack.pop()
+            record['start'] = start - self._origin
+            record['duration'] = end - start
+            record['peak_rss'] = get_peak_rss()
+            record['peak_rss_increase'] = record['peak_rss'] - peak_rss if peak_rss is not None else None
+            if record['frames'] is not None:
+                record['frames_per_second'] = record['frames'] / record['duration'] if record['duration'] > 0 else None
+            with self._lock:
+                self.records.append(record)
+
+    def count(self, kind, method):
+        """Counts a datastore access for all active records.
+
+        :param kind: "reads" or "writes"
+        :type kind: str
+        :param method: Name of the datastore method
+        :type method: str
+        """
+        for record in self._stack():
+            record[kind] += 1
+            record['accesses'][method] = record['accesses'].get(method, 0) + 1
+
+    def summary(self):
+        """Aggregates the records by category and name.
+
+        :return: List of dictionaries with calls, total time, frames, frames per second and datastore accesses.
+        :rtype: list[dict]
+        """
+        groups = {}
+        for record in self.records:
+            group = groups.setdefault((record['category'], record['name']),
+                                      {'category': record['category'], 'name': record['name'], 'calls': 0,
+                                       'total_time': 0.0, 'frames': 0, 'reads': 0, 'writes': 0, 'peak_rss': None})
+            group['calls'] += 1
+            group['total_time'] += record['duration']
+            group['frames'] += record['frames'] or 0
+            group['reads'] += record['reads']
+            group['writes'] += record['writes']
+            if record['peak_rss'] is not None:
+                group['peak_rss'] = max(group['peak_rss'] or 0, record['peak_rss'])
+        for group in groups.values():
+            group['frames_per_second'] = group['frames'] / group['total_time'] if group['total_time'] > 0 else None
+        return sorted(groups.values(), key=lambda group: group['total_time'], reverse=True)
+
+    def to_dict(self):
+        return {'records': sorted(self.records, key=lambda record: record['start']), 'summary': self.summary()}
+
+    def save_json(self, path):
+        """Writes the records and their summary to a json file.
+
+        :param path: Output path
+        :type path: str
+        """
+        with open(path, 'w') as output:
+            json.dump(self.to_dict(), output, indent=2)
+
+    def to_chrome_trace(self):
+        """Converts the records to the Chrome trace event format. Durations use complete events ("X").
+
+        :rtype: dict
+        """
+        events = []
+        for record in sorted(self.records, key=lambda record: record['start']):
+            args = {key: value for key, value in record.items() if
+                    key not in ['name', 'category', 'thread', 'start', 'duration']}
+            events.append({'name': record['name'], 'cat': record['category'], 'ph': 'X',
+                           'ts': record['start'] * 1e6, 'dur': record['duration'] * 1e6,
+                           'pid': os.getpid(), 'tid': record['thread'], 'args': args})
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def save_chrome_trace(self, path):
+        """Writes a trace file that can be opened with chrome://tracing or Perfetto.
+
+        :param path: Output path
+        :type path: str
+        """
+        with open(path, 'w') as output:
+            json.dump(self.to_chrome_trace(), output)
+
+
+def instrument_process(function):
+    """Decorates :py:meth:`~cvkit.pose_estimation.processors.processor_interface.Processor.process` implementations.
+    The call is recorded if an :py:class:`Instrumentation` is installed.
+    """
+
+    @functools.wraps(function)
+    def wrapper(self, data_store, *args, **kwargs):
+        instrumentation = self.INSTRUMENTATION
+        if instrumentation is None:
+            return function(self, data_store, *args, **kwargs)
+        with instrumentation.span(self.PROCESSOR_NAME, 'processor', processor_id=self.PROCESSOR_ID) as record:
+            result = function(self, data_store, *args, **kwargs)
+            if data_store is not None:
+                record['frames'] = len(data_store)
+            else:
+                output = self.get_output()
+                record['frames'] = len(output) if output is not None else None
+        return result
+
+    wrapper.__instrumented__ = True
+    return wrapper
+
+
+def instrument_access(function, kind):
+    """Decorates datastore methods to count reads or writes if an :py:class:`Instrumentation` is installed.
+    Generators (e.g. row_iterator) count one access per yielded item, same as the equivalent random access calls.
+
+    :param function: Datastore method
+    :param kind: "reads" or "writes"
+    """
+
+    if inspect.isgeneratorfunction(function):
+        @functools.wraps(function)
+        def generator_wrapper(self, *args, **kwargs):
+            instrumentation = self.INSTRUMENTATION
+            if instrumentation is None:
+                yield from function(self, *args, **kwargs)
+                return
+            iterator = function(self, *args, **kwargs)
+            while True:
+                instrumentation._stack()
+                local = instrumentation._local
+                outer = local.depth == 0
+                local.depth += 1
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+                finally:
+                    local.depth -= 1
+                if outer:
+                    instrumentation.count(kind, function.__name__)
+                yield item
+
+        generator_wrapper.__instrumented__ = True
+        return generator_wrapper
+
+    @functools.wraps(function)
+    def wrapper(self, *args, **kwargs):
+        instrumentation = self.INSTRUMENTATION
+        if instrumentation is None:
+            return function(self, *args, **kwargs)
+        instrumentation._stack()
+        local = instrumentation._local
+        if local.depth == 0:
+            instrumentation.count(kind, function.__name__)
+        local.depth += 1
+        try:
+            return function(self, *args, **kwargs)
+        finally:
+            local.depth -= 1
+
+    wrapper.__instrumented__ = True
+    return wrapper
@@ -0,0 +1,7 @@
+from cvkit.pose_estimation.pipeline.batch import BatchRunner
+from cvkit.pose_estimation.pipeline.cache import ProcessorCache
+from cvkit.pose_estimation.pipeline.chunked import FrameChunkExecutor
+from cvkit.pose_estimation.pipeline.distributed import ProcessPoolPartExecutor
+from cvkit.pose_estimation.pipeline.fused import FusedPartExecutor
+from cvkit.pose_estimation.pipeline.pipeline import Pipeline, PipelineStage
+from cvkit.pose_estimation.pipeline.streaming import StreamingChain
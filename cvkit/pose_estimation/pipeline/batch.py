@@ -0,0 +1,187 @@
+import glob
+import json
+import os
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+
+import yaml as yml
+
+from cvkit import get_processor_class
+from cvkit.pose_estimation.config import PoseEstimationConfig
+from cvkit.pose_estimation.data_readers import DataStoreInterface
+from cvkit.pose_estimation.pipeline.pipeline import Pipeline
+from cvkit.pose_estimation.processors.processor_interface import ProcessorMetaData
+from cvkit.utils import parse_memory_size
+
+try:
+    import resource
+except ImportError:
+    # Memory limits are not supported on this platform
+    resource = None
+
+
+def get_total_memory():
+    """Physical memory of the machine in bytes, None if it cannot be determined.
+
+    :rtype: int
+    """
+    try:
+        return os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES')
+    except (ValueError, OSError, AttributeError):
+        return None
+
+
+def get_output_files(pipeline: Pipeline):
+    """Resolved paths of all FILE_PATH parameters of the pipeline, e.g. the files written by :py:class:`~cvkit.pose_estimation.processors.util.SaveFile`.
+
+    :param pipeline: Target pipeline
+    :type pipeline: :py:class:`~cvkit.pose_estimation.pipeline.pipeline.Pipeline`
+    :rtype: list[str]
+    """
+    paths = []
+    for stage in pipeline.stages:
+        for link in stage.chain:
+            processor_class = get_processor_class(link['processor'])
+            for key, meta_data in (processor_class.META_DATA or {}).items():
+                value = link['params'].get(key)
+                if meta_data.param_type == ProcessorMetaData.FILE_PATH and isinstance(value, str):
+                    paths.append(pipeline.resolve_path(value))
+    return paths
+
+
+def _limit_memory(memory_limit):
+    # Worker initializer. Allocations beyond the budget raise MemoryError inside the worker instead of exhausting the machine.
+    if memory_limit is not None and resource is not None:
+        resource.setrlimit(resource.RLIMIT_AS, (memory_limit, memory_limit))
+
+
+def _run_session(pipeline_dict, config_path, marker_name):
+    # Worker entry point. Exceptions are reported in the result so that a single session cannot stop the batch.
+    start = time.time()
+    result = {'config': config_path, 'status': 'completed', 'frames': 0, 'error': None}
+    try:
+        global_config = PoseEstimationConfig(config_path)
+        pipeline = Pipeline.from_dict(pipeline_dict, global_config)
+        output = pipeline.run()
+        if isinstance(output, DataStoreInterface):
+            result['frames'] = len(output)
+        result['outputs'] = [path for path in get_output_files(pipeline) if os.path.exists(path)]
+        result['time'] = time.time() - start
+        with open(os.path.join(global_config.output_folder, marker_name), 'w') as marker:
+            json.dump(result, marker, indent=2)
+    except BaseException:
+        result['status'] = 'failed'
+        result['error'] = traceback.format_exc()
+        result['time'] = time.time() - start
+    return result
+
+
+class BatchRunner:
+    """Runs the same pipeline for many sessions on a process pool. Every session is defined by its own project config,
+    relative paths of the pipeline are resolved against the output folder of the session.
+
+    A session writes a completion marker to its output folder after the pipeline has finished. When resuming, sessions
+    with a marker whose output files still exist are skipped, hence an interrupted batch can be restarted with the same arguments.
+
+    .. highlight:: shell
+    .. code-block:: shell
+
+        cvkit-batch pipeline.yaml "/data/sessions/*/config.yaml" --workers 8 --memory-limit 6G --report report.json
+
+    :param pipeline: Pipeline yaml path or its dictionary representation. The "config" entry is replaced for every session.
+    :type pipeline: str or dict
+    :param configs: List of config paths or glob patterns.
+    :type configs: list[str]
+    :param workers: Number of worker processes. Defaults to the number of CPUs, reduced to fit the memory budget.
+    :type workers: int
+    :param memory_limit: Address space budget per worker in bytes or as a string (e.g. "4G").
+    :type memory_limit: int or str
+    :param resume: Skip sessions that were already completed.
+    :type resume: bool
+    """
+    PRINT = False
+
+    def __init__(self, pipeline, configs, workers=None, memory_limit=None, resume=True):
+        self.pipeline_dict = yml.safe_load(open(pipeline, 'r')) if isinstance(pipeline, str) else dict(pipeline)
+        self.pipeline_name = self.pipeline_dict.get('name', 'pipeline')
+        self.marker_name = f'.{self.pipeline_name}.complete.json'
+        self.configs = []
+        for pattern in configs:
+            matches = sorted(glob.glob(pattern)) if glob.has_magic(pattern) else [pattern]
+            self.configs.extend(os.path.abspath(match) for match in matches if
+                                os.path.abspath(match) not in self.configs)
+        self.memory_limit = parse_memory_size(memory_limit)
+        self.workers = workers if workers is not None else os.cpu_count()
+        total_memory = get_total_memory()
+        if self.memory_limit is not None and total_memory is not None:
+            self.workers = max(1, min(self.workers, total_memory // self.memory_limit))
+        self.resume = resume
+        self.report = None
+
+    def is_complete(self, config_path):
+        """Checks whether the session has a completion marker and all recorded outputs exist.
+
+        :param config_path: Path to the session config.
+        :type config_path: str
+        :rtype: bool
+        """
+        try:
+            output_folder = yml.safe_load(open(config_path, 'r'))['output_folder']
+            marker = json.load(open(os.path.join(output_folder, self.marker_name), 'r'))
+        except Exception:
+            return False
+        return marker.get('status') == 'completed' and all(os.path.exists(path) for path in marker.get('outputs', []))
+
+    def run(self, report_path=None):
+        """Processes all sessions and builds the summary report.
+
+        :param report_path: Optional path of the json report.
+        :type report_path: str
+        :return: Report containing per session status, timings and overall throughput.
+        :rtype: dict
+        """
+        start = time.time()
+        sessions = {}
+        pending = []
+        for config_path in self.configs:
+            if self.resume and self.is_complete(config_path):
+                sessions[config_path] = {'config': config_path, 'status': 'skipped', 'frames': 0, 'error': None,
+                                         'time': 0.0}
+            else:
+                pending.append(config_path)
+        with ProcessPoolExecutor(max_workers=max(1, min(self.workers, len(pending) or 1)), initializer=_limit_memory,
+                                 initargs=(self.memory_limit,)) as pool:
+            futures = {pool.submit(_run_session, self.pipeline_dict, config_path, self.marker_name): config_path for
+                       config_path in pending}
+            for future in as_completed(futures):
+                config_path = futures[future]
+                try:
+                    sessions[config_path] = future.result()
+                except BrokenProcessPool:
+                    # The worker was killed (e.g. by the operating system), the session can be retried by resuming.
+                    sessions[config_path] = {'config': config_path, 'status': 'failed', 'frames': 0, 'time': None,
+                                             'error': 'Worker process terminated abruptly'}
+                if self.PRINT:
+                    print(f"[{len(sessions)}/{len(self.configs)}] {sessions[config_path]['status']} {config_path}")
+        wall_time = time.time() - start
+        results = [sessions[config_path] for config_path in self.configs]
+        completed = [result for result in results if result['status'] == 'completed']
+        frames = sum(result['frames'] for result in completed)
+        self.report = {'pipeline': self.pipeline_name,
+                       'workers': self.workers,
+                       'memory_limit': self.memory_limit,
+                       'wall_time': wall_time,
+                       'sessions': len(results),
+                       'completed': len(completed),
+                       'skipped': sum(result['status'] == 'skipped' for result in results),
+                       'failed': sum(result['status'] == 'failed' for result in results),
+                       'frames': frames,
+                       'frames_per_second': frames / wall_time if wall_time > 0 else 0.0,
+                       'sessions_per_hour': len(completed) / wall_time * 3600 if wall_time > 0 else 0.0,
+                       'results': results}
+        if report_path is not None:
+            with open(report_path, 'w') as report_file:
+                json.dump(self.report, report_file, indent=2)
+        return self.report
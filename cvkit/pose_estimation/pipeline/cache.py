@@ -0,0 +1,202 @@
+import glob
+import hashlib
+import json
+import os
+import pickle
+import time
+
+import numpy as np
+
+from cvkit.pose_estimation.data_readers import DataStoreInterface
+from cvkit.pose_estimation.processors.processor_interface import Processor, ProcessorMetaData
+from cvkit.utils import parse_memory_size
+
+
+def hash_file(path, block_size=1 << 20):
+    """Computes the sha256 digest of a file.
+
+    :param path: Path to the file
+    :type path: str
+    :rtype: str
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for block in iter(lambda: file.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class ProcessorCache:
+    """Content-addressed on-disk cache of processor outputs. Entries are keyed by the hash of the input datastore
+    (:py:meth:`~cvkit.pose_estimation.data_readers.datastore_interface.DataStoreInterface.compute_data_hash`), the
+    :py:attr:`~cvkit.pose_estimation.processors.processor_interface.Processor.PROCESSOR_ID` and the serialized
+    :py:attr:`~cvkit.pose_estimation.processors.processor_interface.Processor.META_DATA` values of every processor.
+    Datastores referenced by parameters are keyed by their data hash and files by their content, hence changing an input
+    file invalidates the dependent entries.
+    The least recently used entries are evicted once the cache exceeds its size limit.
+
+    :param path: Cache directory. Created if it does not exist.
+    :type path: str
+    :param max_size: Size limit in bytes or as a string (e.g. "10G"). None disables eviction.
+    :type max_size: int or str
+    """
+    EXTENSION = '.cache'
+
+    def __init__(self, path, max_size=None):
+        self.path = path
+        self.max_size = parse_memory_size(max_size)
+        os.makedirs(self.path, exist_ok=True)
+
+    @staticmethod
+    def _serialize_value(meta_data: ProcessorMetaData, value):
+        if value is None:
+            return None
+        if meta_data.param_type == ProcessorMetaData.GLOBAL_CONFIG:
+            return value.export_dict()
+        if meta_data.param_type == ProcessorMetaData.FILE_MAP:
+            return {view: data_store.compute_data_hash() for view, data_store in value.items()}
+        if isinstance(value, DataStoreInterface):
+            return value.compute_data_hash()
+        if isinstance(value, np.ndarray):
+            return hashlib.sha256(np.ascontiguousarray(value).tobytes()).hexdigest() + str(value.shape)
+        if meta_data.param_type == ProcessorMetaData.DATA_STORE and isinstance(value, dict) and os.path.isfile(
+                value.get('path', '')):
+            return {**value, 'content': hash_file(value['path'])}
+        if meta_data.param_type == ProcessorMetaData.NUMPY_ARRAY and isinstance(value, str) and os.path.isfile(value):
+            return hash_file(value)
+        return value
+
+    def get_signature(self, processor: Processor):
+        """Serializes the identity of a processor, i.e. its id and parameter values.
+
+        :param processor: Target processor
+        :type processor: :py:class:`~cvkit.pose_estimation.processors.processor_interface.Processor`
+        :rtype: dict
+        """
+        return {'id': processor.PROCESSOR_ID,
+                'params': {key: self._serialize_value(meta_data, processor.__getattribute__(key)) for key, meta_data in
+                           (processor.META_DATA or {}).items()}}
+
+    def compute_key(self, processors, data_store: DataStoreInterface = None):
+        """Computes the cache key of applying a sequence of processors to the input datastore.
+
+        :param processors: Ordered list of processors
+        :type processors: list[:py:class:`~cvkit.pose_estimation.processors.processor_interface.Processor`]
+        :param data_store: Input datastore
+        :type data_store: :py:class:`~cvkit.pose_estimation.data_readers.datastore_interface.DataStoreInterface`
+        :return: Hexadecimal key
+        :rtype: str
+        """
+        content = {'input': data_store.compute_data_hash() if data_store is not None else None,
+                   'processors': [self.get_signature(processor) for processor in processors]}
+        return hashlib.sha256(json.dumps(content, sort_keys=True, default=str).encode()).hexdigest()
+
+    def _entry_path(self, key):
+        return os.path.join(self.path, key + self.EXTENSION)
+
+    def _entries(self):
+        return [os.path.basename(path)[:-len(self.EXTENSION)] for path in
+                glob.glob(os.path.join(self.path, '*' + self.EXTENSION))]
+
+    def load(self, key):
+        """Loads a cached datastore.
+
+        :param key: Cache key
+        :type key: str
+        :return: Cached datastore or None if the entry does not exist.
+        :rtype: :py:class:`~cvkit.pose_estimation.data_readers.datastore_interface.DataStoreInterface`
+        """
+        path = self._entry_path(key)
+        try:
+            with open(path, 'rb') as entry:
+                data_store = pickle.load(entry)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return None
+        # Access time is not reliable on all file systems, the modification time tracks usage.
+        os.utime(path)
+        return data_store
+
+    def store(self, key, data_store: DataStoreInterface, processors=None):
+        """Adds a datastore to the cache and evicts the least recently used entries if required.
+
+        :param key: Cache key
+        :type key: str
+        :param data_store: Output datastore
+        :type data_store: :py:class:`~cvkit.pose_estimation.data_readers.datastore_interface.DataStoreInterface`
+        :param processors: Processors that generated the output, recorded for :py:meth:`invalidate`.
+        :type processors: list[:py:class:`~cvkit.pose_estimation.processors.processor_interface.Processor`]
+        """
+        path = self._entry_path(key)
+        with open(os.path.join(self.path, key + '.json'), 'w') as info:
+            json.dump({'processors': [processor.PROCESSOR_ID for processor in (processors or [])],
+                       'created': time.time()}, info)
+        # Write to a temporary file first, concurrent readers never observe partial entries.
+        temp_path = f'{path}.{os.getpid()}.tmp'
+        with open(temp_path, 'wb') as entry:
+            pickle.dump(data_store, entry, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, path)
+        self.evict()
+
+    def evict(self):
+        """Deletes the least recently used entries until the cache fits into its size limit."""
+        if self.max_size is None:
+            return
+        entries = []
+        for key in self._entries():
+            try:
+                stat = os.stat(self._entry_path(key))
+                entries.append((stat.st_mtime, stat.st_size, key))
+            except OSError:
+                pass
+        total = sum(size for _, size, _ in entries)
+        for _, size, key in sorted(entries):
+            if total <= self.max_size:
+                break
+            self._remove(key)
+            total -= size
+
+    def _remove(self, key):
+        for path in [self._entry_path(key), os.path.join(self.path, key + '.json')]:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def invalidate(self, key=None, processor_id=None, older_than=None):
+        """Deletes cache entries. Without arguments, the complete cache is cleared.
+
+        :param key: Deletes the entry with this key.
+        :type key: str
+        :param processor_id: Deletes all entries generated by this processor.
+        :type processor_id: str
+        :param older_than: Deletes all entries not used for the given number of seconds.
+        :type older_than: float
+        :return: Number of deleted entries
+        :rtype: int
+        """
+        if key is not None:
+            exists = os.path.exists(self._entry_path(key))
+            self._remove(key)
+            return int(exists)
+        count = 0
+        for entry_key in self._entries():
+            remove = processor_id is None and older_than is None
+            if older_than is not None and time.time() - os.path.getmtime(self._entry_path(entry_key)) > older_than:
+                remove = True
+            if processor_id is not None:
+                try:
+                    info = json.load(open(os.path.join(self.path, entry_key + '.json'), 'r'))
+                    remove = remove or processor_id in info['processors']
+                except (OSError, ValueError, KeyError):
+                    remove = True
+            if remove:
+                self._remove(entry_key)
+                count += 1
+        return count
+
+    def get_size(self):
+        """Total size of the cache in bytes.
+
+        :rtype: int
+        """
+        return sum(os.path.getsize(self._entry_path(key)) for key in self._entries())
@@ -0,0 +1,108 @@
+import copy
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from cvkit.pose_estimation.data_readers import DataStoreInterface
+from cvkit.pose_estimation.processors.processor_interface import Processor, ProcessorMetaData
+
+
+def _run_frame_chunk(processor, data_store):
+    # Worker entry point. Returns the output and whether the processor modified the chunk in-place.
+    processor.process(data_store)
+    output = processor.get_output()
+    return output, output is data_store
+
+
+class FrameChunkExecutor(Processor):
+    """Runs a :py:attr:`~cvkit.pose_estimation.processors.processor_interface.Processor.FRAME_INDEPENDENT` processor on a
+    process pool with one task per contiguous chunk of frames. Every worker receives a detached copy of its frames
+    (see :py:meth:`~cvkit.pose_estimation.data_readers.datastore_interface.DataStoreInterface.get_frame_range`), including
+    the datastores of FILE_MAP parameters, and the outputs are stitched back in frame order.
+
+    :param processor: Frame independent processor
+    :type processor: :py:class:`~cvkit.pose_estimation.processors.processor_interface.Processor`
+    :param workers: Number of worker processes. Defaults to the number of CPUs.
+    :type workers: int
+    :param chunk_size: Number of frames per task. Defaults to a quarter of the frames per worker.
+    :type chunk_size: int
+    """
+    PROCESSOR_NAME = "Frame Chunk Executor"
+    PROCESSOR_ID = "cvkit_frame_chunk_executor"
+    PROCESSOR_SUMMARY = "Runs frame independent processors on a process pool with one task per chunk of frames."
+    META_DATA = {}
+
+    def __init__(self, processor: Processor, workers=None, chunk_size=None):
+        super(FrameChunkExecutor, self).__init__()
+        if not processor.FRAME_INDEPENDENT:
+            raise ValueError(f"{processor.PROCESSOR_NAME} is not frame independent")
+        self.processor = processor
+        self.workers = workers if workers is not None else os.cpu_count()
+        self.chunk_size = chunk_size
+        self._output = None
+
+    def _uses_file_map(self):
+        return any(meta_data.param_type == ProcessorMetaData.FILE_MAP for meta_data in
+                   (self.processor.META_DATA or {}).values())
+
+    def _split(self, data_store):
+        # Chunks are frame index ranges. Processors reading FILE_MAP datastores cover the frames of the datastores,
+        # the remaining processors cover the frames of the input.
+        if self._uses_file_map() or data_store is None:
+            first, total = 0, self.processor.get_frame_count(data_store)
+        else:
+            index = data_store.data.index
+            first, total = (int(index.min()), int(index.max()) + 1) if len(index) > 0 else (0, 0)
+        chunk_size = self.chunk_size if self.chunk_size else max(1, math.ceil((total - first) / (self.workers * 4)))
+        return [(begin, min(begin + chunk_size, total)) for begin in range(first, total, chunk_size)]
+
+    def _build_task(self, data_store, begin, end):
+        processor = copy.copy(self.processor)
+        processor.set_frame_range(begin, end)
+        for key, meta_data in (processor.META_DATA or {}).items():
+            if meta_data.param_type == ProcessorMetaData.FILE_MAP:
+                file_map = processor.__getattribute__(key)
+                processor.__setattr__(key, {view: reader.get_frame_range(begin, end) for view, reader in
+                                            file_map.items()})
+        chunk = None
+        if data_store is not None and processor.USES_INPUT:
+            # The input is sliced by the same frame indices as the FILE_MAP datastores.
+            chunk = data_store.get_frame_range(begin, end)
+        return processor, chunk
+
+    def process(self, data_store: DataStoreInterface):
+        self._data_store = data_store
+        self._data_ready = False
+        self._progress = 0
+        tasks = [self._build_task(data_store, begin, end) for begin, end in self._split(data_store)]
+        # Frames missing in the input leave empty chunks.
+        tasks = [(processor, chunk) for processor, chunk in tasks if chunk is None or len(chunk.data) > 0]
+        results = []
+        with ProcessPoolExecutor(max_workers=max(1, min(self.workers, len(tasks)))) as pool:
+            futures = [pool.submit(_run_frame_chunk, processor, chunk) for processor, chunk in tasks]
+            for count, future in enumerate(futures):
+                results.append(future.result())
+                self._progress = int((count + 1) / len(tasks) * 100)
+                if self.PRINT:
+                    print(f'\r {self.processor.PROCESSOR_NAME} {self._progress}% complete', end='')
+        if len(results) == 0:
+            self._output = data_store
+        elif results[0][1]:
+            data_store.data = pd.concat([output.data for output, _ in results])
+            self._output = data_store
+        else:
+            self._output = results[0][0]
+            self._output.data = pd.concat([output.data for output, _ in results], ignore_index=True)
+        self._data_ready = True
+        self._progress = 100
+
+    def get_output(self):
+        if self._data_ready:
+            return self._output
+        else:
+            return None
+
+    def __eq__(self, other):
+        return type(other) == type(self) and self.processor == other.processor
@@ -0,0 +1,77 @@
+import argparse
+import time
+
+from cvkit.pose_estimation.config import PoseEstimationConfig
+from cvkit.pose_estimation.instrumentation import Instrumentation
+from cvkit.pose_estimation.pipeline.batch import BatchRunner
+from cvkit.pose_estimation.pipeline.pipeline import Pipeline
+from cvkit.pose_estimation.processors.processor_interface import Processor
+
+
+def run_pipeline(argv=None):
+    """Entry point of the ``cvkit-run`` command. Executes a pipeline yaml file without a user interface.
+
+    .. highlight:: shell
+    .. code-block:: shell
+
+        cvkit-run pipeline.yaml --config config.yaml --profile profile.json --trace trace.json
+
+    :param argv: Command line arguments. Defaults to :py:data:`sys.argv`.
+    :type argv: list[str]
+    """
+    parser = argparse.ArgumentParser(prog='cvkit-run', description='Runs a BU-CVKit processor pipeline.')
+    parser.add_argument('pipeline', help='Path to the pipeline yaml file.')
+    parser.add_argument('-c', '--config', default=None,
+                        help='Path to the project config. Overrides the config defined in the pipeline file.')
+    parser.add_argument('-v', '--verbose', action='store_true', help='Print progress of each processor.')
+    parser.add_argument('--profile', default=None, help='Path of a json file with timings of every stage and processor.')
+    parser.add_argument('--trace', default=None, help='Path of a Chrome trace file (chrome://tracing, Perfetto).')
+    args = parser.parse_args(argv)
+    Processor.PRINT = Pipeline.PRINT = args.verbose
+    global_config = PoseEstimationConfig(args.config) if args.config is not None else None
+    pipeline = Pipeline.load(args.pipeline, global_config)
+    instrumentation = Instrumentation() if args.profile is not None or args.trace is not None else None
+    if instrumentation is not None:
+        instrumentation.install()
+    start = time.time()
+    try:
+        pipeline.run()
+    finally:
+        if instrumentation is not None:
+            instrumentation.uninstall()
+            if args.profile is not None:
+                instrumentation.save_json(args.profile)
+            if args.trace is not None:
+                instrumentation.save_chrome_trace(args.trace)
+    print(f'\n{pipeline.name} completed in {time.time() - start:.2f}s')
+
+
+def run_batch(argv=None):
+    """Entry point of the ``cvkit-batch`` command. Executes a pipeline for many sessions and writes a summary report.
+
+    .. highlight:: shell
+    .. code-block:: shell
+
+        cvkit-batch pipeline.yaml "/data/sessions/*/config.yaml" --workers 8 --memory-limit 6G --report report.json
+
+    :param argv: Command line arguments. Defaults to :py:data:`sys.argv`.
+    :type argv: list[str]
+    """
+    parser = argparse.ArgumentParser(prog='cvkit-batch', description='Runs a BU-CVKit processor pipeline for many sessions.')
+    parser.add_argument('pipeline', help='Path to the pipeline yaml file.')
+    parser.add_argument('configs', nargs='+', help='Session config paths or glob patterns.')
+    parser.add_argument('-w', '--workers', type=int, default=None, help='Number of worker processes.')
+    parser.add_argument('-m', '--memory-limit', default=None, help='Memory budget per worker, e.g. 4G.')
+    parser.add_argument('-r', '--report', default='batch_report.json', help='Path of the json summary report.')
+    parser.add_argument('--no-resume', action='store_true', help='Process sessions that were already completed.')
+    parser.add_argument('-v', '--verbose', action='store_true', help='Print the status of each session.')
+    args = parser.parse_args(argv)
+    BatchRunner.PRINT = args.verbose
+    runner = BatchRunner(args.pipeline, args.configs, args.workers, args.memory_limit, not args.no_resume)
+    report = runner.run(args.report)
+    print(f"{report['completed']} completed, {report['skipped']} skipped, {report['failed']} failed "
+          f"in {report['wall_time']:.2f}s ({report['frames_per_second']:.1f} frames/s)")
+    if report['failed'] > 0:
+        for result in report['results']:
+            if result['status'] == 'failed':
+                print(f"\n{result['config']}\n{result['error']}")
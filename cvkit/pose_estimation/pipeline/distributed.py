@@ -0,0 +1,70 @@
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from cvkit.pose_estimation.data_readers import DataStoreInterface
+from cvkit.pose_estimation.pipeline.fused import FusedPartExecutor
+from cvkit.utils import SharedArray
+
+
+def _run_part_chain(chain, index, positions, likelihoods, slot):
+    # Worker entry point. Arrays are attached from shared memory and modified in-place.
+    try:
+        for processor in chain:
+            processor.process_part_array(index.array, positions.array[slot], likelihoods.array[slot])
+    finally:
+        for shared in (index, positions, likelihoods):
+            shared.release()
+    return slot
+
+
+class ProcessPoolPartExecutor(FusedPartExecutor):
+    """Fans :py:attr:`~cvkit.pose_estimation.processors.processor_interface.Processor.DISTRIBUTED` processors out over a process pool with one task per body part.
+    The data of all body parts is copied into shared memory once, every worker processes the chain of its body part in-place
+    through :py:meth:`~cvkit.pose_estimation.processors.processor_interface.Processor.process_part_array`, and the results
+    are merged back into the datastore.
+
+    :param processors: Ordered list of processors. The relative order of the processors targeting the same body part is preserved.
+    :type processors: list[:py:class:`~cvkit.pose_estimation.processors.processor_interface.Processor`]
+    :param workers: Number of worker processes. Defaults to the number of CPUs.
+    :type workers: int
+    """
+    PROCESSOR_NAME = "Process Pool Part Chain"
+    PROCESSOR_ID = "cvkit_process_pool_part_chain"
+    PROCESSOR_SUMMARY = "Runs per-part processors on a process pool with one task per body part."
+
+    def __init__(self, processors, workers=None):
+        super(ProcessPoolPartExecutor, self).__init__(processors)
+        self.workers = workers if workers is not None else os.cpu_count()
+
+    def process(self, data_store: DataStoreInterface):
+        self._data_store = data_store
+        self._data_ready = False
+        self._progress = 0
+        parts = list(self.chains.keys())
+        index, positions, likelihoods = None, None, None
+        try:
+            for slot, part in enumerate(parts):
+                part_index, part_positions, part_likelihoods = data_store.get_part_array(part)
+                if index is None:
+                    index = SharedArray.from_array(part_index)
+                    positions = SharedArray((len(parts),) + part_positions.shape, float)
+                    likelihoods = SharedArray((len(parts),) + part_likelihoods.shape, float)
+                positions.array[slot] = part_positions
+                likelihoods.array[slot] = part_likelihoods
+            if index is not None:
+                with ProcessPoolExecutor(max_workers=max(1, min(self.workers, len(parts)))) as pool:
+                    futures = [pool.submit(_run_part_chain, self.chains[part], index, positions, likelihoods, slot)
+                               for slot, part in enumerate(parts)]
+                    for count, future in enumerate(as_completed(futures)):
+                        future.result()
+                        self._progress = int((count + 1) / len(parts) * 100)
+                        if self.PRINT:
+                            print(f'\r {self.PROCESSOR_NAME} {self._progress}% complete', end='')
+                for slot, part in enumerate(parts):
+                    data_store.set_part_array(part, positions.array[slot].copy(), likelihoods.array[slot].copy())
+        finally:
+            for shared in (index, positions, likelihoods):
+                if shared is not None:
+                    shared.release()
+        self._data_ready = True
+        self._progress = 100
@@ -0,0 +1,72 @@
+from cvkit.pose_estimation.data_readers import DataStoreInterface
+from cvkit.pose_estimation.processors.processor_interface import Processor
+
+
+class FusedPartExecutor(Processor):
+    """Runs a chain of :py:attr:`~cvkit.pose_estimation.processors.processor_interface.Processor.DISTRIBUTED` processors in a single pass over the datastore.
+    The data of each body part is read into Numpy arrays once, processed by every processor of the chain targeting that part
+    through :py:meth:`~cvkit.pose_estimation.processors.processor_interface.Processor.process_part_array`, and written back once.
+
+    .. highlight:: python
+    .. code-block:: python
+
+        chain = []
+        for part in data_store.body_parts:
+            chain.extend([VelocityFilter(part, 0.6, 60, 500), LinearInterpolationFilter(part),
+                          MovingAverageFilter(part, 5), KalmanFilter(part, 60)])
+        executor = FusedPartExecutor(chain)
+        executor.process(data_store)
+
+    :param processors: Ordered list of processors. The relative order of the processors targeting the same body part is preserved.
+    :type processors: list[:py:class:`~cvkit.pose_estimation.processors.processor_interface.Processor`]
+    """
+    PROCESSOR_NAME = "Fused Part Chain"
+    PROCESSOR_ID = "cvkit_fused_part_chain"
+    PROCESSOR_SUMMARY = "Runs a chain of per-part processors with a single read and write per body part."
+    META_DATA = {}
+
+    def __init__(self, processors):
+        super(FusedPartExecutor, self).__init__()
+        self.processors = list(processors)
+        self.chains = {}
+        for processor in self.processors:
+            if not processor.DISTRIBUTED:
+                raise ValueError(f"{processor.PROCESSOR_NAME} does not operate at body part level")
+            self.chains.setdefault(processor.target_column, []).append(processor)
+
+    def process(self, data_store: DataStoreInterface):
+        self._data_store = data_store
+        self._data_ready = False
+        self._progress = 0
+        for count, part in enumerate(self.chains):
+            self._progress = int(count / len(self.chains) * 100)
+            if self.PRINT:
+                print(f'\r {self.PROCESSOR_NAME} {self._progress}% complete', end='')
+            index, positions, likelihoods = data_store.get_part_array(part)
+            self.run_chain(part, index, positions, likelihoods)
+            data_store.set_part_array(part, positions, likelihoods)
+        if self.PRINT:
+            print(f'\r {self.PROCESSOR_NAME} 100% complete', end='')
+        self._data_ready = True
+        self._progress = 100
+
+    def run_chain(self, part, index, positions, likelihoods):
+        """Runs the chain of the given body part on its Numpy arrays in-place.
+
+        :param part: Name of the body part.
+        :type part: str
+        :param index: Numpy array of n frame indices.
+        :param positions: nxd Numpy array of positions.
+        :param likelihoods: Numpy array of n likelihood values.
+        """
+        for processor in self.chains.get(part, []):
+            processor.process_part_array(index, positions, likelihoods)
+
+    def get_output(self):
+        if self._data_ready:
+            return self._data_store
+        else:
+            return None
+
+    def __eq__(self, other):
+        return type(other) == type(self) and self.processors == other.processors
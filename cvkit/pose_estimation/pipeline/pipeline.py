@@ -0,0 +1,514 @@
+import copy
+import os
+import warnings
+from contextlib import nullcontext
+
+import pandas as pd
+import yaml as yml
+
+from cvkit import get_processor_class
+from cvkit.pose_estimation.config import PoseEstimationConfig
+from cvkit.pose_estimation.data_readers import initialize_datastore_reader
+from cvkit.pose_estimation.pipeline.cache import ProcessorCache
+from cvkit.pose_estimation.pipeline.chunked import FrameChunkExecutor
+from cvkit.pose_estimation.pipeline.distributed import ProcessPoolPartExecutor
+from cvkit.pose_estimation.pipeline.fused import FusedPartExecutor
+from cvkit.pose_estimation.processors.processor_interface import Processor, ProcessorMetaData
+from cvkit.pose_estimation.processors.util import ClusterAnalysis
+from cvkit.utils import IntervalSet
+
+
+class PipelineStage:
+    """A node of the :py:class:`Pipeline` graph. A stage either runs a single processor or a chain of processors.
+    Processors operating at body part level are expanded to one instance per body part if the body part parameter is omitted,
+    set to "all" or set to a list of body parts.
+
+    :param name: Unique name of the stage.
+    :type name: str
+    :param processor: :py:attr:`~cvkit.pose_estimation.processors.processor_interface.Processor.PROCESSOR_ID` of the processor.
+    :type processor: str
+    :param params: Parameters of the processor.
+    :type params: dict
+    :param input: Name of the stage providing the input datastore. None indicates that the stage does not require an input.
+    :type input: str
+    :param chain: List of dictionaries with "processor" and "params" keys. Used instead of processor and params.
+    :type chain: list[dict]
+    :param executor: Execution strategy of the stage ("serial", "fused", "process_pool" or "chunked").
+    :type executor: str
+    :param workers: Number of worker processes used by parallel executors. Defaults to the number of CPUs.
+    :type workers: int
+    :param chunk_size: Number of frames per task used by the "chunked" executor.
+    :type chunk_size: int
+    """
+    EXECUTORS = ['serial', 'fused', 'process_pool', 'chunked']
+
+    def __init__(self, name, processor=None, params=None, input=None, chain=None, executor=None, workers=None,
+                 chunk_size=None):
+        self.name = name
+        if (processor is None) == (chain is None):
+            raise ValueError(f"Stage {name} should define either a processor or a chain")
+        self.chain = chain if chain is not None else [{'processor': processor, 'params': params}]
+        for link in self.chain:
+            link['params'] = link.get('params') or {}
+            if get_processor_class(link['processor']) is None:
+                raise ValueError(f"Processor {link['processor']} used in stage {name} is not installed")
+        self.input = input
+        self.executor = executor if executor is not None else ('fused' if chain is not None else 'serial')
+        if self.executor not in self.EXECUTORS:
+            raise ValueError(f"Unknown executor {self.executor} in stage {name}. Available: {self.EXECUTORS}")
+        self.workers = workers
+        self.chunk_size = chunk_size
+        if self.executor == 'chunked':
+            for link in self.chain:
+                if not get_processor_class(link['processor']).FRAME_INDEPENDENT:
+                    raise ValueError(f"Processor {link['processor']} used in stage {name} is not frame independent")
+
+    def get_dependencies(self):
+        """Names of the stages whose outputs are required by this stage.
+
+        :return: List of stage names
+        :rtype: list[str]
+        """
+        dependencies = [] if self.input is None else [self.input]
+        for link in self.chain:
+            processor_class = get_processor_class(link['processor'])
+            for key, meta_data in (processor_class.META_DATA or {}).items():
+                if meta_data.param_type == ProcessorMetaData.FILE_MAP and isinstance(link['params'].get(key), dict):
+                    dependencies.extend(link['params'][key].values())
+        return dependencies
+
+    def export_dict(self):
+        out = {'name': self.name, 'input': self.input, 'executor': self.executor, 'workers': self.workers,
+               'chunk_size': self.chunk_size}
+        if len(self.chain) == 1 and self.executor in ['serial', 'chunked']:
+            out.update(self.chain[0])
+        else:
+            out['chain'] = self.chain
+        return out
+
+
+class Pipeline:
+    """Runs a graph of processors without a user interface. Datastores are passed between stages in memory.
+    A stage receives its input from the previous stage unless the input is explicitly set.
+    Relative paths are resolved against the output folder of the global config.
+
+    .. highlight:: YAML
+    .. code-block:: YAML
+
+        name: nightly_cleanup
+        # Optional, can be provided through the command line
+        config: /path/to/config.yaml
+        # Optional, outputs of unchanged stages are loaded from the cache instead of being recomputed
+        cache: { path: cache, max_size: 10G }
+        stages:
+          - name: load
+            processor: cvkit_load_file
+            params:
+              # Either a path and a flavor, or the name of an annotated view defined in the config
+              data_store_dict: { view: Cam1 }
+          - name: velocity
+            processor: cvkit_velocity_filter
+            # The body part parameter is omitted, one processor is created per body part
+            params: { threshold: 0.6, framerate: 60, threshold_velocity: 500 }
+          - name: smoothing
+            # "fused" runs the chain with a single pass per body part, "process_pool" runs each body part in a worker process
+            executor: fused
+            workers: 8
+            chain:
+              - processor: cvkit_interpolation
+                params: { max_cluster_size: 10 }
+              - processor: cvkit_moving_average
+                params: { window_size: 5 }
+          - name: region
+            # "chunked" splits the frames of frame independent processors into chunks processed by worker processes
+            executor: chunked
+            chunk_size: 5000
+            processor: cvkit_2d_region_filter
+            params: { uncertainty_regions: regions.npy }
+          - name: save
+            processor: cvkit_save_file
+            input: region
+            params: { path: cleaned.csv }
+
+    :param stages: List of pipeline stages.
+    :type stages: list[:py:class:`PipelineStage`]
+    :param global_config: Project configuration used for resolving GLOBAL_CONFIG and FILE_MAP parameters.
+    :type global_config: :py:class:`~cvkit.pose_estimation.config.PoseEstimationConfig`
+    :param name: Name of the pipeline
+    :type name: str
+    :param cache: Optional cache of stage outputs.
+    :type cache: :py:class:`~cvkit.pose_estimation.pipeline.cache.ProcessorCache`
+    """
+    PRINT = False
+
+    def __init__(self, stages, global_config: PoseEstimationConfig = None, name='pipeline', cache=None):
+        self.name = name
+        self.stages = stages
+        self.global_config = global_config
+        self.cache = cache
+        self._previous = {}
+        self._previous_input = None
+        self._file_hashes = {}
+        self.outputs = {}
+        self._stage_map = {}
+        for stage in stages:
+            if stage.name in self._stage_map:
+                raise ValueError(f"Duplicate stage name {stage.name}")
+            self._stage_map[stage.name] = stage
+        self.order = self._sort_stages()
+
+    @staticmethod
+    def from_dict(data_dictionary, global_config: PoseEstimationConfig = None):
+        """Builds a pipeline from its dictionary representation.
+
+        :param data_dictionary: Dictionary containing "stages" and optionally "name", "config" and "cache".
+        :type data_dictionary: dict
+        :param global_config: Project configuration. Overrides the "config" entry of the dictionary.
+        :type global_config: :py:class:`~cvkit.pose_estimation.config.PoseEstimationConfig`
+        :rtype: :py:class:`Pipeline`
+        """
+        if global_config is None and data_dictionary.get('config', None) is not None:
+            global_config = PoseEstimationConfig(data_dictionary['config'])
+        stages = []
+        previous = None
+        for index, stage_dict in enumerate(data_dictionary['stages']):
+            stage_dict = dict(stage_dict)
+            stage_dict.setdefault('name', f'stage_{index}')
+            if 'input' not in stage_dict:
+                stage_dict['input'] = previous
+            stages.append(PipelineStage(**stage_dict))
+            previous = stage_dict['name']
+        pipeline = Pipeline(stages, global_config, data_dictionary.get('name', 'pipeline'))
+        cache = data_dictionary.get('cache', None)
+        if cache is not None:
+            cache = cache if isinstance(cache, dict) else {'path': cache}
+            pipeline.cache = ProcessorCache(pipeline.resolve_path(cache['path']), cache.get('max_size', None))
+        return pipeline
+
+    @staticmethod
+    def load(path, global_config: PoseEstimationConfig = None):
+        """Reads a pipeline from a yaml file.
+
+        :param path: Path to the yaml file.
+        :type path: str
+        :param global_config: Project configuration. Overrides the "config" entry of the file.
+        :type global_config: :py:class:`~cvkit.pose_estimation.config.PoseEstimationConfig`
+        :rtype: :py:class:`Pipeline`
+        """
+        return Pipeline.from_dict(yml.safe_load(open(path, 'r')), global_config)
+
+    def export_dict(self):
+        return {'name': self.name,
+                'config': self.global_config.path if self.global_config is not None else None,
+                'cache': {'path': self.cache.path, 'max_size': self.cache.max_size} if self.cache is not None else None,
+                'stages': [stage.export_dict() for stage in self.stages]}
+
+    def _sort_stages(self):
+        order = []
+        state = {}
+
+        def visit(name, path):
+            if name not in self._stage_map:
+                raise ValueError(f"Stage {path[-1]} depends on undefined stage {name}")
+            if state.get(name) == 1:
+                raise ValueError(f"Cyclic dependency: {' -> '.join(path + [name])}")
+            if state.get(name) == 2:
+                return
+            state[name] = 1
+            for dependency in self._stage_map[name].get_dependencies():
+                visit(dependency, path + [name])
+            state[name] = 2
+            order.append(self._stage_map[name])
+
+        for stage in self.stages:
+            visit(stage.name, [])
+        return order
+
+    def resolve_path(self, path):
+        """Resolves relative paths against the output folder of the global config.
+
+        :param path: Input path
+        :type path: str
+        :rtype: str
+        """
+        if path is None or os.path.isabs(path) or self.global_config is None:
+            return path
+        return os.path.join(self.global_config.output_folder, path)
+
+    def _resolve_data_store_dict(self, value):
+        if 'view' in value:
+            annotation = self.global_config.annotation_views[value['view']]
+            return {'path': annotation.annotation_file, 'type': annotation.annotation_file_flavor}
+        return {**value, 'path': self.resolve_path(value['path'])}
+
+    def _resolve_file_map(self, value, outputs):
+        file_map = {}
+        value = value if isinstance(value, dict) else {}
+        for view, annotation in self.global_config.annotation_views.items():
+            if view not in value:
+                file_map[view] = initialize_datastore_reader(self.global_config.body_parts,
+                                                             annotation.annotation_file,
+                                                             annotation.annotation_file_flavor)
+        for view, stage_name in value.items():
+            file_map[view] = outputs[stage_name]
+        return file_map
+
+    def build_processors(self, processor_id, params, outputs=None):
+        """Instantiates processors from the processor id and parameters. GLOBAL_CONFIG and FILE_MAP parameters are resolved
+        from the global config. Processors operating at body part level are expanded for each requested body part.
+
+        :param processor_id: Unique processor identifier.
+        :type processor_id: str
+        :param params: Parameters of the processor.
+        :type params: dict
+        :param outputs: Outputs of the previously executed stages.
+        :type outputs: dict
+        :return: List of processors
+        :rtype: list[:py:class:`~cvkit.pose_estimation.processors.processor_interface.Processor`]
+        """
+        processor_class = get_processor_class(processor_id)
+        kwargs = {}
+        body_part_key = None
+        for key, meta_data in (processor_class.META_DATA or {}).items():
+            value = params.get(key, None)
+            if meta_data.param_type in [ProcessorMetaData.GLOBAL_CONFIG, ProcessorMetaData.FILE_MAP]:
+                if self.global_config is None:
+                    raise Exception(f"{processor_class.PROCESSOR_NAME} requires a global config")
+                kwargs[key] = self.global_config if meta_data.param_type == ProcessorMetaData.GLOBAL_CONFIG else \
+                    self._resolve_file_map(value, outputs or {})
+            elif value is None:
+                if processor_class.DISTRIBUTED and meta_data.param_type == ProcessorMetaData.BODY_PART:
+                    body_part_key = key
+            elif meta_data.param_type == ProcessorMetaData.DATA_STORE:
+                kwargs[key] = self._resolve_data_store_dict(value)
+            elif meta_data.param_type in [ProcessorMetaData.FILE_PATH, ProcessorMetaData.DIR_PATH,
+                                          ProcessorMetaData.NUMPY_ARRAY] and isinstance(value, str):
+                kwargs[key] = self.resolve_path(value)
+            elif processor_class.DISTRIBUTED and meta_data.param_type == ProcessorMetaData.BODY_PART and (
+                    value == 'all' or isinstance(value, list)):
+                body_part_key = key
+            else:
+                kwargs[key] = value
+        try:
+            if body_part_key is None:
+                return [processor_class(**kwargs)]
+            body_parts = params.get(body_part_key, 'all')
+            if body_parts in [None, 'all']:
+                if self.global_config is None:
+                    raise Exception("Expanding body parts requires a global config")
+                body_parts = self.global_config.body_parts
+            return [processor_class(**kwargs, **{body_part_key: part}) for part in body_parts]
+        except TypeError as e:
+            raise Exception(f"Invalid parameters for {processor_class.PROCESSOR_NAME} ({processor_id})\n" + str(e))
+
+    def _run_processor(self, processor, data_store):
+        if processor.REQUIRES_STATS and data_store is not None and not data_store.verify_stats():
+            cluster_analysis = ClusterAnalysis(self.global_config.threshold if self.global_config else 0.6)
+            cluster_analysis.process(data_store)
+        processor.process(data_store)
+        return processor.get_output()
+
+    def _build_links(self, stage: PipelineStage, outputs):
+        return [self.build_processors(link['processor'], link['params'], outputs) for link in stage.chain]
+
+    def run_stage(self, stage: PipelineStage, data_store, outputs=None, links=None):
+        """Executes a single stage.
+
+        :param stage: Target stage
+        :type stage: :py:class:`PipelineStage`
+        :param data_store: Input datastore
+        :type data_store: :py:class:`~cvkit.pose_estimation.data_readers.datastore_interface.DataStoreInterface`
+        :param outputs: Outputs of the previously executed stages.
+        :type outputs: dict
+        :param links: Processors of every link of the chain. Built from the stage definition if None.
+        :type links: list[list[:py:class:`~cvkit.pose_estimation.processors.processor_interface.Processor`]]
+        :return: Output datastore
+        :rtype: :py:class:`~cvkit.pose_estimation.data_readers.datastore_interface.DataStoreInterface`
+        """
+        if links is None:
+            links = self._build_links(stage, outputs)
+        processors = [processor for link in links for processor in link]
+        key = None
+        if self.cache is not None and all(processor.CACHEABLE for processor in processors):
+            key = self.cache.compute_key(processors, data_store)
+            cached = self.cache.load(key)
+            if cached is not None:
+                if self.PRINT:
+                    print(f'[{self.name}] {stage.name} loaded from cache')
+                return cached
+        data_store = self._execute(stage, processors, data_store)
+        if key is not None and data_store is not None:
+            self.cache.store(key, data_store, processors)
+        return data_store
+
+    def _execute(self, stage: PipelineStage, processors, data_store):
+        if stage.executor == 'fused':
+            processors = [FusedPartExecutor(processors)]
+        elif stage.executor == 'process_pool':
+            processors = [ProcessPoolPartExecutor(processors, stage.workers)]
+        elif stage.executor == 'chunked':
+            executors = []
+            for processor in processors:
+                # Parameters can make an instance frame dependent, e.g. DLTReconstruction writing an error file.
+                if processor.FRAME_INDEPENDENT:
+                    executors.append(FrameChunkExecutor(processor, stage.workers, stage.chunk_size))
+                else:
+                    warnings.warn(f"{processor.PROCESSOR_NAME} used in stage {stage.name} is not frame independent with "
+                                  f"the given parameters, running it serially")
+                    executors.append(processor)
+            processors = executors
+        for processor in processors:
+            data_store = self._run_processor(processor, data_store)
+        return data_store
+
+    @staticmethod
+    def get_temporal_support(links):
+        """Temporal support of a chain, i.e. the sum of the largest support of every link.
+
+        :param links: Processors of every link of the chain.
+        :type links: list[list[:py:class:`~cvkit.pose_estimation.processors.processor_interface.Processor`]]
+        :return: Number of frames on each side or None if the support is unbounded.
+        :rtype: int
+        """
+        radius = 0
+        for link in links:
+            supports = [processor.get_temporal_support() for processor in link]
+            if None in supports:
+                return None
+            radius += max(supports, default=0)
+        return radius
+
+    def _get_file_hashes(self, stage: PipelineStage, links):
+        # Hashes of the datastores loaded from the annotation files, changes are not tracked through dirty ranges.
+        hashes = []
+        for link, processors in zip(stage.chain, links):
+            for processor in processors:
+                for key, meta_data in (processor.META_DATA or {}).items():
+                    if meta_data.param_type == ProcessorMetaData.FILE_MAP:
+                        stage_views = link['params'].get(key) or {}
+                        hashes.append({view: reader.compute_data_hash() for view, reader in
+                                       processor.__getattribute__(key).items() if view not in stage_views})
+        return hashes
+
+    def _update_stage(self, stage: PipelineStage, data_store, links, dirty_input, previous):
+        # Recomputes the modified frames and splices them into the previous output. Returns None if not supported.
+        processors = [processor for link in links for processor in link]
+        radius = self.get_temporal_support(links)
+        if radius is None:
+            return None
+        if data_store is not None:
+            if len(data_store) == 0:
+                return None
+            targets = dirty_input.expand(radius).clip(data_store.data.index.min(), data_store.data.index.max() + 1)
+            for begin, end in targets:
+                chunk = self._execute(stage, processors, data_store.get_frame_range(begin - radius, end + radius))
+                previous.set_frame_range(chunk.get_frame_range(begin, end))
+            return targets
+        if len(processors) != 1 or not processors[0].FRAME_INDEPENDENT:
+            return None
+        processor = processors[0]
+        frame_count = processor.get_frame_count(None)
+        if frame_count != len(previous):
+            return None
+        targets = dirty_input.clip(0, frame_count)
+        for begin, end in targets:
+            processor.set_frame_range(begin, end)
+            processor.process(None)
+            chunk = processor.get_output()
+            chunk.data.index = pd.RangeIndex(begin, begin + len(chunk.data))
+            previous.set_frame_range(chunk)
+        return targets
+
+    def _run_stage_incremental(self, stage: PipelineStage, data_store, outputs, dirty):
+        previous = self._previous.get(stage.name, None)
+        dependencies = stage.get_dependencies()
+        dirty_input = IntervalSet()
+        known = previous is not None
+        for dependency in dependencies:
+            if dirty.get(dependency, None) is None:
+                known = False
+            else:
+                dirty_input = dirty_input.union(dirty[dependency])
+        if stage.input is None:
+            if data_store is not None:
+                known = known and data_store is self._previous_input
+                dirty_input = dirty_input.union(data_store.dirty)
+            elif len(dependencies) == 0:
+                # Source stages (e.g. loading files) are compared with their previous output.
+                known = False
+        links = self._build_links(stage, outputs)
+        file_hashes = self._get_file_hashes(stage, links)
+        known = known and file_hashes == self._file_hashes.get(stage.name, None)
+        self._file_hashes[stage.name] = file_hashes
+        if known and len(dirty_input) == 0:
+            if self.PRINT:
+                print(f'[{self.name}] {stage.name} unchanged')
+            return previous, IntervalSet()
+        if known:
+            targets = self._update_stage(stage, data_store, links, dirty_input, previous)
+            if targets is not None:
+                if self.PRINT:
+                    print(f'[{self.name}] {stage.name} updated {targets.size()} frames')
+                return previous, targets
+        if stage.input is None and data_store is not None:
+            # The pipeline input is tracked for the next run and must not be modified.
+            data_store = copy.deepcopy(data_store)
+        output = self.run_stage(stage, data_store, outputs, links)
+        if previous is None or output is None:
+            return output, None
+        return output, output.get_changed_frames(previous)
+
+    def run(self, data_store=None, incremental=False):
+        """Executes all stages in dependency order.
+
+        In incremental mode, the pipeline keeps a copy of every stage output. Subsequent incremental runs only recompute
+        the frames modified since the previous run (see :py:attr:`~cvkit.pose_estimation.data_readers.datastore_interface.DataStoreInterface.dirty`)
+        extended by the temporal support of the processors, and splice them into the previous outputs.
+        Stages with an unbounded temporal support are executed completely and their changed frames are detected by
+        comparing the output with the previous one.
+
+        :param data_store: Optional input datastore for stages without an input stage.
+        :type data_store: :py:class:`~cvkit.pose_estimation.data_readers.datastore_interface.DataStoreInterface`
+        :param incremental: Reuse the outputs of the previous incremental run.
+        :type incremental: bool
+        :return: Output of the last stage
+        :rtype: :py:class:`~cvkit.pose_estimation.data_readers.datastore_interface.DataStoreInterface`
+        """
+        consumers = {}
+        for stage in self.order:
+            for dependency in stage.get_dependencies():
+                consumers[dependency] = consumers.get(dependency, 0) + 1
+        outputs = {}
+        dirty = {}
+        output = None
+        for stage in self.order:
+            if self.PRINT:
+                print(f'\n[{self.name}] {stage.name}')
+            inputs = {}
+            for dependency in stage.get_dependencies():
+                consumers[dependency] -= 1
+                # Processors modify datastores in-place, all consumers except the last one receive a copy.
+                inputs[dependency] = outputs[dependency] if consumers[dependency] == 0 else copy.deepcopy(
+                    outputs[dependency])
+                if consumers[dependency] == 0:
+                    del outputs[dependency]
+            stage_input = inputs[stage.input] if stage.input is not None else data_store
+            instrumentation = Processor.INSTRUMENTATION
+            span = instrumentation.span(stage.name, 'stage', pipeline=self.name) if instrumentation else nullcontext()
+            with span as record:
+                if incremental:
+                    output, dirty[stage.name] = self._run_stage_incremental(stage, stage_input, inputs, dirty)
+                    if output is not None:
+                        self._previous[stage.name] = copy.deepcopy(output)
+                        self._previous[stage.name].dirty.clear()
+                else:
+                    output = self.run_stage(stage, stage_input, inputs)
+                if record is not None and output is not None:
+                    record['frames'] = len(output)
+            outputs[stage.name] = output
+        if incremental:
+            self._previous_input = data_store
+            if data_store is not None:
+                data_store.dirty.clear()
+        self.outputs = outputs
+        return output
@@ -0,0 +1,91 @@
+import time
+
+from cvkit.pose_estimation import Skeleton
+from cvkit.pose_estimation.config import PoseEstimationConfig
+from cvkit.pose_estimation.pipeline.pipeline import Pipeline
+
+
+class StreamingChain:
+    """Cleans live pose estimates one frame at a time by pushing every skeleton through a chain of
+    :py:attr:`~cvkit.pose_estimation.processors.processor_interface.Processor.STREAMING` processors. No datastore is required
+    and the latency of every frame is measured.
+
+    .. highlight:: python
+    .. code-block:: python
+
+        chain = StreamingChain.from_dict([{'processor': 'cvkit_velocity_filter',
+                                           'params': {'threshold': 0.6, 'framerate': 60, 'threshold_velocity': 500}},
+                                          {'processor': 'cvkit_kalman_filter', 'params': {'framerate': 60}}],
+                                         global_config)
+        for index, skeleton in enumerate(pose_estimator):
+            skeleton = chain.push(index, skeleton)
+            if skeleton is not None and skeleton['snout'] > 0.6:
+                trigger_stimulus()
+
+    :param processors: Ordered list of streaming processors.
+    :type processors: list[:py:class:`~cvkit.pose_estimation.processors.processor_interface.Processor`]
+    """
+
+    def __init__(self, processors):
+        for processor in processors:
+            if not processor.STREAMING:
+                raise ValueError(f"{processor.PROCESSOR_NAME} does not support streaming")
+        self.processors = processors
+        self.latency = None  #: Latency of the last frame in microseconds
+        self.frames = 0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+
+    @staticmethod
+    def from_dict(chain, global_config: PoseEstimationConfig = None):
+        """Builds a chain from a list of dictionaries with "processor" and "params" keys, same as the chain of a
+        :py:class:`~cvkit.pose_estimation.pipeline.pipeline.PipelineStage`. Body part level processors without a body part
+        are expanded for all body parts.
+
+        :param chain: List of processor definitions
+        :type chain: list[dict]
+        :param global_config: Project configuration
+        :type global_config: :py:class:`~cvkit.pose_estimation.config.PoseEstimationConfig`
+        :rtype: :py:class:`StreamingChain`
+        """
+        builder = Pipeline([], global_config)
+        processors = []
+        for link in chain:
+            processors.extend(builder.build_processors(link['processor'], link.get('params') or {}))
+        return StreamingChain(processors)
+
+    def push(self, index, skeleton: Skeleton):
+        """Processes a single frame.
+
+        :param index: Frame index
+        :param skeleton: Pose of the frame, modified in-place.
+        :type skeleton: :py:class:`~cvkit.pose_estimation.skeleton.Skeleton`
+        :return: Processed skeleton or None if a processor dropped the frame.
+        :rtype: :py:class:`~cvkit.pose_estimation.skeleton.Skeleton`
+        """
+        start = time.perf_counter_ns()
+        for processor in self.processors:
+            skeleton = processor.push(index, skeleton)
+            if skeleton is None:
+                break
+        self.latency = (time.perf_counter_ns() - start) / 1000
+        self.frames += 1
+        self.total_latency += self.latency
+        self.max_latency = max(self.max_latency, self.latency)
+        return skeleton
+
+    def get_mean_latency(self):
+        """
+        :return: Mean latency per frame in microseconds
+        :rtype: float
+        """
+        return self.total_latency / self.frames if self.frames > 0 else None
+
+    def reset(self):
+        """Clears the state of all processors and the latency statistics."""
+        for processor in self.processors:
+            processor.reset_stream()
+        self.latency = None
+        self.frames = 0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
@@ -13,6 +13,8 @@ class DistanceStatisticsFilter(Processor):
                  'sd_factor': ProcessorMetaData('SD Scale Factor', ProcessorMetaData.FLOAT, 1.25, 0.0),
                  'likelihood_threshold': ProcessorMetaData('Likelihood Threshold', ProcessorMetaData.FLOAT, 0.6, 0.0, 1.0)}
     PROCESSOR_SUMMARY = "Uses Mean and Standard deviation of distance among body parts to filter outliers"
+    FRAME_INDEPENDENT = True
+    TEMPORAL_SUPPORT = 0
 
     def __init__(self, distance_matrix_mean, distance_matrix_sd, threshold=0.5, sd_factor=1.25,likelihood_threshold=0.6):
         super(DistanceStatisticsFilter, self).__init__()
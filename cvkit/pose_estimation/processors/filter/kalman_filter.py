@@ -16,6 +16,7 @@ class KalmanFilter(Processor):
     PROCESSOR_SUMMARY = "Constant acceleration Kalman Filter"
 
     DISTRIBUTED = True
+    STREAMING = True
 
     def __init__(self, target_column, framerate, skip=True, threshold=0.6):
         super(KalmanFilter, self).__init__()
@@ -24,6 +25,7 @@ class KalmanFilter(Processor):
         self.threshold = threshold
         self.skip = skip
         self.dt = float(1 / framerate)
+        self._tracker = None
 
     def process(self, data_store):
         self._data_store = data_store
@@ -70,6 +72,35 @@ class KalmanFilter(Processor):
         self._data_ready = True
         self._progress = 100
 
+    def process_part_array(self, index, positions, likelihoods):
+        tracker = None
+        for i in range(len(likelihoods)):
+            if likelihoods[i] < self.threshold:
+                if self.skip:
+                    tracker = None
+                elif tracker is not None:
+                    positions[i, :3] = tracker.update(tracker.get_next_pred())
+            elif tracker is None:
+                tracker = Tracker(positions[i], self.dt)
+            else:
+                positions[i, :3] = tracker.update(positions[i])
+
+    def push(self, index, skeleton):
+        point = skeleton[self.target_column]
+        if point < self.threshold:
+            if self.skip:
+                self._tracker = None
+            elif self._tracker is not None:
+                point[:3] = self._tracker.update(self._tracker.get_next_pred())
+        elif self._tracker is None:
+            self._tracker = Tracker(point, self.dt)
+        else:
+            point[:3] = self._tracker.update(point)
+        return skeleton
+
+    def reset_stream(self):
+        self._tracker = None
+
     def get_output(self):
         if self._data_ready:
             return self._data_store
@@ -1,3 +1,5 @@
+import numpy as np
+
 from cvkit.pose_estimation.processors.processor_interface import Processor, ProcessorMetaData
 
 
@@ -25,11 +27,14 @@ class LinearInterpolationFilter(Processor):
         # if not self._data_store.verify_stats():
         #     raise Exception("This process requires data-frame statistics."
         #                     "\nPlease run ClusterAnalysis before this one")
+        # Clusters store frame indices, the borders of the data are compared by frame index as well.
+        first, last = (self._data_store.data.index[0], self._data_store.data.index[-1]) if len(
+            self._data_store) > 0 else (0, -1)
         for index, candidate in enumerate(self._data_store.stats.iter_na_clusters(self.target_column)):
             self._progress = int(index / len(self._data_store) * 100)
             if self.PRINT and self._progress % 10 == 0:
                 print(f'\r {self.PROCESSOR_NAME} {self._progress}% complete', end='')
-            if candidate['begin'] == 0 or candidate['end'] == len(self._data_store) - 1:
+            if candidate['begin'] == first or candidate['end'] == last:
                 continue
             if candidate['end'] - candidate['begin'] < self.max_cluster_size:
                 begin = self._data_store.get_part(candidate['begin'] - 1, self.target_column)
@@ -45,6 +50,22 @@ class LinearInterpolationFilter(Processor):
         self._data_ready = True
         self._progress = 100
 
+    def process_part_array(self, index, positions, likelihoods):
+        # Clusters of missing data are computed from the array since the statistics could be stale within a chain.
+        missing = np.concatenate(([False], likelihoods < self.threshold, [False]))
+        edges = np.flatnonzero(np.diff(missing.astype(np.int8)))
+        for begin, end in zip(edges[::2], edges[1::2] - 1):
+            if begin == 0 or end == len(likelihoods) - 1 or end - begin >= self.max_cluster_size:
+                continue
+            steps = np.arange(1, end - begin + 2)[:, np.newaxis]
+            vector = (positions[end + 1] - positions[begin - 1]) / (end - begin + 2)
+            positions[begin:end + 1] = positions[begin - 1] + vector * steps
+            likelihoods[begin:end + 1] = self.threshold
+
+    def get_temporal_support(self):
+        # A frame is only filled from the borders of its cluster, longer clusters are left untouched.
+        return self.max_cluster_size + 1
+
     def get_output(self):
         if self._data_ready:
             return self._data_store
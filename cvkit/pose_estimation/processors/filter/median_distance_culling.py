@@ -9,6 +9,9 @@ class MedianDistanceFilter(Processor):
     META_DATA = {'threshold': ProcessorMetaData('Threshold', ProcessorMetaData.FLOAT, 0.6, 0.0, 1.0),
                  'distance_threshold': ProcessorMetaData('Distance Threshold', ProcessorMetaData.FLOAT, 400)}
     PROCESSOR_SUMMARY = "Computes distance matrix among all body parts and filters outliers based on median distance."
+    FRAME_INDEPENDENT = True
+    TEMPORAL_SUPPORT = 0
+    STREAMING = True
 
     def process(self, data_store):
         self._data_store = data_store
@@ -33,6 +36,17 @@ class MedianDistanceFilter(Processor):
         self._data_ready = True
         self._progress = 100
 
+    def push(self, index, skeleton):
+        for part in skeleton.body_parts:
+            if skeleton[part] >= self.threshold:
+                distances = np.array(
+                    [np.linalg.norm(skeleton[part] - skeleton[p]) if skeleton[p] >= self.threshold else 0
+                     for p in skeleton.body_parts])
+                distances = distances[distances != 0]
+                if len(distances) != 0 and np.median(distances) > self.distance_threshold:
+                    skeleton[part].likelihood = 0
+        return skeleton
+
     def get_output(self):
         if self._data_ready:
             return self._data_store
@@ -1,3 +1,5 @@
+from collections import deque
+
 import numpy as np
 
 from cvkit.pose_estimation.processors.processor_interface import Processor, ProcessorMetaData
@@ -11,12 +13,14 @@ class MovingAverageFilter(Processor):
                  'window_size': ProcessorMetaData('Window Size', ProcessorMetaData.INT, min_val=1)}
     PROCESSOR_SUMMARY = "Runs a moving average filter to reduce noise."
     DISTRIBUTED = True
+    STREAMING = True
 
     def __init__(self, target_column, window_size, threshold=0.6):
         super(MovingAverageFilter, self).__init__()
         self.target_column = target_column
         self.threshold = threshold
         self.window_size = window_size
+        self._window = deque(maxlen=window_size)
 
     def process(self, data_store):
         self._data_store = data_store
@@ -37,6 +41,31 @@ class MovingAverageFilter(Processor):
         self._data_ready = True
         self._progress = 100
 
+    def process_part_array(self, index, positions, likelihoods):
+        weights = np.square(np.arange(1, self.window_size + 1))
+        window_begin = 0
+        for i in range(len(likelihoods)):
+            if likelihoods[i] < self.threshold:
+                window_begin = i + 1
+                continue
+            # The window holds previously averaged values, same as the datastore based implementation.
+            begin = max(window_begin, i - self.window_size + 1)
+            positions[i] = np.average(positions[begin:i + 1], weights=weights[:i + 1 - begin], axis=0)
+
+    def push(self, index, skeleton):
+        point = skeleton[self.target_column]
+        if point < self.threshold:
+            self._window.clear()
+        else:
+            self._window.append(np.array(point, dtype=float))
+            point[:] = np.average(self._window, weights=np.square(np.arange(1, len(self._window) + 1)), axis=0)
+            # The window holds averaged values, same as the datastore based implementation.
+            self._window[-1] = np.array(point, dtype=float)
+        return skeleton
+
+    def reset_stream(self):
+        self._window.clear()
+
     def get_output(self):
         if self._data_ready:
             return self._data_store
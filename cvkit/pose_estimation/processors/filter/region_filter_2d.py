@@ -9,10 +9,14 @@ class RegionFilter2D(Processor):
     PROCESSOR_ID = "cvkit_2d_region_filter"
     META_DATA = {'uncertainty_regions': ProcessorMetaData('Uncertain Regions', ProcessorMetaData.NUMPY_ARRAY)}
     PROCESSOR_SUMMARY = "Deletes body parts lying in provided 2D regions of uncertainty."
+    FRAME_INDEPENDENT = True
+    TEMPORAL_SUPPORT = 0
+    STREAMING = True
 
     def __init__(self, uncertainty_regions):
         super(RegionFilter2D, self).__init__()
         self.uncertainty_regions = uncertainty_regions
+        self._regions = None
 
     def process(self, data_store):
         self._data_store = data_store
@@ -37,6 +41,19 @@ class RegionFilter2D(Processor):
         self._data_ready = True
         self._progress = 100
 
+    def push(self, index, skeleton):
+        if self._regions is None:
+            self._regions = np.load(self.uncertainty_regions) if type(self.uncertainty_regions) == str else np.asarray(
+                self.uncertainty_regions)
+        for part in skeleton.body_parts:
+            point = skeleton[part]
+            for uncertainty_region in self._regions:
+                if uncertainty_region[0][0] < point[0] < uncertainty_region[0][1] and \
+                        uncertainty_region[1][0] < point[1] < uncertainty_region[1][1]:
+                    point.likelihood = 0.0
+                    break
+        return skeleton
+
     def get_output(self):
         if self._data_ready:
             return self._data_store
@@ -1,15 +1,17 @@
-from cvkit.pose_estimation.processors.processor_interface import Processor, ProcessorMetaData
-from cvkit.utils import build_intrinsic
-import cv2
 import numpy as np
 
+from cvkit.pose_estimation.processors.processor_interface import Processor, ProcessorMetaData
+
 class UndistortFilter(Processor):
     PROCESSOR_NAME = "Undistort Points"
     PROCESSOR_ID = "cvkit_undistort_pts"
     META_DATA = {'global_config': ProcessorMetaData('Global Config', ProcessorMetaData.GLOBAL_CONFIG),
                  'threshold': ProcessorMetaData('Threshold', ProcessorMetaData.FLOAT, 0.6, 0.0, 1.0),
                  'source_view': ProcessorMetaData('Source Views', ProcessorMetaData.VIEWS,min_val=1,max_val=1)}
-    PROCESSOR_SUMMARY = "Undistorts 2D points using provided distortion coefficients."
+    PROCESSOR_SUMMARY = "Undistorts 2D points using provided distortion coefficients. Missing points (likelihood 0) keep their coordinates."
+    FRAME_INDEPENDENT = True
+    TEMPORAL_SUPPORT = 0
+    STREAMING = True
 
     def __init__(self,global_config,source_view,threshold=0.6):
         super(UndistortFilter, self).__init__()
@@ -22,22 +24,31 @@ class UndistortFilter(Processor):
         self._data_ready = False
         self._progress = 0
         camera = self.global_config.views[self.source_view]
-        matrix = build_intrinsic(camera.f_px,camera.principal_point)
-        distortion = camera.distortion
-        for index, skeleton in data_store.row_iterator():
-            self._progress = int(index / len(self._data_store) * 100)
-            if self.PRINT and self._progress % 10 == 0:
+        for count, part in enumerate(data_store.body_parts):
+            self._progress = int(count / len(data_store.body_parts) * 100)
+            if self.PRINT:
                 print(f'\r {self.PROCESSOR_NAME} {self._progress}% complete', end='')
-            points = skeleton.numpy()[:,:2].reshape(-1,1,2)
-            points = cv2.undistortPoints(points,matrix,distortion,None,matrix)
-            for part,point in zip(skeleton.body_parts,points):
-                skeleton[part][:2] = point[0]
-            data_store.set_skeleton(index,skeleton)
+            index, positions, likelihoods = data_store.get_part_array(part)
+            # Missing points keep their placeholder coordinates.
+            valid = likelihoods > 0
+            positions[valid, :2] = camera.undistort_points(positions[valid, :2])
+            data_store.set_part_array(part, positions, likelihoods, index=index)
         if self.PRINT:
             print(f'\r {self.PROCESSOR_NAME} 100% complete', end='')
         self._data_ready = True
         self._progress = 100
 
+    def push(self, index, skeleton):
+        # Missing points keep their placeholder coordinates, same as process.
+        parts = [part for part in skeleton.body_parts if skeleton[part].likelihood > 0]
+        if len(parts) == 0:
+            return skeleton
+        points = self.global_config.views[self.source_view].undistort_points(
+            np.array([skeleton[part][:2] for part in parts], dtype=float))
+        for part, point in zip(parts, points):
+            skeleton[part][:2] = point
+        return skeleton
+
     def get_output(self):
         if self._data_ready:
             return self._data_store
@@ -14,6 +14,7 @@ class VelocityFilter(Processor):
                  'framerate': ProcessorMetaData('Framerate', ProcessorMetaData.FLOAT)}
     PROCESSOR_SUMMARY = "Filters body parts with velocity higher than the threshold."
     DISTRIBUTED = True
+    STREAMING = True
 
     def __init__(self, target_column, threshold, framerate, threshold_velocity):
         super(VelocityFilter, self).__init__()
@@ -22,6 +23,8 @@ class VelocityFilter(Processor):
         self.framerate = framerate
         self.dt = 1 / framerate
         self.threshold_velocity = threshold_velocity
+        self._previous_point = None
+        self._previous_index = -1
 
     def process(self, data_store):
         self._data_store = data_store
@@ -50,6 +53,35 @@ class VelocityFilter(Processor):
         self._data_ready = True
         self._progress = 100
 
+    def process_part_array(self, index, positions, likelihoods):
+        self._removed = 0
+        previous_point = None
+        previous_index = -1
+        for i in np.flatnonzero(likelihoods > self.threshold):
+            if previous_point is not None:
+                velocity = (positions[i] - previous_point) / ((index[i] - previous_index) * self.dt)
+                if magnitude(velocity) > self.threshold_velocity:
+                    likelihoods[i] = 0.0
+                    self._removed += 1
+                    continue
+            previous_point = positions[i]
+            previous_index = index[i]
+
+    def push(self, index, skeleton):
+        point = skeleton[self.target_column]
+        if point > self.threshold:
+            if self._previous_point is not None and magnitude(
+                    (point - self._previous_point) / ((index - self._previous_index) * self.dt)) > self.threshold_velocity:
+                point.likelihood = 0.0
+            else:
+                self._previous_point = np.array(point, dtype=float)
+                self._previous_index = index
+        return skeleton
+
+    def reset_stream(self):
+        self._previous_point = None
+        self._previous_index = -1
+
     def get_output(self):
         if self._data_ready:
             return self._data_store
@@ -2,7 +2,6 @@ import os
 
 import numpy as np
 
-from cvkit.pose_estimation import Part
 from cvkit.pose_estimation.config import PoseEstimationConfig
 from cvkit.pose_estimation.data_readers import DeeplabcutDataStore
 from cvkit.pose_estimation.processors.processor_interface import Processor, ProcessorMetaData
@@ -38,18 +37,19 @@ class DLTDeconstruction(Processor):
         translation_matrix = np.array(self.global_config.translation_vector) * scale
         self._data_ready = False
         self._progress = 0
-        for index, skeleton in data_store.row_iterator():
-            self._progress = int(index / len(data_store) * 100)
-            if self.PRINT and self._progress % 10 == 0:
+        for count, part in enumerate(data_store.body_parts):
+            self._progress = int(count / len(data_store.body_parts) * 100)
+            if self.PRINT:
                 print(f'\r{self._progress}% complete', end='')
-            for part in data_store.body_parts:
-                if skeleton[part] > 0:
-                    raw_part_3d = rotate(np.array(skeleton[part]) - translation_matrix, rotation_matrix,
-                                         scale, True, axis_alignment_vector=self.global_config.axis_rotation_3D)
-                    parts_2d = np.round(DLTdecon(dlt_coefficients, raw_part_3d, 3, len(self.target_views)))[0,
-                               :].reshape(len(self.target_views), 2)
-                    for part_2d, data_store_2d in zip(parts_2d, out_files):
-                        data_store_2d.set_part(index, Part(part_2d, part, 1.0))
+            index, positions, likelihoods = data_store.get_part_array(part)
+            valid = likelihoods > 0
+            raw_parts_3d = rotate(positions[valid] - translation_matrix, rotation_matrix, scale, True,
+                                  axis_alignment_vector=self.global_config.axis_rotation_3D)
+            # (n, 2 * views) array, every two columns are the (u,v) pairs of one view
+            parts_2d = np.round(DLTdecon(dlt_coefficients, raw_parts_3d, 3, len(self.target_views)))
+            for view, data_store_2d in enumerate(out_files):
+                data_store_2d.set_part_array(part, parts_2d[:, view * 2:view * 2 + 2], np.ones(len(parts_2d)),
+                                             index=index[valid])
         self._progress = 100
         for file in out_files:
             file.save_file()
@@ -1,12 +1,11 @@
 import numpy as np
+import pandas as pd
 
-from cvkit.pose_estimation import Skeleton
 from cvkit.pose_estimation.config import PoseEstimationConfig
-from cvkit.pose_estimation.data_readers import SequentialDatastoreBuilder, CVKitDataStore3D
+from cvkit.pose_estimation.data_readers import CVKitDataStore3D
 from cvkit.pose_estimation.processors.processor_interface import Processor, ProcessorMetaData
-from cvkit.pose_estimation.reconstruction.DLT import DLTrecon
+from cvkit.pose_estimation.reconstruction.DLT import DLTrecon_batch, DLTrecon_robust, DLTreprojection_error
 from cvkit.pose_estimation.utils import rotate
-import pandas as pd
 
 class DLTReconstruction(Processor):
     PROCESSOR_NAME = "Reconstruction"
@@ -14,52 +13,160 @@ class DLTReconstruction(Processor):
     META_DATA = {'global_config': ProcessorMetaData('Global Config', ProcessorMetaData.GLOBAL_CONFIG),
                  'source_views': ProcessorMetaData('Source Views', ProcessorMetaData.VIEWS),
                  'data_readers': ProcessorMetaData('DataReaders', ProcessorMetaData.FILE_MAP),
-                 'threshold': ProcessorMetaData('Threshold', ProcessorMetaData.FLOAT, 0.6, 0.0, 1.0)}
+                 'threshold': ProcessorMetaData('Threshold', ProcessorMetaData.FLOAT, 0.6, 0.0, 1.0),
+                 'compute_errors': ProcessorMetaData('Compute Reprojection Errors', ProcessorMetaData.BOOLEAN, False),
+                 'error_scale': ProcessorMetaData('Reprojection Error Scale (px)', ProcessorMetaData.FLOAT, None, 0.0,
+                                                  tooltip='If set, the likelihood of a 3D point is exp(-mean reprojection error / scale) instead of the minimum 2D likelihood.'),
+                 'error_file': ProcessorMetaData('Reprojection Error File', ProcessorMetaData.FILE_PATH, None,
+                                                 regex='*.npz'),
+                 'inlier_threshold': ProcessorMetaData('Inlier Threshold (px)', ProcessorMetaData.FLOAT, 10.0, 0.0,
+                                                       tooltip='Maximum reprojection error of a view used by the robust_subset reconstruction algorithm.')}
     PROCESSOR_SUMMARY = "Performs 3D reconstruction from selected source views."
+    FRAME_INDEPENDENT = True
+    USES_INPUT = False
+    TEMPORAL_SUPPORT = 0
+    #: Number of frames triangulated per stacked SVD call, limits the memory of the linear systems.
+    BATCH_SIZE = 4096
+    #: Maximum number of view pairs evaluated by the robust_subset algorithm, i.e. all pairs of up to 8 views.
+    MAX_SUBSET_CANDIDATES = 28
 
-    def __init__(self, global_config: PoseEstimationConfig, source_views, data_readers, threshold):
+    def __init__(self, global_config: PoseEstimationConfig, source_views, data_readers, threshold, compute_errors=False,
+                 error_scale=None, error_file=None, inlier_threshold=10.0):
         super(DLTReconstruction, self).__init__()
         self.global_config = global_config
         self.threshold = threshold
         self.source_views = source_views
         self.data_readers = data_readers
+        self.compute_errors = compute_errors
+        self.error_scale = error_scale
+        self.error_file = error_file
+        self.inlier_threshold = inlier_threshold
+        if self.error_file is not None:
+            # Chunks would overwrite the file of each other.
+            self.FRAME_INDEPENDENT = False
+            self.CACHEABLE = False
+        if any(self._is_synchronized(view) for view in self.source_views):
+            # Frames of a chunk are shifted in the views, the readers cannot be split at the same frame indices.
+            self.FRAME_INDEPENDENT = False
         self._out_csv = None
+        self._reprojection_errors = None
+        self._likelihoods = None
 
     def process(self, data_store):
-        builder = SequentialDatastoreBuilder(CVKitDataStore3D.FLAVOR,self.global_config.body_parts)
-        self.data_readers = [self.data_readers[source_view] for source_view in self.source_views]
+        body_parts = self.global_config.body_parts
+        data_readers = [self.data_readers[source_view] for source_view in self.source_views]
         dlt_coefficients = np.array([self.global_config.views[view].dlt_coefficients for view in self.source_views])
         rotation_matrix = np.array(self.global_config.rotation_matrix)
         scale = self.global_config.computed_scale
         #Scaled translation vector
         translation_vector = np.array(self.global_config.translation_vector) * scale
-        length = len(min(self.data_readers, key=lambda x: len(x)))
+        begin, end = self._frame_range if self._frame_range is not None else (0, self.get_frame_count(data_store))
+        length = end - begin
         self._data_ready = False
         self._progress = 0
-        for iterator in range(length):
-            self._progress = int(iterator / length * 100)
-            skeleton_2D = [reader.get_skeleton(iterator) for reader in self.data_readers]
-            recon_data = {}
-            prob_data = {}
-            for name in self.global_config.body_parts:
-                subset = [sk[name] for sk in skeleton_2D]
-                dlt_subset = dlt_coefficients.copy()
-                indices = [subset[i].likelihood >= self.threshold for i in range(len(subset))]
-                if (self.global_config.reconstruction_algorithm == "auto_subset" and sum(indices) >= 2) or sum(
-                        indices) == len(
-                    self.data_readers):
-                    dlt_subset = dlt_subset[indices, :]
-                    subset = [element for i, element in enumerate(subset) if indices[i]]
-                    recon_data[name] = rotate(DLTrecon(3, len(subset), dlt_subset, subset), rotation_matrix,
-                                              scale,
-                                              axis_alignment_vector=self.global_config.axis_rotation_3D) + translation_vector
-                    prob_data[name] = min(subset, key=lambda x: x.likelihood).likelihood
-            skeleton_3D = Skeleton(self.global_config.body_parts, recon_data, prob_data)
-            builder.append(skeleton_3D)
-        self._out_csv = builder.get_datastore()
+        # Observations of all frames, parts and views. Frames missing in a reader keep zero likelihood.
+        observations = np.zeros((length, len(body_parts), len(data_readers), 2))
+        likelihoods = np.zeros((length, len(body_parts), len(data_readers)))
+        for view, reader in enumerate(data_readers):
+            synchronized = self._is_synchronized(self.source_views[view])
+            frames = self._get_view_frames(self.source_views[view], np.arange(begin, end))
+            for part, name in enumerate(body_parts):
+                index, positions, part_likelihoods = reader.get_part_array(name)
+                index = index.astype(np.int64)
+                if synchronized:
+                    # Gathers the synchronized frame of the view for every frame of the project.
+                    order = np.argsort(index, kind='stable')
+                    index, positions, part_likelihoods = index[order], positions[order], part_likelihoods[order]
+                    position = np.minimum(np.searchsorted(index, frames), max(len(index) - 1, 0))
+                    selection = np.flatnonzero(index[position] == frames) if len(index) > 0 else np.array([], dtype=int)
+                    observations[selection, part, view] = positions[position[selection], :2]
+                    likelihoods[selection, part, view] = part_likelihoods[position[selection]]
+                else:
+                    selection = (index >= begin) & (index < end)
+                    observations[index[selection] - begin, part, view] = positions[selection, :2]
+                    likelihoods[index[selection] - begin, part, view] = part_likelihoods[selection]
+        valid = likelihoods >= self.threshold
+        count = valid.sum(axis=2)
+        algorithm = self.global_config.reconstruction_algorithm
+        if algorithm in ["auto_subset", "robust_subset", "weighted_subset"]:
+            selected = count >= 2
+        else:
+            selected = count == len(data_readers)
+        valid &= selected[..., None]
+        probabilities = np.zeros(selected.shape)
+        compute_errors = self.compute_errors or self.error_scale is not None or self.error_file is not None
+        errors = np.full(valid.shape, np.nan) if compute_errors else None
+        cells = np.full((length, len(body_parts)), None, dtype=object)
+        for batch in range(0, length, self.BATCH_SIZE):
+            self._progress = int(batch / length * 100)
+            frames = slice(batch, batch + self.BATCH_SIZE)
+            if algorithm == "robust_subset":
+                points, valid[frames] = DLTrecon_robust(dlt_coefficients, observations[frames], valid[frames],
+                                                        self.inlier_threshold, self.MAX_SUBSET_CANDIDATES)
+                selected[frames] = np.any(valid[frames], axis=2)
+            elif algorithm == "weighted_subset":
+                points = DLTrecon_batch(dlt_coefficients, observations[frames], valid[frames], likelihoods[frames])
+            else:
+                points = DLTrecon_batch(dlt_coefficients, observations[frames], valid[frames])
+            probabilities[frames] = np.where(selected[frames],
+                                             np.min(np.where(valid[frames], likelihoods[frames], np.inf), axis=2), 0.0)
+            if compute_errors:
+                errors[frames] = DLTreprojection_error(dlt_coefficients, points, observations[frames], valid[frames])
+            points = rotate(points, rotation_matrix, scale,
+                            axis_alignment_vector=self.global_config.axis_rotation_3D) + translation_vector
+            for frame, part in np.argwhere(selected[frames] & (probabilities[frames] > 0)):
+                cells[batch + frame, part] = str(points[frame, part].tolist())
+        if self.error_scale is not None:
+            mean_errors = np.sum(np.where(valid, errors, 0.0), axis=2) / np.maximum(valid.sum(axis=2), 1)
+            probabilities = np.where(selected, np.exp(-mean_errors / self.error_scale), 0.0)
+        self._reprojection_errors = errors
+        self._likelihoods = probabilities
+        if self.error_file is not None:
+            np.savez(self.error_file, errors=errors, likelihoods=probabilities, views=np.array(self.source_views),
+                     body_parts=np.array(body_parts), begin=begin)
+        self._out_csv = CVKitDataStore3D(body_parts, None)
+        self._out_csv.data = pd.DataFrame(cells, columns=body_parts).assign(behaviour='')
         self._progress = 100
         self._data_ready = True
 
+    def get_reprojection_errors(self):
+        """
+        :return: Reprojection error of every frame, body part and source view (TxPxV), NaN where the view did not contribute.
+            None if errors were not computed.
+        :rtype: numpy.ndarray
+        """
+        return self._reprojection_errors if self._data_ready else None
+
+    def get_likelihoods(self):
+        """
+        :return: Likelihood of every reconstructed point (TxP). Minimum likelihood of the contributing views or derived
+            from the reprojection error if error_scale is set. Zero for points that were not reconstructed.
+        :rtype: numpy.ndarray
+        """
+        return self._likelihoods if self._data_ready else None
+
+    def _is_synchronized(self, view):
+        camera = self.global_config.views.get(view)
+        return camera is not None and (camera.frame_offset != 0 or camera.frame_drift != 0)
+
+    def _get_view_frames(self, view, frames):
+        # Frame of the view corresponding to each frame of the project, see CameraViews.frame_offset.
+        if not self._is_synchronized(view):
+            return frames
+        camera = self.global_config.views[view]
+        return np.rint(frames * (1 + camera.frame_drift) + camera.frame_offset).astype(np.int64)
+
+    def get_frame_count(self, data_store):
+        counts = []
+        for view in self.source_views:
+            count = len(self.data_readers[view])
+            if self._is_synchronized(view):
+                camera = self.global_config.views[view]
+                # Last project frame whose synchronized frame exists in the view.
+                count = max(0, int(np.floor((count - 0.5 - camera.frame_offset) / (1 + camera.frame_drift))) + 1)
+            counts.append(count)
+        return min(counts)
+
     def get_output(self):
         if self._data_ready:
             return self._out_csv
@@ -1,6 +1,8 @@
 from abc import ABC, abstractmethod
 
+from cvkit.pose_estimation import Skeleton
 from cvkit.pose_estimation.data_readers import DataStoreInterface
+from cvkit.pose_estimation.instrumentation import instrument_process
 
 
 class ProcessorMetaData:
@@ -56,16 +58,84 @@ class Processor(ABC):
     PRINT = False
     META_DATA = None #: Processor parameters' metadata. UI generator uses this information to generate a form.
     DISTRIBUTED = False #: Indicates whether the processor operates at body part level or skeleton level. If true, this processor can be parallelized for each body part.
+    FRAME_INDEPENDENT = False #: Indicates whether each frame is processed independently of other frames. If true, this processor can be parallelized over chunks of frames.
+    USES_INPUT = True #: Indicates whether :py:meth:`process` reads the input datastore. Processors generating their data from FILE_MAP datastores set it to False.
+    TEMPORAL_SUPPORT = None #: Number of neighbouring frames on each side that influence the output of a frame. None indicates an unbounded support (e.g. recursive filters).
+    CACHEABLE = True #: Indicates whether the output is fully determined by the input and the parameters. Processors with side effects (e.g. writing files) should set it to False.
+    STREAMING = False #: Indicates whether the processor is causal and implements :py:meth:`push` for processing one frame at a time.
+    INSTRUMENTATION = None #: :py:class:`~cvkit.pose_estimation.instrumentation.Instrumentation` recording every :py:meth:`process` call. Disabled if None.
 
     def __init__(self):
         self._progress = 0
         self._data_store = None
         self._data_ready = False
+        self._frame_range = None
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        process = cls.__dict__.get('process', None)
+        if callable(process) and not getattr(process, '__isabstractmethod__', False) and not getattr(
+                process, '__instrumented__', False):
+            cls.process = instrument_process(process)
 
     @abstractmethod
     def process(self, data_store: DataStoreInterface):
         pass
 
+    def process_part_array(self, index, positions, likelihoods):
+        """Array kernel of a :py:attr:`DISTRIBUTED` processor. Processes the complete data of the target body part in-place.
+        Implementing this method allows executors to run the processor on Numpy arrays without accessing the datastore.
+        Setting the likelihood to 0 indicates that the part was deleted.
+
+        :param index: Numpy array of n frame indices.
+        :param positions: nxd Numpy array of positions.
+        :param likelihoods: Numpy array of n likelihood values.
+        """
+        raise NotImplementedError(f"{self.PROCESSOR_NAME} does not support array processing")
+
+    def push(self, index, skeleton: Skeleton):
+        """Streaming interface of :py:attr:`STREAMING` processors. Processes a single frame using bounded internal state
+        built from the previously pushed frames. The skeleton may be modified in-place.
+
+        :param index: Frame index
+        :param skeleton: Pose of the frame
+        :type skeleton: :py:class:`~cvkit.pose_estimation.skeleton.Skeleton`
+        :return: Processed skeleton or None if the frame is dropped.
+        :rtype: :py:class:`~cvkit.pose_estimation.skeleton.Skeleton`
+        """
+        raise NotImplementedError(f"{self.PROCESSOR_NAME} does not support streaming")
+
+    def reset_stream(self):
+        """Clears the internal state built by :py:meth:`push`, e.g. when a new recording starts."""
+        pass
+
+    def get_temporal_support(self):
+        """Radius of frames that influence the output of a single frame. Executors use it to reprocess only the
+        neighbourhood of modified frames. Processors whose support depends on their parameters override this method.
+
+        :return: Number of frames on each side or None if the support is unbounded.
+        :rtype: int
+        """
+        return self.TEMPORAL_SUPPORT
+
+    def get_frame_count(self, data_store: DataStoreInterface):
+        """Number of frames processed by a :py:attr:`FRAME_INDEPENDENT` processor. Executors use it to split the frames into chunks.
+
+        :param data_store: Input datastore
+        :return: Number of frames
+        :rtype: int
+        """
+        return len(data_store)
+
+    def set_frame_range(self, begin, end):
+        """Restricts a :py:attr:`FRAME_INDEPENDENT` processor that generates new data to frames in [begin, end).
+        Processors modifying the input datastore process the chunk they receive and can ignore it.
+
+        :param begin: First frame index
+        :param end: Last frame index (non-inclusive)
+        """
+        self._frame_range = (begin, end)
+
     def get_progress(self):
         return self._progress
 
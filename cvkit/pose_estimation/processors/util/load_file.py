@@ -9,6 +9,7 @@ class LoadFile(Processor):
     META_DATA = {'data_store_dict': ProcessorMetaData('Input File', ProcessorMetaData.DATA_STORE, serialize=False),
                  'global_config': ProcessorMetaData('Global Config', ProcessorMetaData.GLOBAL_CONFIG), }
     PROCESSOR_SUMMARY = "Utility processor for loading initial data file."
+    CACHEABLE = False
 
     def process(self, data_store: DataStoreInterface):
         self._data_store = initialize_datastore_reader(self.global_config.body_parts, self.data_store_dict['path'],
@@ -7,6 +7,7 @@ class SaveFile(Processor):
     PROCESSOR_ID = "cvkit_save_file"
     META_DATA = {'path': ProcessorMetaData('File Path', ProcessorMetaData.FILE_PATH, regex='*.csv', serialize=False)}
     PROCESSOR_SUMMARY = "Utility processor for saving the final data file."
+    CACHEABLE = False
 
     def process(self, data_store: DataStoreInterface):
         self._data_store = data_store
@@ -60,7 +60,78 @@ This code is based on different implementations and teaching material on DLT
 
 # Marcos Duarte - [EMAIL PROTECTED] - 04dec08
 
+import itertools
+
 import numpy as np
+from scipy.optimize import least_squares
+from scipy.sparse import coo_matrix
+
+
+def _normalization(points, valid):
+    # Similarity transforms moving the valid points of each view to the origin with mean distance sqrt(dimensions).
+    count = np.maximum(valid.sum(axis=0), 1)[:, None]
+    dimensions = points.shape[-1]
+    mean = (points * valid[..., None]).sum(axis=0) / count
+    distance = (np.linalg.norm(points - mean, axis=-1) * valid).sum(axis=0) / count[:, 0]
+    scale = np.sqrt(dimensions) / np.where(distance > 0, distance, 1.0)
+    T = np.zeros((len(mean), dimensions + 1, dimensions + 1))
+    T[:, np.arange(dimensions), np.arange(dimensions)] = scale[:, None]
+    T[:, :dimensions, dimensions] = -mean * scale[:, None]
+    T[:, dimensions, dimensions] = 1
+    return T
+
+
+def DLTcalib(xyz, uvs, valid=None):
+    '''
+    Camera calibration by DLT using known points in the object space and their coordinates in the image space.
+
+    The linear systems of all views are built with broadcasting and solved with a single stacked SVD call. Coordinates
+     are normalized for numerical stability (Hartley normalization).
+    Inputs:
+     xyz are the coordinates in the object space of the calibration points with shape (n, 3).
+     uvs are the coordinates in the image space with shape (n, 2) for one view or (n, nc, 2) for nc views.
+     valid is an optional boolean mask of shape (n,) or (n, nc). Every view requires at least 6 valid points that are
+      not coplanar.
+    Outputs:
+     Ls: array of 12 parameters (L12 = 1) with shape (12,) for one view or (nc, 12), the same format as
+      :py:attr:`~cvkit.pose_estimation.config.CameraViews.dlt_coefficients`.
+     err: mean reprojection error in pixels of each view, a float for one view or shape (nc,).
+    '''
+    xyz = np.asarray(xyz, dtype=float)
+    uvs = np.asarray(uvs, dtype=float)
+    single = uvs.ndim == 2
+    if single:
+        uvs = uvs[:, None, :]
+    n, nc = uvs.shape[:2]
+    if xyz.shape != (n, 3):
+        raise ValueError('Number of points in the object space (%d) and image space (%d) are different.' % (len(xyz), n))
+    valid = np.ones((n, nc), dtype=bool) if valid is None else np.asarray(valid, dtype=bool).reshape(n, -1)
+    valid = np.broadcast_to(valid & np.all(np.isfinite(uvs), axis=-1) & np.all(np.isfinite(xyz), axis=-1)[:, None],
+                            (n, nc))
+    if np.any(valid.sum(axis=0) < 6):
+        raise ValueError('At least 6 calibration points are needed for each view.')
+    xyz_view = np.where(valid[..., None], xyz[:, None, :], 0.0)
+    uvs = np.where(valid[..., None], uvs, 0.0)
+    T = _normalization(xyz_view, valid)
+    U = _normalization(uvs, valid)
+    X = np.einsum('cij,ncj->nci', T[:, :3, :], np.concatenate([xyz_view, np.ones((n, nc, 1))], axis=-1))
+    X = np.concatenate([X, np.ones((n, nc, 1))], axis=-1)
+    uv = np.einsum('cij,ncj->nci', U[:, :2, :2], uvs) + U[:, :2, 2]
+    M = np.zeros((nc, n, 2, 12))
+    X = X.transpose(1, 0, 2) * valid.T[..., None]
+    uv = uv.transpose(1, 0, 2)
+    M[:, :, 0, 0:4] = X
+    M[:, :, 0, 8:12] = -uv[..., 0, None] * X
+    M[:, :, 1, 4:8] = X
+    M[:, :, 1, 8:12] = -uv[..., 1, None] * X
+    _, _, Vh = np.linalg.svd(M.reshape(nc, 2 * n, 12), full_matrices=False)
+    P = np.linalg.inv(U) @ Vh[:, -1, :].reshape(nc, 3, 4) @ T
+    Ls = P.reshape(nc, 12) / P[:, 2, 3, None]
+    projected = np.einsum('cij,nj->nci', P / P[:, 2:3, 3:4], np.concatenate([xyz, np.ones((n, 1))], axis=-1))
+    with np.errstate(invalid='ignore'):
+        errors = np.linalg.norm(projected[..., :2] / projected[..., 2:] - uvs, axis=-1)
+    err = np.where(valid, errors, 0.0).sum(axis=0) / valid.sum(axis=0)
+    return (Ls[0], err[0]) if single else (Ls, err)
 
 
 def DLTrecon(nd, nc, Ls, uvs):
@@ -121,6 +192,225 @@ def DLTrecon(nd, nc, Ls, uvs):
     return xyz
 
 
+def DLTrecon_batch(Ls, uvs, valid=None, weights=None):
+    '''
+    Batched 3D reconstruction of object points from image points based on the DLT parameters.
+
+    Same as DLTrecon with nd=3, but the linear systems of all points are built with broadcasting and solved with a
+    single stacked SVD call.
+    Inputs:
+     Ls (array param_type) are the camera calibration parameters of each camera, one row of 12 parameters per view.
+     uvs are the coordinates of the points in the image 2D space of each camera, with shape (..., nc, 2), e.g.
+      (frames, parts, views, 2).
+     valid is an optional boolean mask of shape (..., nc). Invalid views are excluded from the reconstruction.
+     weights is an optional array of shape (..., nc). The two rows of each view are scaled by its weight, i.e. the
+      weighted least squares solution is computed (e.g. with keypoint likelihoods as weights).
+    Outputs:
+     xyz: point coordinates in space with shape (..., 3). Points with less than two valid views are NaN.
+    '''
+    Ls = np.asarray(Ls, dtype=float)
+    uvs = np.asarray(uvs, dtype=float)
+    nc = uvs.shape[-2]
+    if Ls.shape != (nc, 12):
+        raise ValueError('Number of views (%d) and number of sets of camera calibration parameters (%d) are different.' % (
+            nc, Ls.shape[0]))
+    if nc < 2:
+        raise ValueError('At least two sets of camera calibration parameters are needed for 3D point reconstruction.')
+    batch_shape = uvs.shape[:-2]
+    uvs = uvs.reshape(-1, nc, 2)
+    valid = np.ones(uvs.shape[:-1], dtype=bool) if valid is None else np.asarray(valid, dtype=bool).reshape(-1, nc)
+    # Rows of invalid views are zero, they do not change the right singular vectors of the system.
+    uvs = np.where(valid[..., None], uvs, 0.0)
+    M = np.empty((len(uvs), nc, 2, 4))
+    M[:, :, 0, :] = Ls[:, 0:4] - uvs[:, :, 0, None] * Ls[:, 8:12]
+    M[:, :, 1, :] = Ls[:, 4:8] - uvs[:, :, 1, None] * Ls[:, 8:12]
+    M *= valid[:, :, None, None]
+    if weights is not None:
+        M *= np.asarray(weights, dtype=float).reshape(-1, nc)[:, :, None, None]
+    xyz = np.full((len(uvs), 3), np.nan)
+    solvable = valid.sum(axis=1) >= 2
+    if np.any(solvable):
+        U, S, Vh = np.linalg.svd(M[solvable].reshape(-1, 2 * nc, 4), full_matrices=False)
+        xyz[solvable] = np.round(Vh[:, -1, 0:-1] / Vh[:, -1, -1:], 4)
+    return xyz.reshape(*batch_shape, 3)
+
+
+def DLTreprojection_error(Ls, xyz, uvs, valid=None):
+    '''
+    Reprojection error of reconstructed points.
+    Inputs:
+     Ls (array param_type) are the camera calibration parameters of each camera, one row of 12 parameters per view.
+     xyz are the reconstructed points with shape (..., 3).
+     uvs are the observed coordinates with shape (..., nc, 2).
+     valid is an optional boolean mask of shape (..., nc).
+    Outputs:
+     errors: Euclidean distance in pixels between observation and projection with shape (..., nc). NaN for invalid views.
+    '''
+    Ls = np.asarray(Ls, dtype=float)
+    xyz = np.asarray(xyz, dtype=float)
+    nc = len(Ls)
+    projected = DLTdecon(Ls, xyz.reshape(-1, 3), 3, nc).reshape(*xyz.shape[:-1], nc, 2)
+    errors = np.linalg.norm(projected - uvs, axis=-1)
+    return errors if valid is None else np.where(valid, errors, np.nan)
+
+
+def DLTrecon_robust(Ls, uvs, valid=None, inlier_threshold=10.0, max_candidates=None, seed=0):
+    '''
+    Robust batched 3D reconstruction of object points, a RANSAC scheme with pairs of views as minimal samples.
+
+    Every pair of valid views is triangulated for all points at once and scored by the number of valid views whose
+    reprojection error is below the inlier threshold (ties are broken by the sum of the inlier errors). The points are
+    then reconstructed from the inliers of their best pair. Points without a pair of consistent views are not reconstructed.
+    Inputs:
+     Ls (array param_type) are the camera calibration parameters of each camera, one row of 12 parameters per view.
+     uvs are the coordinates of the points in the image 2D space of each camera, with shape (..., nc, 2).
+     valid is an optional boolean mask of shape (..., nc).
+     inlier_threshold is the maximum reprojection error of an inlier in pixels.
+     max_candidates limits the number of evaluated pairs, a random subset of the pairs is used for many views.
+     seed initializes the random selection of pairs.
+    Outputs:
+     xyz: point coordinates in space with shape (..., 3), NaN if not reconstructed.
+     inliers: boolean mask of the views used for each point with shape (..., nc).
+    '''
+    uvs = np.asarray(uvs, dtype=float)
+    nc = uvs.shape[-2]
+    batch_shape = uvs.shape[:-2]
+    uvs = uvs.reshape(-1, nc, 2)
+    valid = np.ones(uvs.shape[:-1], dtype=bool) if valid is None else np.asarray(valid, dtype=bool).reshape(-1, nc)
+    pairs = list(itertools.combinations(range(nc), 2))
+    if max_candidates is not None and len(pairs) > max_candidates:
+        selection = np.random.default_rng(seed).choice(len(pairs), max_candidates, replace=False)
+        pairs = [pairs[i] for i in sorted(selection)]
+    Ls = np.asarray(Ls, dtype=float)
+    valid_count = valid.sum(axis=1)
+    best_count = np.zeros(len(uvs), dtype=int)
+    best_error = np.full(len(uvs), np.inf)
+    best_inliers = np.zeros_like(valid)
+    # Points whose valid views are all inliers cannot improve, the remaining pairs are only evaluated for the others.
+    active = valid_count >= 2
+    for pair in pairs:
+        indices = np.flatnonzero(active & valid[:, pair[0]] & valid[:, pair[1]])
+        if len(indices) == 0:
+            continue
+        xyz = DLTrecon_batch(Ls[list(pair)], uvs[indices][:, pair])
+        errors = DLTreprojection_error(Ls, xyz, uvs[indices], valid[indices])
+        inliers = errors < inlier_threshold
+        count = inliers.sum(axis=1)
+        total = np.where(inliers, errors, 0.0).sum(axis=1)
+        better = (count >= 2) & ((count > best_count[indices]) | (
+                (count == best_count[indices]) & (total < best_error[indices])))
+        best_count[indices[better]] = count[better]
+        best_error[indices[better]] = total[better]
+        best_inliers[indices[better]] = inliers[better]
+        active &= best_count < valid_count
+    xyz = DLTrecon_batch(Ls, uvs, best_inliers)
+    return xyz.reshape(*batch_shape, 3), best_inliers.reshape(*batch_shape, nc)
+
+
+def DLTrefine(Ls, uvs, valid=None, xyz=None, fixed=None, loss='linear', ftol=1e-4, max_nfev=None):
+    '''
+    Nonlinear refinement of the DLT parameters of all views (bundle adjustment).
+
+    The parameters of all views and the coordinates of the points are optimized jointly with
+     :py:func:`scipy.optimize.least_squares` by minimizing the reprojection errors of all observations. Every residual
+     depends on 11 parameters of its view and 3 coordinates of its point, the analytic Jacobian is built as a sparse matrix.
+    Points with known coordinates (e.g. the calibration points of :py:func:`DLTcalib`) are fixed and define the coordinate
+     system, the remaining points (e.g. background or wand points) only need to be observed in at least two views.
+    Inputs:
+     Ls (array param_type) are the initial camera calibration parameters, one row of 12 parameters per view.
+     uvs are the coordinates of the points in the image 2D space of each camera, with shape (n, nc, 2).
+     valid is an optional boolean mask of shape (n, nc).
+     xyz are optional initial coordinates of the points with shape (n, 3). Points that are not fixed and NaN are
+      triangulated from Ls.
+     fixed is an optional boolean mask of shape (n,) of points whose coordinates are known.
+     loss is the loss function of least_squares, a robust loss (e.g. 'huber') reduces the influence of outliers.
+     ftol is the relative change of the cost that terminates the optimization. Robust losses converge slowly, changes
+      below 1e-4 have no practical effect on the reconstruction.
+     max_nfev is the maximum number of function evaluations.
+    Outputs:
+     Ls: refined calibration parameters with shape (nc, 12) and L12 = 1.
+     xyz: refined coordinates of the points with shape (n, 3), NaN for points that could not be estimated.
+     err: mean reprojection error in pixels of each view after the refinement with shape (nc,).
+    '''
+    Ls = np.asarray(Ls, dtype=float)
+    Ls = Ls / Ls[:, 11:12]
+    uvs = np.asarray(uvs, dtype=float)
+    n, nc = uvs.shape[:2]
+    valid = np.ones((n, nc), dtype=bool) if valid is None else np.asarray(valid, dtype=bool).reshape(n, nc)
+    valid = valid & np.all(np.isfinite(uvs), axis=-1)
+    fixed = np.zeros(n, dtype=bool) if fixed is None else np.asarray(fixed, dtype=bool)
+    xyz = np.full((n, 3), np.nan) if xyz is None else np.array(xyz, dtype=float)
+    unknown = ~fixed & np.any(~np.isfinite(xyz), axis=-1)
+    if np.any(unknown):
+        xyz[unknown] = DLTrecon_batch(Ls, uvs[unknown], valid[unknown])
+    # Free points are only observable from two views, fixed points from one.
+    usable = np.all(np.isfinite(xyz), axis=-1) & (valid.sum(axis=1) >= np.where(fixed, 1, 2))
+    valid &= usable[:, None]
+    free = np.flatnonzero(usable & ~fixed)
+    free_index = np.full(n, -1)
+    free_index[free] = np.arange(len(free))
+    # The optimization runs in normalized coordinates, the DLT parameters differ by orders of magnitude otherwise.
+    T = _normalization(np.where(usable[:, None], xyz, 0.0)[:, None, :], usable[:, None])[0]
+    U = _normalization(np.where(valid[..., None], uvs, 0.0), valid)
+    P = U @ Ls.reshape(nc, 3, 4) @ np.linalg.inv(T)
+    P /= P[:, 2:3, 3:4]
+    xyz_normalized = np.where(usable[:, None], xyz, 0.0) @ T[:3, :3].T + T[:3, 3]
+    point, view = np.nonzero(valid)
+    observed = np.einsum('nij,nj->ni', U[view, :2, :2], uvs[point, view]) + U[view, :2, 2]
+    # Residuals are scaled back to pixels, the loss function and the errors refer to the image space.
+    pixel_scale = 1 / U[view, 0, 0]
+    is_free = free_index[point] >= 0
+    rows = np.arange(len(point))
+    view_columns = view[:, None] * 11 + np.arange(11)
+    point_columns = 11 * nc + free_index[point[is_free], None] * 3 + np.arange(3)
+
+    def unpack(parameters):
+        L = np.concatenate([parameters[:11 * nc].reshape(nc, 11), np.ones((nc, 1))], axis=1)
+        points = xyz_normalized.copy()
+        points[free] = parameters[11 * nc:].reshape(-1, 3)
+        return L, points
+
+    def project(parameters):
+        L, points = unpack(parameters)
+        X = np.concatenate([points[point], np.ones((len(point), 1))], axis=1)
+        L = L[view]
+        d = np.einsum('ij,ij->i', L[:, 8:12], X)
+        uv = np.stack([np.einsum('ij,ij->i', L[:, 0:4], X), np.einsum('ij,ij->i', L[:, 4:8], X)], axis=1) / d[:, None]
+        return L, X, d, uv
+
+    def residuals(parameters):
+        return ((project(parameters)[3] - observed) * pixel_scale[:, None]).ravel()
+
+    def jacobian(parameters):
+        L, X, d, uv = project(parameters)
+        X = X * (pixel_scale / d)[:, None]
+        # Derivatives of u = (L1..L4 . X) / (L9..L12 . X), analogous for v.
+        view_values = np.zeros((len(point), 2, 11))
+        view_values[:, 0, 0:4] = X
+        view_values[:, 1, 4:8] = X
+        view_values[:, :, 8:11] = -uv[:, :, None] * X[:, None, :3]
+        point_values = (np.stack([L[:, 0:3], L[:, 4:7]], axis=1) - uv[:, :, None] * L[:, None, 8:11]) * (
+                pixel_scale / d)[:, None, None]
+        data = [view_values.ravel(), point_values[is_free].ravel()]
+        row_indices = [np.repeat(2 * rows[:, None] + np.arange(2), 11),
+                       np.repeat(2 * rows[is_free, None] + np.arange(2), 3)]
+        column_indices = [np.tile(view_columns, 2).ravel(), np.tile(point_columns, 2).ravel()]
+        return coo_matrix((np.concatenate(data), (np.concatenate(row_indices), np.concatenate(column_indices))),
+                          shape=(2 * len(point), 11 * nc + 3 * len(free))).tocsr()
+
+    initial = np.concatenate([P.reshape(nc, 12)[:, :11].ravel(), xyz_normalized[free].ravel()])
+    result = least_squares(residuals, initial, jac=jacobian, method='trf', tr_solver='lsmr', loss=loss, ftol=ftol,
+                           max_nfev=max_nfev)
+    L, points = unpack(result.x)
+    P = np.linalg.inv(U) @ L.reshape(nc, 3, 4) @ T
+    Ls = P.reshape(nc, 12) / P[:, 2, 3, None]
+    xyz[free] = (points[free] - T[:3, 3]) / T[0, 0]
+    xyz[~usable] = np.nan
+    errors = np.linalg.norm(result.fun.reshape(-1, 2), axis=1)
+    err = np.bincount(view, weights=errors, minlength=nc) / np.maximum(np.bincount(view, minlength=nc), 1)
+    return Ls, xyz, err
+
+
 # Original Author: Yiwen Gu (yiweng@bu.edu)
 def DLTdecon(Ls, xyz, nd=3, nc=2):
     '''
@@ -10,7 +10,7 @@ from scipy.spatial.transform import Rotation
 from cvkit.pose_estimation import Part
 from cvkit.pose_estimation.config import PoseEstimationConfig
 from cvkit.pose_estimation.processors.util import ClusterAnalysis
-from cvkit.pose_estimation.reconstruction.DLT import DLTrecon
+from cvkit.pose_estimation.reconstruction.DLT import DLTrecon, DLTcalib, DLTrefine
 from cvkit.pose_estimation.utils import rotate, magnitude, undistort_point
 from cvkit.utils import build_intrinsic
 import cv2
@@ -98,7 +98,63 @@ def update_alignment_matrices(config: PoseEstimationConfig, source_views: list):
     return True
 
 
-def pick_calibration_candidates(config: PoseEstimationConfig, data_stores: list, resolution, bin_size,max_frames=20):
+def _get_part_positions(data_store, part, indices):
+    # Positions of a part at the given frame indices, NaN for missing frames.
+    index, positions, _ = data_store.get_part_array(part)
+    order = np.argsort(index, kind='stable')
+    index, positions = index[order].astype(np.int64), positions[order, :2]
+    output = np.full((len(indices), 2), np.nan)
+    if len(index) > 0:
+        location = np.minimum(np.searchsorted(index, indices), len(index) - 1)
+        found = index[location] == indices
+        output[found] = positions[location[found]]
+    return output
+
+
+def farthest_point_sampling(features, count):
+    """Greedily selects points that are farthest from all previously selected points, starting with the point farthest
+    from the centroid.
+
+    :param features: nxd array of points
+    :type features: numpy.ndarray
+    :param count: Number of selected points
+    :type count: int
+    :return: Indices of the selected points
+    :rtype: numpy.ndarray
+    """
+    features = np.asarray(features, dtype=float)
+    count = min(count, len(features))
+    if count == 0:
+        return np.array([], dtype=int)
+    selected = np.empty(count, dtype=int)
+    selected[0] = np.argmax(np.sum((features - features.mean(axis=0)) ** 2, axis=1))
+    distances = np.sum((features - features[selected[0]]) ** 2, axis=1)
+    for i in range(1, count):
+        selected[i] = np.argmax(distances)
+        distances = np.minimum(distances, np.sum((features - features[selected[i]]) ** 2, axis=1))
+    return selected
+
+
+def pick_calibration_candidates(config: PoseEstimationConfig, data_stores: list, resolution, bin_size, max_frames=20,
+                                sampling='random'):
+    """Selects frames for the calibration in which the first body part is accurately detected in all views. The frame
+    is split into spatial bins of the first view and the first accurate frame of every bin is a candidate.
+
+    :param config: Project config
+    :type config: :py:class:`~cvkit.pose_estimation.config.PoseEstimationConfig`
+    :param data_stores: 2D pose data of all views, stats are computed if required.
+    :type data_stores: list[:py:class:`~cvkit.pose_estimation.data_readers.datastore_interface.DataStoreInterface`]
+    :param resolution: Resolution of the first view
+    :param bin_size: Size of the spatial bins in pixels
+    :type bin_size: int
+    :param max_frames: Maximum number of selected frames
+    :type max_frames: int
+    :param sampling: "random" samples the candidates randomly, "farthest" uses farthest point sampling on the positions
+        in all views for a better coverage.
+    :type sampling: str
+    :return: Frame indices
+    :rtype: list[int]
+    """
     assert len(data_stores) > 1
     cluster_analysis = ClusterAnalysis(config.threshold)
     cluster_analysis.PRINT = True
@@ -110,22 +166,27 @@ def pick_calibration_candidates(config: PoseEstimationConfig, data_stores: list,
     for data_store in data_stores[1:]:
         accurate_data_points = data_store.stats.intersect_accurate_data_points(accurate_data_points)
     num_bins = (resolution[0] // bin_size, resolution[1] // bin_size)
-    spatial_bins = np.zeros(num_bins)
-    frame_number = np.zeros(num_bins)
     part = data_stores[0].body_parts[0]
-    candidates = []
-    for accurate_data in accurate_data_points:
-        for index in range(accurate_data['begin'], accurate_data['end']):
-            position = data_stores[0].get_part(index, part)
-            x_bin, y_bin = int(position[0] / bin_size), int(position[1] / bin_size)
-            if 0 <= x_bin < num_bins[0] and 0 <= y_bin < num_bins[1] and (
-                    spatial_bins[x_bin][y_bin] == 0 and index - frame_number[x_bin][y_bin] > config.framerate * .1):
-                spatial_bins[x_bin][y_bin] += 1
-                frame_number[x_bin][y_bin] = index
-                candidates.append(index)
-    if len(candidates)>max_frames:
-        candidates = random.sample(candidates,max_frames)
-    return candidates
+    indices = np.concatenate([np.arange(accurate_data['begin'], accurate_data['end'], dtype=np.int64) for
+                              accurate_data in accurate_data_points] + [np.array([], dtype=np.int64)])
+    positions = _get_part_positions(data_stores[0], part, indices)
+    with np.errstate(invalid='ignore'):
+        bins = np.trunc(positions / bin_size)
+    selection = np.all(np.isfinite(bins), axis=1) & (indices > config.framerate * .1)
+    selection[selection] = np.all((bins[selection] >= 0) & (bins[selection] < num_bins), axis=1)
+    indices, bins = indices[selection], bins[selection].astype(np.int64)
+    # Only the first accurate frame of every spatial bin is used.
+    _, first = np.unique(bins[:, 0] * num_bins[1] + bins[:, 1], return_index=True)
+    candidates = indices[np.sort(first)]
+    if len(candidates) > max_frames:
+        if sampling == 'farthest':
+            features = np.concatenate([_get_part_positions(data_store, part, candidates) for data_store in
+                                       data_stores], axis=1)
+            features = np.nan_to_num(features - np.nanmean(features, axis=0))
+            candidates = np.sort(candidates[farthest_point_sampling(features, max_frames)])
+        else:
+            return random.sample(candidates.tolist(), max_frames)
+    return candidates.tolist()
 
 
 def update_config_dlt_coeffs(config: PoseEstimationConfig, dlt_coefficients_file, order):
@@ -135,3 +196,56 @@ def update_config_dlt_coeffs(config: PoseEstimationConfig, dlt_coefficients_file
         dlt_coeff.append(1)
         config.views[camera].dlt_coefficients = np.array(dlt_coeff)
     return config
+
+
+def _stack_view_points(points_map, views, count=None):
+    # Rows of the per view lists refer to the same point, missing points are NaN.
+    count = max(len(points_map.get(view, [])) for view in views) if count is None else count
+    uvs = np.full((count, len(views), 2), np.nan)
+    for column, view in enumerate(views):
+        points = np.asarray(points_map.get(view, []), dtype=float).reshape(-1, 2)[:count]
+        uvs[:len(points), column] = points
+    return uvs
+
+
+def calibrate_dlt_coeffs(config: PoseEstimationConfig, world_points, image_points_map, static_points_map=None,
+                         refine=True, loss='huber'):
+    """Computes the DLT coefficients of all views without external software, replacing the
+    :py:func:`generate_EasyWand_data` and :py:func:`update_config_dlt_coeffs` round trip.
+
+    The coefficients of every view are estimated with :py:func:`~cvkit.pose_estimation.reconstruction.DLT.DLTcalib` from
+    calibration points with known world coordinates. Afterwards, the coefficients of all views are refined jointly with
+    :py:func:`~cvkit.pose_estimation.reconstruction.DLT.DLTrefine` using the calibration points and the background points.
+    Image points are undistorted with the camera parameters of the config.
+
+    :param config: Project config, the coefficients of the calibrated views are updated in-place.
+    :type config: :py:class:`~cvkit.pose_estimation.config.PoseEstimationConfig`
+    :param world_points: nx3 array of world coordinates of the calibration points.
+    :type world_points: numpy.ndarray
+    :param image_points_map: Dictionary mapping view names to nx2 arrays of image coordinates of the calibration points. Points that are not visible are NaN.
+    :type image_points_map: dict
+    :param static_points_map: Dictionary mapping view names to lists of background points, same format as for :py:func:`generate_EasyWand_data`.
+    :type static_points_map: dict
+    :param refine: Refine the coefficients by nonlinear optimization.
+    :type refine: bool
+    :param loss: Loss function of the refinement, see :py:func:`scipy.optimize.least_squares`.
+    :type loss: str
+    :return: Updated config and a dictionary mapping view names to their mean reprojection errors in pixels.
+    :rtype: tuple
+    """
+    views = [view for view in config.views if view in image_points_map]
+    world_points = np.asarray(world_points, dtype=float).reshape(-1, 3)
+    uvs = _stack_view_points(image_points_map, views, len(world_points))
+    if static_points_map:
+        uvs = np.concatenate([uvs, _stack_view_points(static_points_map, views)])
+    valid = np.all(np.isfinite(uvs), axis=-1)
+    for column, view in enumerate(views):
+        uvs[valid[:, column], column] = config.views[view].undistort_points(uvs[valid[:, column], column])
+    calibration = np.arange(len(uvs)) < len(world_points)
+    dlt_coefficients, errors = DLTcalib(world_points, uvs[calibration], valid[calibration])
+    if refine:
+        xyz = np.concatenate([world_points, np.full((len(uvs) - len(world_points), 3), np.nan)])
+        dlt_coefficients, _, errors = DLTrefine(dlt_coefficients, uvs, valid, xyz, calibration, loss)
+    for view, coefficients in zip(views, dlt_coefficients):
+        config.views[view].dlt_coefficients = coefficients
+    return config, dict(zip(views, errors.tolist()))
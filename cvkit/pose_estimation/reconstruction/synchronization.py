@@ -0,0 +1,162 @@
+import numpy as np
+
+from cvkit.pose_estimation.config import PoseEstimationConfig
+from cvkit.pose_estimation.data_readers import DataStoreInterface
+
+
+def compute_speed_signal(data_store: DataStoreInterface, threshold, body_parts=None):
+    """Computes the mean keypoint speed of every frame, a motion signal that is comparable across views up to scale.
+
+    :param data_store: 2D pose data of one view
+    :type data_store: :py:class:`~cvkit.pose_estimation.data_readers.datastore_interface.DataStoreInterface`
+    :param threshold: Keypoints with lower likelihood are ignored.
+    :type threshold: float
+    :param body_parts: Body parts used for the signal. Defaults to all body parts of the datastore.
+    :type body_parts: list[str]
+    :return: Speed in pixels per frame for frames 0 to the last frame index, NaN where no keypoint is available.
+    :rtype: numpy.ndarray
+    """
+    body_parts = data_store.body_parts if body_parts is None else body_parts
+    parts = [data_store.get_part_array(name) for name in body_parts]
+    length = max([int(index.max()) + 1 for index, _, _ in parts if len(index) > 0], default=0)
+    total = np.zeros(length)
+    count = np.zeros(length)
+    for index, positions, likelihoods in parts:
+        track = np.full((length, 2), np.nan)
+        selection = likelihoods >= threshold
+        track[index[selection].astype(np.int64)] = positions[selection, :2]
+        speed = np.linalg.norm(np.diff(track, axis=0), axis=1)
+        available = np.isfinite(speed)
+        total[1:] += np.where(available, speed, 0.0)
+        count[1:] += available
+    with np.errstate(invalid='ignore'):
+        return total / count
+
+
+def _prepare(signal):
+    # Zero mean, unit variance and missing values replaced by the mean, i.e. they do not contribute to the correlation.
+    signal = np.asarray(signal, dtype=float)
+    available = np.isfinite(signal)
+    if not np.any(available):
+        return np.zeros(len(signal))
+    signal = np.where(available, signal - np.mean(signal[available]), 0.0)
+    deviation = np.std(signal)
+    return signal / deviation if deviation > 0 else signal
+
+
+def estimate_offset(reference, signal, max_offset=None, begin=0, end=None):
+    """Estimates the frame offset between two motion signals by FFT based cross-correlation. The integer lag is refined
+    to sub-frame precision by fitting a parabola to the correlation peak.
+
+    :param reference: Signal of the reference view
+    :type reference: numpy.ndarray
+    :param signal: Signal of the synchronized view
+    :type signal: numpy.ndarray
+    :param max_offset: Maximum absolute offset in frames. Defaults to half of the shorter signal.
+    :type max_offset: int
+    :param begin: First frame of the reference segment that is matched.
+    :type begin: int
+    :param end: End (exclusive) of the reference segment that is matched. Defaults to the end of the reference.
+    :type end: int
+    :return: Offset o such that frame i of the reference corresponds to frame i + o of the signal, and the normalized correlation at the peak.
+    :rtype: tuple(float, float)
+    """
+    reference = _prepare(reference)
+    signal = _prepare(signal)
+    segment = reference[begin:end]
+    if max_offset is None:
+        max_offset = min(len(reference), len(signal)) // 2
+    size = 1 << int(np.ceil(np.log2(max(1, len(segment) + len(signal)))))
+    # correlation[m] = sum_t segment[t] * signal[t + m], negative lags wrap around.
+    correlation = np.fft.irfft(np.conj(np.fft.rfft(segment, size)) * np.fft.rfft(signal, size), size)
+    # Lags range from -(len(segment) - 1) to len(signal) - 1, the size avoids wrap-around between both ends.
+    lags = np.arange(size)
+    lags[lags >= len(signal)] -= size
+    offsets = lags - begin
+    candidates = np.flatnonzero(np.abs(offsets) <= max_offset)
+    if len(candidates) == 0:
+        return 0.0, 0.0
+    peak = candidates[np.argmax(correlation[candidates])]
+    offset = float(offsets[peak])
+    left, center, right = correlation[(peak - 1) % size], correlation[peak], correlation[(peak + 1) % size]
+    curvature = left - 2 * center + right
+    if curvature < 0:
+        offset += 0.5 * (left - right) / curvature
+    norm = np.sqrt(np.sum(segment ** 2) * np.sum(signal ** 2))
+    return offset, float(center / norm) if norm > 0 else 0.0
+
+
+def estimate_offset_drift(reference, signal, max_offset=None, segments=4):
+    """Estimates offset and drift (e.g. caused by slightly different framerates) between two motion signals. The
+    reference is split into segments, the offset of every segment is estimated with :py:func:`estimate_offset` and a line
+    is fitted to the offsets weighted by their correlation.
+
+    :param reference: Signal of the reference view
+    :type reference: numpy.ndarray
+    :param signal: Signal of the synchronized view
+    :type signal: numpy.ndarray
+    :param max_offset: Maximum absolute offset in frames.
+    :type max_offset: int
+    :param segments: Number of segments. No drift is estimated for less than 2 segments.
+    :type segments: int
+    :return: Offset o and drift d such that frame i of the reference corresponds to frame i * (1 + d) + o of the signal.
+    :rtype: tuple(float, float)
+    """
+    offset, _ = estimate_offset(reference, signal, max_offset)
+    if segments < 2:
+        return offset, 0.0
+    bounds = np.linspace(0, len(reference), segments + 1).astype(int)
+    centers, offsets, scores = [], [], []
+    for begin, end in zip(bounds[:-1], bounds[1:]):
+        segment_offset, score = estimate_offset(reference, signal, max_offset, begin, end)
+        if score > 0:
+            centers.append((begin + end - 1) / 2)
+            offsets.append(segment_offset)
+            scores.append(score)
+    if len(centers) < 2:
+        return offset, 0.0
+    drift, offset = np.polyfit(centers, offsets, 1, w=np.sqrt(scores))
+    return float(offset), float(drift)
+
+
+def synchronize_views(config: PoseEstimationConfig, data_stores: dict, reference_view=None, max_offset=None,
+                      segments=1, body_parts=None):
+    """Estimates the frame offset (and drift) of every view relative to a reference view by cross-correlating keypoint
+    speed signals, and writes them to :py:attr:`~cvkit.pose_estimation.config.CameraViews.frame_offset` and
+    :py:attr:`~cvkit.pose_estimation.config.CameraViews.frame_drift` of the config. The
+    :py:class:`~cvkit.pose_estimation.processors.generative.dlt_reconstruct.DLTReconstruction` processor applies them.
+
+    .. highlight:: python
+    .. code-block:: python
+
+        offsets = synchronize_views(config, {'Cam1': cam1_data, 'Cam2': cam2_data}, max_offset=120)
+        save_config(config_path, config.export_dict())
+
+    :param config: Project config, updated in-place.
+    :type config: :py:class:`~cvkit.pose_estimation.config.PoseEstimationConfig`
+    :param data_stores: Dictionary mapping view names to their 2D pose data.
+    :type data_stores: dict
+    :param reference_view: Offsets are relative to this view. Defaults to the first view.
+    :type reference_view: str
+    :param max_offset: Maximum absolute offset in frames.
+    :type max_offset: int
+    :param segments: Number of segments for the drift estimation, see :py:func:`estimate_offset_drift`.
+    :type segments: int
+    :param body_parts: Body parts used for the signals. Defaults to all body parts.
+    :type body_parts: list[str]
+    :return: Dictionary mapping view names to (offset, drift) tuples.
+    :rtype: dict
+    """
+    views = list(data_stores)
+    reference_view = views[0] if reference_view is None else reference_view
+    signals = {view: compute_speed_signal(data_stores[view], config.threshold, body_parts) for view in views}
+    result = {}
+    for view in views:
+        if view == reference_view:
+            offset, drift = 0.0, 0.0
+        else:
+            offset, drift = estimate_offset_drift(signals[reference_view], signals[view], max_offset, segments)
+        config.views[view].frame_offset = round(offset, 3)
+        config.views[view].frame_drift = drift
+        result[view] = (config.views[view].frame_offset, drift)
+    return result
@@ -144,7 +144,4 @@ def generate_distance_matrices(num_parts, data_points: list):
     return output_distance_matrices
 
 def undistort_point(point:np.ndarray,camera:CameraViews):
-    matrix = build_intrinsic(camera.f_px, camera.principal_point)
-    distortion = camera.distortion
-    point = point.reshape(-1,1,2)
-    return cv2.undistortPoints(point, matrix, distortion, None, matrix).reshape(2,)
\ No newline at end of file
+    return camera.undistort_points(point).reshape(2,)
\ No newline at end of file
@@ -1,6 +1,9 @@
 #: Magic number used to represent missing data
 MAGIC_NUMBER = -4668
+import bisect
 from collections.abc import Iterable
+from multiprocessing.shared_memory import SharedMemory
+
 import numpy as np
 
 
@@ -11,3 +14,207 @@ def build_intrinsic(f,center,skew=[0,0]):
     mat[1,:]=[skew[1],f[1],center[1]]
     mat[2,2]=1
     return mat
+
+
+def parse_memory_size(size):
+    """Converts memory sizes such as "512M" or "4G" to bytes.
+
+    :param size: Number of bytes or a string with K, M, G or T suffix.
+    :type size: int or str
+    :rtype: int
+    """
+    if size is None or isinstance(size, int):
+        return size
+    size = str(size).strip().upper().rstrip('B')
+    units = {'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3, 'T': 1024 ** 4}
+    if size[-1] in units:
+        return int(float(size[:-1]) * units[size[-1]])
+    return int(size)
+
+
+class IntervalSet:
+    """Set of disjoint half-open integer intervals [begin, end). Overlapping and adjacent intervals are merged.
+
+    :param intervals: Iterable of (begin, end) tuples
+    :type intervals: list[tuple]
+    """
+
+    def __init__(self, intervals=None):
+        self._intervals = []
+        for begin, end in (intervals or []):
+            self.add(begin, end)
+
+    @staticmethod
+    def from_indices(indices):
+        """Builds an interval set covering the given integer indices.
+
+        :param indices: Iterable of integers
+        :rtype: :py:class:`IntervalSet`
+        """
+        indices = np.unique(np.asarray(indices, dtype=np.int64))
+        interval_set = IntervalSet()
+        if len(indices) > 0:
+            breaks = np.nonzero(np.diff(indices) > 1)[0]
+            begins = np.concatenate([indices[:1], indices[breaks + 1]])
+            ends = np.concatenate([indices[breaks], indices[-1:]]) + 1
+            interval_set._intervals = [(int(begin), int(end)) for begin, end in zip(begins, ends)]
+        return interval_set
+
+    def add(self, begin, end=None):
+        """Adds the interval [begin, end). Adds a single index if end is None.
+
+        :param begin: First index
+        :param end: Last index (non-inclusive)
+        """
+        begin = int(begin)
+        end = begin + 1 if end is None else int(end)
+        if end <= begin:
+            return
+        first = bisect.bisect_left(self._intervals, begin, key=lambda interval: interval[1])
+        last = bisect.bisect_right(self._intervals, end, key=lambda interval: interval[0])
+        if first < last:
+            begin = min(begin, self._intervals[first][0])
+            end = max(end, self._intervals[last - 1][1])
+        self._intervals[first:last] = [(begin, end)]
+
+    def add_indices(self, indices):
+        """Adds all given integer indices.
+
+        :param indices: Iterable of integers
+        """
+        self.update(IntervalSet.from_indices(indices))
+
+    def update(self, other):
+        """Adds all intervals of another set. The intervals are merged in a single sorted pass, which is faster than
+        :py:meth:`add` for many intervals.
+
+        :param other: Second interval set
+        :type other: :py:class:`IntervalSet`
+        """
+        if len(other) == 0:
+            return
+        if len(self._intervals) == 0:
+            self._intervals = list(other._intervals)
+            return
+        intervals = np.array(self._intervals + other._intervals, dtype=np.int64)
+        intervals = intervals[np.argsort(intervals[:, 0], kind='stable')]
+        ends = np.maximum.accumulate(intervals[:, 1])
+        # An interval starts a new group if it begins after all previous intervals ended (adjacent ones are merged).
+        starts = np.concatenate([[True], intervals[1:, 0] > ends[:-1]])
+        last = np.concatenate([np.flatnonzero(starts)[1:] - 1, [len(intervals) - 1]])
+        self._intervals = [(int(begin), int(end)) for begin, end in zip(intervals[starts, 0], ends[last])]
+
+    def union(self, other):
+        """
+        :param other: Second interval set
+        :type other: :py:class:`IntervalSet`
+        :return: New interval set containing the intervals of both sets
+        :rtype: :py:class:`IntervalSet`
+        """
+        result = IntervalSet(self._intervals)
+        result.update(other)
+        return result
+
+    def expand(self, radius):
+        """
+        :param radius: Number of indices added on both sides of every interval
+        :type radius: int
+        :return: New interval set with expanded intervals
+        :rtype: :py:class:`IntervalSet`
+        """
+        return IntervalSet([(begin - radius, end + radius) for begin, end in self._intervals])
+
+    def clip(self, lower, upper):
+        """
+        :param lower: Smallest allowed index
+        :param upper: Upper bound (non-inclusive)
+        :return: New interval set restricted to [lower, upper)
+        :rtype: :py:class:`IntervalSet`
+        """
+        return IntervalSet([(max(begin, lower), min(end, upper)) for begin, end in self._intervals])
+
+    def clear(self):
+        self._intervals.clear()
+
+    def intersects(self, begin, end):
+        """
+        :param begin: First index
+        :param end: Last index (non-inclusive)
+        :return: True if any index in [begin, end) is covered by the set
+        :rtype: bool
+        """
+        position = bisect.bisect_right(self._intervals, begin, key=lambda interval: interval[0]) - 1
+        if position >= 0 and begin < self._intervals[position][1]:
+            return True
+        return position + 1 < len(self._intervals) and self._intervals[position + 1][0] < end
+
+    def size(self):
+        """
+        :return: Number of indices covered by the set
+        :rtype: int
+        """
+        return sum(end - begin for begin, end in self._intervals)
+
+    def __contains__(self, index):
+        position = bisect.bisect_right(self._intervals, index, key=lambda interval: interval[0]) - 1
+        return position >= 0 and index < self._intervals[position][1]
+
+    def __iter__(self):
+        return iter(list(self._intervals))
+
+    def __len__(self):
+        return len(self._intervals)
+
+    def __eq__(self, other):
+        return isinstance(other, IntervalSet) and self._intervals == other._intervals
+
+    def __repr__(self):
+        return f'IntervalSet({self._intervals})'
+
+
+class SharedArray:
+    """Numpy array backed by a shared memory block. Instances can be pickled and sent to worker processes, which attach
+    to the same memory block instead of copying the data.
+
+    :param shape: Shape of the array
+    :type shape: tuple
+    :param dtype: Data type of the array
+    :type dtype: numpy.dtype
+    :param name: Name of an existing shared memory block. A new block is created if None.
+    :type name: str
+    """
+
+    def __init__(self, shape, dtype=float, name=None):
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        self._owner = name is None
+        size = max(int(np.prod(self.shape)) * self.dtype.itemsize, 1)
+        self._shm = SharedMemory(name=name, create=self._owner, size=size if self._owner else 0)
+        self.array = np.ndarray(self.shape, dtype=self.dtype, buffer=self._shm.buf)
+
+    @staticmethod
+    def from_array(array):
+        """Creates a shared copy of the given array.
+
+        :param array: Source array
+        :type array: numpy.ndarray
+        :rtype: :py:class:`SharedArray`
+        """
+        shared = SharedArray(np.shape(array), np.asarray(array).dtype)
+        shared.array[...] = array
+        return shared
+
+    def __getstate__(self):
+        return {'shape': self.shape, 'dtype': self.dtype.str, 'name': self._shm.name}
+
+    def __setstate__(self, state):
+        self.__init__(state['shape'], state['dtype'], state['name'])
+
+    def release(self):
+        """Detaches from the memory block. The block is freed if this instance created it.
+        All views of :py:attr:`array` should be deleted before calling this method.
+        """
+        self.array = None
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
@@ -7,6 +7,12 @@ try:
     video_readers[CV2VideoReader.FLAVOR] = CV2VideoReader
 except:
     pass
+try:
+    from cvkit.video_readers.parallel_reader import ParallelVideoReader
+
+    video_readers[ParallelVideoReader.FLAVOR] = ParallelVideoReader
+except:
+    pass
 try:
     from cvkit.video_readers.deffcode_reader import DeffcodeVideoReader
 
@@ -1,14 +1,50 @@
 import sys
-import time
-from queue import Queue, Empty
+from collections import deque
 from threading import Thread
 
 import cv2
 import numpy as np
 
+from cvkit.video_readers.frame_ring_buffer import FrameRingBuffer
 from cvkit.video_readers.video_reader_interface import BaseVideoReaderInterface
 
 
+def seek_capture(stream, keyframe_index, index):
+    """Seeks an OpenCV stream to the exact frame. The stream seeks to the nearest preceding keyframe and decodes forward
+    until the timestamp of the frame is reached. Falls back to ``CAP_PROP_POS_FRAMES`` without keyframe index.
+
+    :param stream: OpenCV video stream
+    :type stream: cv2.VideoCapture
+    :param keyframe_index: Keyframe index of the video or None
+    :type keyframe_index: :py:class:`~cvkit.video_readers.keyframe_index.KeyframeIndex`
+    :param index: Frame index
+    :type index: int
+    :return: The decoded frame (BGR) at the index, the stream continues with the following frame. None if the next read of the stream returns the frame instead.
+    :rtype: numpy.ndarray
+    """
+    if keyframe_index is None or index <= 0 or index >= len(keyframe_index):
+        stream.set(cv2.CAP_PROP_POS_FRAMES, index)
+        return None
+    target = keyframe_index.get_timestamp(index)
+    tolerance = keyframe_index.get_tolerance()
+    keyframe = keyframe_index.get_keyframe(index)
+    while True:
+        stream.set(cv2.CAP_PROP_POS_MSEC, keyframe_index.get_timestamp(keyframe) * 1000)
+        if not stream.grab():
+            return None
+        timestamp = stream.get(cv2.CAP_PROP_POS_MSEC) / 1000
+        if timestamp <= target + tolerance or keyframe == 0:
+            break
+        # The backend overshot the keyframe, retry from the previous one.
+        keyframe = keyframe_index.get_previous_keyframe(keyframe)
+    while timestamp < target - tolerance:
+        if not stream.grab():
+            return None
+        timestamp = stream.get(cv2.CAP_PROP_POS_MSEC) / 1000
+    ret, frame = stream.retrieve()
+    return frame if ret else None
+
+
 class CV2VideoReader(BaseVideoReaderInterface):
     """ This implementation uses OpenCV as the underlying library to implement the BaseVideoReaderInterface
 
@@ -22,12 +58,59 @@ class CV2VideoReader(BaseVideoReaderInterface):
 
     def random_access_image(self, position):
         if 0 <= position < self.total_frames:
-            stream = cv2.VideoCapture(self.video_path)
-            stream.set(cv2.CAP_PROP_POS_FRAMES, position)
-            ret, frame = stream.read()
-            stream.release()
-            if ret:
-                return cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            frame = self.frame_cache.get(position)
+            if frame is None:
+                with self._random_access_lock:
+                    frame = self._decode_random_access(position)
+            if frame is not None:
+                return frame.copy()
+
+    def _decode_random_access(self, position, cache_skipped=True):
+        if self._random_access_stream is None:
+            self._random_access_stream = cv2.VideoCapture(self.video_path)
+            self._random_access_position = 0
+        stream = self._random_access_stream
+        if not self._can_decode_forward(position):
+            frame = self.seek_stream(stream, position)
+            self._random_access_position = position
+            if frame is not None:
+                frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+                self.frame_cache.put(position, frame)
+                self._random_access_position += 1
+                return frame
+        # Frames decoded on the way are cached as well, labeling tools usually step back and forth.
+        while self._random_access_position < position:
+            if cache_skipped:
+                ret, frame = stream.read()
+                if ret:
+                    self.frame_cache.put(self._random_access_position, cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+            else:
+                ret = stream.grab()
+            if not ret:
+                self._random_access_position = None
+                return None
+            self._random_access_position += 1
+        ret, frame = stream.read()
+        if not ret:
+            self._random_access_position = None
+            return None
+        frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        self.frame_cache.put(position, frame)
+        self._random_access_position += 1
+        return frame
+
+    def seek_stream(self, stream, index):
+        """Seeks an OpenCV stream to the exact frame using the :py:meth:`~cvkit.video_readers.video_reader_interface.BaseVideoReaderInterface.get_keyframe_index`,
+        see :py:func:`seek_capture`.
+
+        :param stream: OpenCV video stream
+        :type stream: cv2.VideoCapture
+        :param index: Frame index
+        :type index: int
+        :return: The decoded frame (BGR) at the index, the stream continues with the following frame. None if the next read of the stream returns the frame instead.
+        :rtype: numpy.ndarray
+        """
+        return seek_capture(stream, self.get_keyframe_index() if index > 0 else None, index)
 
     FLAVOR = "opencv"
 
@@ -35,53 +118,99 @@ class CV2VideoReader(BaseVideoReaderInterface):
         super().__init__(video_path, fps, buffer_size)
         self.state = 0
         self.thread = None
-        self.buffer = Queue(maxsize=buffer_size)
+        self.buffer = FrameRingBuffer(buffer_size)
         self.stream = cv2.VideoCapture(self.video_path)
         self.total_frames = int(self.stream.get(cv2.CAP_PROP_FRAME_COUNT))
+        self._random_access_stream = None
+        self._held_slots = deque()
 
     def start(self):
-        self.stream.set(cv2.CAP_PROP_POS_FRAMES, self.current_index + 1)
-        self.thread = Thread(target=self.fill_buffer)
+        self.buffer.reset()
+        self._held_slots.clear()
+        frame = self.seek_stream(self.stream, self.current_index + 1)
+        if frame is None:
+            ret, frame = self.stream.read()
+            frame = frame if ret else None
+        if frame is not None:
+            # The slots are allocated once, frames are decoded into them in-place.
+            self.buffer.allocate(frame.shape, frame.dtype)
+        self.thread = Thread(target=self.fill_buffer, args=(self.current_index + 1, frame))
         self.thread.daemon = True
         self.state = 1
         self.thread.start()
 
-    def fill_buffer(self):
-        while True:
-            if self.state <= 0:
-                break
-            if not self.buffer.full():
-                ret, frame = self.stream.read()
-                if ret:
-                    frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                    self.buffer.put(frame)
-            else:
-                time.sleep(0.01)
+    def fill_buffer(self, index, frame=None):
+        try:
+            if frame is None:
+                return
+            while self.state > 0:
+                slot = self.buffer.acquire_write()
+                if slot is None:
+                    break
+                target = self.buffer.get(slot)
+                if frame is not None:
+                    # The first frame has already been decoded by the seek.
+                    np.copyto(target, frame)
+                    frame = None
+                elif not self.stream.read(target)[0]:
+                    break
+                cv2.cvtColor(target, cv2.COLOR_BGR2RGB, dst=target)
+                self.buffer.commit(slot, index)
+                index += 1
+        finally:
+            self.buffer.finish()
+
+    def wait_ready(self, timeout=None) -> bool:
+        return self.buffer.wait_ready(timeout) if self.state == 1 else False
 
     def stop(self):
         if self.thread:
             self.state = -1
+            self.buffer.interrupt()
             self.thread.join()
-            with self.buffer.mutex:
-                self.buffer.queue.clear()
+            self.buffer.reset()
+            self._held_slots.clear()
         self.thread = None
 
     def pause(self) -> None:
-        self.state = 0
+        if self.thread:
+            self.state = 0
+            self.buffer.interrupt()
+            self.thread.join()
+        self.thread = None
 
     def release(self):
         self.stop()
         self.stream.release()
+        with self._random_access_lock:
+            if self._random_access_stream is not None:
+                self._random_access_stream.release()
+                self._random_access_stream = None
+                self._random_access_position = None
+        self.frame_cache.clear()
 
     def next_frame(self) -> np.ndarray:
+        frame = self.next_frame_view()
+        if frame is None:
+            return None
+        self.current_frame = frame.copy()
+        self.release_frame()
+        return self.current_frame
+
+    def next_frame_view(self) -> np.ndarray:
         if self.state == -1:
             return None
         elif self.state != 1:
             self.start()
-        try:
-            self.current_frame = self.buffer.get(timeout=0.5)
-            self.current_index += 1
-            return self.current_frame
-        except Empty:
+        received = self.buffer.acquire_read()
+        if received is None:
             self.stop()
             return None
+        slot, self.current_index = received
+        self._held_slots.append(slot)
+        self.current_frame = self.buffer.get(slot)
+        return self.current_frame
+
+    def release_frame(self) -> None:
+        if self._held_slots:
+            self.buffer.release(self._held_slots.popleft())
@@ -1,12 +1,12 @@
 import json
-import time
+from collections import deque
 from datetime import timedelta
-from queue import Queue, Empty
 from threading import Thread
 
 import numpy as np
 from deffcode import FFdecoder
 
+from cvkit.video_readers.frame_ring_buffer import FrameRingBuffer
 from cvkit.video_readers.video_reader_interface import BaseVideoReaderInterface
 
 
@@ -24,68 +24,131 @@ class DeffcodeVideoReader(BaseVideoReaderInterface):
 
     def random_access_image(self, position):
         if 0 <= position < self.total_frames:
-            ts = self.get_timestamp(position)
-            stream = FFdecoder(self.video_path, **{'-ss': ts}).formulate()
-            frame = next(stream.generateFrame(), None)
-            stream.terminate()
+            frame = self.frame_cache.get(position)
+            if frame is None:
+                with self._random_access_lock:
+                    frame = self._decode_random_access(position)
             if frame is not None:
-                return frame
+                return frame.copy()
+
+    def _decode_random_access(self, position, cache_skipped=True):
+        if not self._can_decode_forward(position):
+            if self._random_access_decoder is not None:
+                self._random_access_decoder.terminate()
+            self._random_access_decoder = FFdecoder(self.video_path, **{'-ss': self.get_timestamp(position)}).formulate()
+            self._random_access_frames = self._random_access_decoder.generateFrame()
+            self._random_access_position = position
+        frame = None
+        # Frames decoded on the way are cached as well, labeling tools usually step back and forth.
+        while self._random_access_position <= position:
+            frame = next(self._random_access_frames, None)
+            if frame is None:
+                self._random_access_position = None
+                return None
+            if cache_skipped or self._random_access_position == position:
+                self.frame_cache.put(self._random_access_position, frame)
+            self._random_access_position += 1
+        return frame
 
     def get_timestamp(self, frame_number):
-        return str(timedelta(seconds=(frame_number / self.fps)))
+        keyframe_index = self.get_keyframe_index() if frame_number > 0 else None
+        if keyframe_index is not None and frame_number < len(keyframe_index):
+            # FFmpeg seeks to the preceding keyframe and discards the frames before the timestamp. Depending on the
+            # container it returns the first frame at or after the timestamp (e.g. mp4) or the frame whose interval contains
+            # it (e.g. avi), only the exact timestamp of the frame is correct for both.
+            seconds = keyframe_index.get_timestamp(frame_number)
+        else:
+            seconds = frame_number / self.fps
+        return str(timedelta(seconds=seconds))
 
     def __init__(self, video_path, fps, buffer_size=128):
         super().__init__(video_path, fps, buffer_size)
         self.state = 0
         self.thread = None
-        self.buffer = Queue(maxsize=buffer_size)
+        self.buffer = FrameRingBuffer(buffer_size)
         self.stream = FFdecoder(self.video_path).formulate()
         self.total_frames = json.loads(self.stream.metadata)['approx_video_nframes']
         self.stream.terminate()
         self.current_index = -1
+        self._random_access_decoder = None
+        self._random_access_frames = None
+        self._held_slots = deque()
 
     def start(self):
+        self.buffer.reset()
+        self._held_slots.clear()
         ts = self.get_timestamp(self.current_index + 1)
         self.stream = FFdecoder(self.video_path, **{'-ss': ts}).formulate()
-        self.thread = Thread(target=self.fill_buffer)
+        self.thread = Thread(target=self.fill_buffer, args=(self.current_index + 1,))
         self.thread.daemon = True
         self.state = 1
         self.thread.start()
 
-    def fill_buffer(self):
-        while True:
-            if self.state <= 0:
-                break
-            if not self.buffer.full():
-                frame = next(self.stream.generateFrame(), None)
-                self.buffer.put(frame)
-            else:
-                time.sleep(0.01)
+    def fill_buffer(self, index):
+        try:
+            for frame in self.stream.generateFrame():
+                if frame is None or self.state <= 0:
+                    break
+                slot = self.buffer.acquire_write()
+                if slot is None:
+                    break
+                # Deffcode allocates every frame it reads from the FFmpeg pipe, the slot keeps a reference to it.
+                self.buffer.set(slot, frame)
+                self.buffer.commit(slot, index)
+                index += 1
+        finally:
+            self.buffer.finish()
+
+    def wait_ready(self, timeout=None) -> bool:
+        return self.buffer.wait_ready(timeout) if self.state == 1 else False
 
     def stop(self):
         if self.thread:
             self.state = -1
+            self.buffer.interrupt()
             self.thread.join()
-            with self.buffer.mutex:
-                self.buffer.queue.clear()
+            self.buffer.reset()
+            self._held_slots.clear()
         self.stream.terminate()
         self.thread = None
 
     def pause(self) -> None:
-        self.state = 0
+        if self.thread:
+            self.state = 0
+            self.buffer.interrupt()
+            self.thread.join()
+            self.stream.terminate()
+        self.thread = None
 
     def release(self):
         self.stop()
+        with self._random_access_lock:
+            if self._random_access_decoder is not None:
+                self._random_access_decoder.terminate()
+                self._random_access_decoder = None
+                self._random_access_position = None
+        self.frame_cache.clear()
 
     def next_frame(self) -> np.ndarray:
+        # Frames are not reused by the decoder, releasing the slot only drops its reference.
+        frame = self.next_frame_view()
+        self.release_frame()
+        return frame
+
+    def next_frame_view(self) -> np.ndarray:
         if self.state == -1:
             return None
         elif self.state != 1:
             self.start()
-        try:
-            self.current_frame = self.buffer.get()
-            self.current_index += 1
-            return self.current_frame
-        except Empty:
+        received = self.buffer.acquire_read()
+        if received is None:
             self.stop()
             return None
+        slot, self.current_index = received
+        self._held_slots.append(slot)
+        self.current_frame = self.buffer.get(slot)
+        return self.current_frame
+
+    def release_frame(self) -> None:
+        if self._held_slots:
+            self.buffer.release(self._held_slots.popleft())
@@ -0,0 +1,67 @@
+import threading
+from collections import OrderedDict
+
+from cvkit.utils import parse_memory_size
+
+
+class FrameCache:
+    """Least recently used cache of decoded frames with a size limit in bytes.
+
+    :param max_size: Size limit in bytes or as a string (e.g. "512M"). Frames larger than the limit are not cached.
+    :type max_size: int or str
+    """
+
+    def __init__(self, max_size):
+        self.max_size = parse_memory_size(max_size)
+        self.size = 0  #: Total size of the cached frames in bytes
+        self.hits = 0
+        self.misses = 0
+        self._frames = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, index):
+        """
+        :param index: Frame index
+        :type index: int
+        :return: Cached frame or None
+        :rtype: numpy.ndarray
+        """
+        with self._lock:
+            frame = self._frames.get(index)
+            if frame is None:
+                self.misses += 1
+                return None
+            self._frames.move_to_end(index)
+            self.hits += 1
+            return frame
+
+    def put(self, index, frame):
+        """Adds a frame and evicts the least recently used frames until the cache fits into its size limit.
+
+        :param index: Frame index
+        :type index: int
+        :param frame: Decoded frame
+        :type frame: numpy.ndarray
+        """
+        if frame is None or frame.nbytes > self.max_size:
+            return
+        with self._lock:
+            previous = self._frames.pop(index, None)
+            if previous is not None:
+                self.size -= previous.nbytes
+            self._frames[index] = frame
+            self.size += frame.nbytes
+            while self.size > self.max_size:
+                _, evicted = self._frames.popitem(last=False)
+                self.size -= evicted.nbytes
+
+    def clear(self):
+        with self._lock:
+            self._frames.clear()
+            self.size = 0
+
+    def __contains__(self, index):
+        return index in self._frames
+
+    def __len__(self):
+        return len(self._frames)
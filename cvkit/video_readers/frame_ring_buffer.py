@@ -0,0 +1,172 @@
+import threading
+
+import numpy as np
+
+
+class FrameRingBuffer:
+    """Fixed number of preallocated frame slots shared by a decoding thread and a consumer. The producer decodes directly
+    into a free slot and publishes it, the consumer receives the slots in order as views and returns them explicitly.
+    Both sides wait on a condition variable instead of polling. Producers that cannot decode in-place (e.g. Deffcode
+    returns a new array for every frame) store references with :py:meth:`set` instead, the slots are not allocated then.
+
+    .. highlight:: python
+    .. code-block:: python
+
+        slot = ring.acquire_write()
+        stream.read(ring.get(slot))
+        ring.commit(slot, index)
+        ...
+        slot, index = ring.acquire_read()
+        process(ring.get(slot))
+        ring.release(slot)
+
+    :param capacity: Number of frame slots.
+    :type capacity: int
+    """
+    FREE, WRITING, READY, READING = range(4)
+
+    def __init__(self, capacity):
+        self.capacity = max(1, int(capacity))
+        self.frames = None  #: Preallocated frame array, the first axis is the slot.
+        self._states = [self.FREE] * self.capacity
+        self._indices = [-1] * self.capacity
+        self._references = [None] * self.capacity
+        self._write_slot = 0
+        self._read_slot = 0
+        self._finished = False
+        self._interrupted = False
+        self._condition = threading.Condition()
+
+    def allocate(self, shape, dtype=np.uint8):
+        """Allocates the frame slots, existing slots are kept if shape and type match. Must not be called while a slot is in use.
+
+        :param shape: Shape of a single frame
+        :type shape: tuple
+        :param dtype: Data type of the frames
+        :type dtype: numpy.dtype
+        """
+        shape = (self.capacity,) + tuple(shape)
+        if self.frames is None or self.frames.shape != shape or self.frames.dtype != dtype:
+            self.frames = np.empty(shape, dtype=dtype)
+
+    def get(self, slot):
+        """
+        :param slot: Slot number
+        :type slot: int
+        :return: View of the frame in the slot, only valid until the slot is released.
+        :rtype: numpy.ndarray
+        """
+        reference = self._references[slot]
+        return self.frames[slot] if reference is None else reference
+
+    def set(self, slot, frame):
+        """Stores a reference to a frame decoded elsewhere in a slot returned by :py:meth:`acquire_write`. The frame is
+        not copied, the reference is dropped when the slot is released.
+
+        :param slot: Slot number
+        :type slot: int
+        :param frame: Decoded frame
+        :type frame: numpy.ndarray
+        """
+        self._references[slot] = frame
+
+    def acquire_write(self, timeout=None):
+        """Waits for the next free slot.
+
+        :param timeout: Maximum waiting time in seconds
+        :type timeout: float
+        :return: Slot number or None if the buffer was interrupted or the timeout expired.
+        :rtype: int
+        """
+        with self._condition:
+            if not self._condition.wait_for(
+                    lambda: self._interrupted or self._states[self._write_slot] == self.FREE, timeout) or self._interrupted:
+                return None
+            slot = self._write_slot
+            self._states[slot] = self.WRITING
+            self._write_slot = (slot + 1) % self.capacity
+            return slot
+
+    def commit(self, slot, index):
+        """Publishes a written slot to the consumer.
+
+        :param slot: Slot number returned by :py:meth:`acquire_write`
+        :type slot: int
+        :param index: Frame index of the frame in the slot
+        :type index: int
+        """
+        with self._condition:
+            self._indices[slot] = index
+            self._states[slot] = self.READY
+            self._condition.notify_all()
+
+    def finish(self):
+        """Marks the end of the stream, the consumer receives None once all published frames are read."""
+        with self._condition:
+            self._finished = True
+            self._condition.notify_all()
+
+    def wait_ready(self, timeout=None):
+        """Waits until the next frame is published or the stream has finished.
+
+        :param timeout: Maximum waiting time in seconds
+        :type timeout: float
+        :return: True if a frame is available.
+        :rtype: bool
+        """
+        with self._condition:
+            self._condition.wait_for(lambda: self._interrupted or self._finished or self._states[
+                self._read_slot] == self.READY, timeout)
+            return self._states[self._read_slot] == self.READY
+
+    def acquire_read(self, timeout=None):
+        """Waits for the next published frame.
+
+        :param timeout: Maximum waiting time in seconds
+        :type timeout: float
+        :return: (slot, index) tuple or None if the stream has finished, the buffer was interrupted or the timeout expired.
+        :rtype: tuple(int, int)
+        """
+        with self._condition:
+            self._condition.wait_for(lambda: self._interrupted or self._finished or self._states[
+                self._read_slot] == self.READY, timeout)
+            slot = self._read_slot
+            if self._states[slot] != self.READY:
+                return None
+            self._states[slot] = self.READING
+            self._read_slot = (slot + 1) % self.capacity
+            return slot, self._indices[slot]
+
+    def release(self, slot):
+        """Returns a slot received from :py:meth:`acquire_read` to the producer.
+
+        :param slot: Slot number
+        :type slot: int
+        """
+        with self._condition:
+            if self._states[slot] == self.READING:
+                self._states[slot] = self.FREE
+                self._references[slot] = None
+                self._condition.notify_all()
+
+    def interrupt(self):
+        """Wakes up all waiting threads, :py:meth:`acquire_write` and :py:meth:`acquire_read` return None until :py:meth:`reset`."""
+        with self._condition:
+            self._interrupted = True
+            self._condition.notify_all()
+
+    def reset(self):
+        """Discards all frames. The producer must be stopped, views of released or unreleased slots become invalid."""
+        with self._condition:
+            self._states = [self.FREE] * self.capacity
+            self._indices = [-1] * self.capacity
+            self._references = [None] * self.capacity
+            self._write_slot = 0
+            self._read_slot = 0
+            self._finished = False
+            self._interrupted = False
+            self._condition.notify_all()
+
+    def __len__(self):
+        with self._condition:
+            return sum(state == self.READY for state in self._states)
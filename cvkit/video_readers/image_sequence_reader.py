@@ -17,10 +17,14 @@ def generate_image_sequence_reader(video_path, fps, frame_numbers, output_path=N
         directory = directory_path = output_path
         os.makedirs(directory_path, exist_ok=True)
     reader = DeffcodeVideoReader(video_path,fps,12)
-    for index, frame_number in enumerate(frame_numbers):
-        if not os.path.exists(os.path.join(directory_path, f'{frame_number}.png')):
-            frame = cv2.cvtColor(reader.random_access_image(frame_number),cv2.COLOR_RGB2BGR)
-            cv2.imwrite(os.path.join(directory_path, f'{frame_number}.png'),frame)
+    missing = [frame_number for frame_number in frame_numbers if
+               not os.path.exists(os.path.join(directory_path, f'{frame_number}.png'))]
+    # All frames are decoded in a single forward pass instead of seeking for every frame, and written one at a time.
+    for frame_number, frame in reader.generate_frames(missing):
+        if frame is None:
+            continue
+        cv2.imwrite(os.path.join(directory_path, f'{frame_number}.png'), cv2.cvtColor(frame, cv2.COLOR_RGB2BGR))
+    reader.release()
     return ImageSequenceReader(directory, fps)
 
 
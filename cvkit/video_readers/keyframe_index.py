@@ -0,0 +1,150 @@
+import os
+
+import cv2
+import numpy as np
+
+
+class KeyframeIndex:
+    """Presentation timestamps of all frames and positions of the keyframes of a video. The index is built once by scanning
+    the packets of the video without decoding them and cached in a sidecar file next to the video. Readers use it to
+    seek to the nearest preceding keyframe and decode forward to the exact frame, which also works for variable framerate videos.
+
+    :param timestamps: Presentation timestamp of every frame in seconds, relative to the start of the container.
+    :type timestamps: numpy.ndarray
+    :param keyframes: Sorted frame indices of the keyframes.
+    :type keyframes: numpy.ndarray
+    """
+    FILE_VERSION = 1
+    SUFFIX = '_keyframes.npz'
+
+    def __init__(self, timestamps, keyframes):
+        self.timestamps = np.asarray(timestamps, dtype=float)
+        self.keyframes = np.asarray(keyframes, dtype=np.int64)
+        if len(self.keyframes) == 0 or self.keyframes[0] != 0:
+            # Decoding always starts at a keyframe, the first frame is treated as one.
+            self.keyframes = np.concatenate([[0], self.keyframes]).astype(np.int64)
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    def get_keyframe(self, index):
+        """
+        :param index: Frame index
+        :type index: int
+        :return: Index of the nearest keyframe at or before the given frame.
+        :rtype: int
+        """
+        return int(self.keyframes[np.searchsorted(self.keyframes, index, side='right') - 1])
+
+    def get_previous_keyframe(self, keyframe):
+        """
+        :param keyframe: Index of a keyframe
+        :type keyframe: int
+        :return: Index of the keyframe before the given keyframe, 0 for the first keyframe.
+        :rtype: int
+        """
+        return int(self.keyframes[max(np.searchsorted(self.keyframes, keyframe, side='left') - 1, 0)])
+
+    def get_timestamp(self, index):
+        """
+        :param index: Frame index
+        :type index: int
+        :return: Presentation timestamp of the frame in seconds.
+        :rtype: float
+        """
+        return float(self.timestamps[index])
+
+    def get_tolerance(self):
+        """
+        :return: Half of the shortest frame interval in seconds, timestamps closer than this refer to the same frame.
+        :rtype: float
+        """
+        intervals = np.diff(self.timestamps)
+        intervals = intervals[intervals > 0]
+        return float(intervals.min()) / 2 if len(intervals) > 0 else 1e-3
+
+    @staticmethod
+    def get_sidecar_path(base_file_path):
+        return base_file_path + KeyframeIndex.SUFFIX
+
+    @staticmethod
+    def _get_signature(video_path):
+        stat = os.stat(video_path)
+        return np.array([stat.st_size, stat.st_mtime_ns], dtype=np.int64)
+
+    @staticmethod
+    def scan(video_path):
+        """Builds the index by reading the raw packets of the video with OpenCV, frames are not decoded.
+
+        :param video_path: Path of the video
+        :type video_path: str
+        :rtype: :py:class:`KeyframeIndex`
+        """
+        stream = cv2.VideoCapture(video_path, cv2.CAP_FFMPEG)
+        if not stream.isOpened() or not stream.set(cv2.CAP_PROP_FORMAT, -1):
+            stream.release()
+            raise Exception(f"Unable to read the packets of {video_path}")
+        timestamps, keyframes = [], []
+        while stream.grab():
+            timestamps.append(stream.get(cv2.CAP_PROP_POS_MSEC) / 1000)
+            keyframes.append(stream.get(cv2.CAP_PROP_LRF_HAS_KEY_FRAME) > 0)
+        stream.release()
+        timestamps = np.array(timestamps, dtype=float)
+        # Packets are stored in decoding order, frames are indexed in presentation order.
+        order = np.argsort(timestamps, kind='stable')
+        return KeyframeIndex(timestamps[order], np.flatnonzero(np.array(keyframes, dtype=bool)[order]))
+
+    def save(self, path, video_path):
+        """Writes the index to a sidecar file. The file is written to a temporary path first and moved afterwards.
+
+        :param path: Output path
+        :type path: str
+        :param video_path: Path of the indexed video, its size and modification time are stored for validation.
+        :type video_path: str
+        """
+        temp_path = f'{path}.{os.getpid()}.tmp.npz'
+        np.savez(temp_path, version=self.FILE_VERSION, signature=self._get_signature(video_path),
+                 timestamps=self.timestamps, keyframes=self.keyframes)
+        os.replace(temp_path, path)
+
+    @staticmethod
+    def load(path, video_path):
+        """Reads an index from a sidecar file.
+
+        :param path: Path of the sidecar file
+        :type path: str
+        :param video_path: Path of the indexed video
+        :type video_path: str
+        :return: The index or None if the file does not exist or the video has been modified since.
+        :rtype: :py:class:`KeyframeIndex`
+        """
+        try:
+            with np.load(path, allow_pickle=False) as archive:
+                if int(archive['version']) != KeyframeIndex.FILE_VERSION or not np.array_equal(
+                        archive['signature'], KeyframeIndex._get_signature(video_path)):
+                    return None
+                return KeyframeIndex(archive['timestamps'], archive['keyframes'])
+        except (OSError, ValueError, KeyError):
+            return None
+
+    @staticmethod
+    def get(video_path, base_file_path=None):
+        """Loads the cached index of a video, it is built and cached if required.
+
+        :param video_path: Path of the video
+        :type video_path: str
+        :param base_file_path: Path of the video without extension. The sidecar file is "<base_file_path>_keyframes.npz".
+        :type base_file_path: str
+        :rtype: :py:class:`KeyframeIndex`
+        """
+        base_file_path = os.path.splitext(video_path)[0] if base_file_path is None else base_file_path
+        path = KeyframeIndex.get_sidecar_path(base_file_path)
+        index = KeyframeIndex.load(path, video_path)
+        if index is None:
+            index = KeyframeIndex.scan(video_path)
+            try:
+                index.save(path, video_path)
+            except OSError:
+                # Read-only folders are indexed on every run.
+                pass
+        return index
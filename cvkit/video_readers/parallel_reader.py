@@ -0,0 +1,246 @@
+import multiprocessing
+import os
+import queue
+from multiprocessing import shared_memory
+
+import cv2
+import numpy as np
+
+from cvkit.video_readers.cv2_reader import CV2VideoReader, seek_capture
+
+
+def _decode_segments(video_path, keyframe_index, tasks, results, free_slots, memory_name, shape):
+    # Worker entry point. Decodes segments into the shared frame slots of this worker and reports (index, slot, begin)
+    # tuples. A slot of -1 marks the end of the segment starting at begin, the index is the end of the decoded frames.
+    memory = shared_memory.SharedMemory(name=memory_name)
+    slots = np.ndarray(shape, dtype=np.uint8, buffer=memory.buf)
+    try:
+        stream = cv2.VideoCapture(video_path)
+        while True:
+            task = tasks.get()
+            if task is None:
+                break
+            begin, end = task
+            frame = seek_capture(stream, keyframe_index, begin)
+            index = begin
+            while index < end:
+                if frame is None:
+                    ret, frame = stream.read()
+                    if not ret:
+                        break
+                slot = free_slots.get()
+                if slot is None:
+                    stream.release()
+                    return
+                cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=slots[slot])
+                results.put((index, slot, begin))
+                frame = None
+                index += 1
+            results.put((index, -1, begin))
+        stream.release()
+    finally:
+        del slots
+        memory.close()
+
+
+class ParallelVideoReader(CV2VideoReader):
+    """This implementation splits the video at keyframes into segments that are decoded by a pool of worker processes.
+    Decoded frames are transferred through shared memory, each worker owns a fixed number of frame slots. Frames are
+    returned in order by :py:meth:`next_frame`, :py:meth:`iter_frames` can also yield them as soon as they are decoded.
+    Random access uses the methods of :py:class:`~cvkit.video_readers.cv2_reader.CV2VideoReader`.
+
+    .. highlight:: python
+    .. code-block:: python
+
+        reader = ParallelVideoReader('session.mp4', 60, workers=8)
+        for index, frame in reader.iter_frames(ordered=False):
+            predictions[index] = model(frame)
+        reader.release()
+
+    :param video_path: Path of the video.
+    :type video_path: str
+    :param fps: The FPS of the video.
+    :type fps: float
+    :param buffer_size: Total number of shared frame slots.
+    :type buffer_size: int
+    :param workers: Number of decoding processes. Defaults to the number of CPUs.
+    :type workers: int
+    """
+    FLAVOR = "opencv_parallel"
+    #: Number of segments per worker, smaller segments balance the load but every segment starts with a seek.
+    SEGMENTS_PER_WORKER = 4
+
+    def __init__(self, video_path, fps, buffer_size=64, workers=None, segments_per_worker=None):
+        super().__init__(video_path, fps, buffer_size)
+        self.workers = workers if workers is not None else os.cpu_count()
+        self.segments_per_worker = segments_per_worker if segments_per_worker is not None else self.SEGMENTS_PER_WORKER
+        self.shape = (int(self.stream.get(cv2.CAP_PROP_FRAME_HEIGHT)), int(self.stream.get(cv2.CAP_PROP_FRAME_WIDTH)), 3)
+        self._processes = []
+        self._memory = None
+        self._pending = {}
+        self._segment_ends = {}
+
+    def get_segments(self, begin=0):
+        """Splits the frames from begin to the end of the video at keyframes.
+
+        :param begin: First frame
+        :type begin: int
+        :return: List of (begin, end) tuples
+        :rtype: list[tuple(int, int)]
+        """
+        keyframe_index = self.get_keyframe_index()
+        total = len(keyframe_index) if keyframe_index is not None else self.total_frames
+        if begin >= total:
+            return []
+        count = max(1, self.workers * self.segments_per_worker)
+        bounds = {begin, total}
+        if keyframe_index is not None:
+            for target in np.linspace(begin, total, count + 1)[1:-1]:
+                bounds.add(max(begin, keyframe_index.get_keyframe(int(target))))
+        bounds = sorted(bounds)
+        return list(zip(bounds[:-1], bounds[1:]))
+
+    def start(self):
+        segments = self.get_segments(self.current_index + 1)
+        workers = max(1, min(self.workers, len(segments)))
+        slots_per_worker = max(2, self.buffer_size // workers)
+        shape = (workers * slots_per_worker,) + self.shape
+        self._memory = shared_memory.SharedMemory(create=True, size=int(np.prod(shape)))
+        self._slots = np.ndarray(shape, dtype=np.uint8, buffer=self._memory.buf)
+        self._tasks = multiprocessing.Queue()
+        self._results = multiprocessing.Queue()
+        self._free_slots = []
+        self._processes = []
+        keyframe_index = self.get_keyframe_index()
+        for worker in range(workers):
+            free_slots = multiprocessing.Queue()
+            for slot in range(worker * slots_per_worker, (worker + 1) * slots_per_worker):
+                free_slots.put(slot)
+            self._free_slots.append(free_slots)
+            process = multiprocessing.Process(target=_decode_segments, args=(
+                self.video_path, keyframe_index, self._tasks, self._results, free_slots, self._memory.name, shape),
+                                              daemon=True)
+            process.start()
+            self._processes.append(process)
+        for segment in segments:
+            self._tasks.put(segment)
+        for _ in range(workers):
+            self._tasks.put(None)
+        self._slots_per_worker = slots_per_worker
+        self._segments = segments
+        self._remaining = len(segments)
+        self._pending = {}
+        self._segment_ends = {}
+        self.state = 1
+
+    def _release_slot(self, slot):
+        self._free_slots[slot // self._slots_per_worker].put(slot)
+
+    def _receive(self, timeout=None):
+        # Next decoded frame as (index, slot), the slot stays in use until it is released. Segment ends are recorded.
+        # None if all segments are finished.
+        while self._remaining > 0:
+            try:
+                index, slot, begin = self._results.get(timeout=timeout)
+            except queue.Empty:
+                if not any(process.is_alive() for process in self._processes):
+                    self._remaining = 0
+                continue
+            if slot == -1:
+                self._segment_ends[begin] = index
+                self._remaining -= 1
+                continue
+            return index, slot
+        return None
+
+    def _take(self, slot):
+        # Copies a frame out of its shared slot and returns the slot to its worker.
+        frame = self._slots[slot].copy()
+        self._release_slot(slot)
+        return frame
+
+    def iter_frames(self, ordered=True):
+        """Yields the remaining frames of the video starting after the current index.
+
+        :param ordered: Yield frames in order. Otherwise, frames are yielded as soon as they are decoded and the current index is not updated.
+        :type ordered: bool
+        :return: Generator of (index, frame) tuples
+        """
+        if ordered:
+            while True:
+                frame = self.next_frame()
+                if frame is None:
+                    return
+                yield self.current_index, frame
+        if self.state != 1:
+            self.start()
+        for index in sorted(self._pending):
+            yield index, self._take(self._pending.pop(index))
+        while True:
+            received = self._receive(timeout=0.5)
+            if received is None:
+                break
+            yield received[0], self._take(received[1])
+        self.stop()
+
+    def next_frame(self) -> np.ndarray:
+        if self.state == -1:
+            return None
+        elif self.state != 1:
+            self.start()
+        expected = self.current_index + 1
+        # Frames received ahead of the expected one keep their slots, i.e. at most buffer_size frames are held. Every
+        # worker decodes its segments in order, the worker of the expected frame always has a free slot.
+        while expected not in self._pending:
+            # Frames missing at the end of a segment are skipped.
+            segment = next((segment for segment in self._segments if segment[0] <= expected < segment[1]), None)
+            if segment is None:
+                self.stop()
+                return None
+            end = self._segment_ends.get(segment[0])
+            if end is not None and end <= expected:
+                self.current_index = segment[1] - 1
+                expected = segment[1]
+                continue
+            received = self._receive(timeout=0.5)
+            if received is None and expected not in self._pending:
+                self.stop()
+                return None
+            if received is not None:
+                self._pending[received[0]] = received[1]
+        self.current_frame = self._take(self._pending.pop(expected))
+        self.current_index = expected
+        return self.current_frame
+
+    def next_frame_view(self) -> np.ndarray:
+        # Frames are copied out of the shared slots as soon as they are received.
+        return self.next_frame()
+
+    def release_frame(self) -> None:
+        pass
+
+    def wait_ready(self, timeout=None) -> bool:
+        return self.state == 1
+
+    def stop(self):
+        if self._memory is None:
+            return
+        for free_slots in self._free_slots:
+            free_slots.put(None)
+        for process in self._processes:
+            process.join(timeout=1)
+            if process.is_alive():
+                process.terminate()
+        for pipe in [self._tasks, self._results] + self._free_slots:
+            pipe.cancel_join_thread()
+            pipe.close()
+        del self._slots
+        self._memory.close()
+        self._memory.unlink()
+        self._memory = None
+        self._processes = []
+        self._pending = {}
+        self.state = -1
+
+    def pause(self) -> None:
+        pass
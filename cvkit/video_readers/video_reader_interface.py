@@ -1,9 +1,11 @@
 import os
-import time
+import threading
 from abc import ABC, abstractmethod
 
 import numpy as np
 
+from cvkit.video_readers.frame_cache import FrameCache
+
 
 class BaseVideoReaderInterface(ABC):
     """ An interface to provide intuitive access to video data. Users can implement this interface using various underlying video I/O libraries.
@@ -19,6 +21,10 @@ class BaseVideoReaderInterface(ABC):
 
     #: A unique identifier for `BaseVideoReaderInterface` Implementation.
     FLAVOR = "Abstract"
+    #: Size limit of the decoded frames cached by :py:meth:`random_access_image`.
+    FRAME_CACHE_SIZE = '512M'
+    #: Gaps of up to this number of frames are decoded forward by :py:meth:`random_access_image` instead of seeking.
+    MAX_FORWARD_DECODE = 64
 
     def __init__(self, video_path, fps, buffer_size=128):
 
@@ -29,9 +35,13 @@ class BaseVideoReaderInterface(ABC):
         self.total_frames = -1
         self.current_index = -1
         self.current_frame = None
+        self._keyframe_index = None
+        self.frame_cache = FrameCache(self.FRAME_CACHE_SIZE)  #: Decoded frames of :py:meth:`random_access_image`
+        self._random_access_lock = threading.Lock()
+        self._random_access_position = None
 
     def seek_pos(self, index: int) -> None:
-        """Resets current buffer and seeks to the frame before the given index.
+        """Resets current buffer and seeks to the frame before the given index. Returns once the first frame is decoded.
 
         :param index: The index of the frame you want to receive next.
         :type index: int
@@ -39,7 +49,43 @@ class BaseVideoReaderInterface(ABC):
         self.stop()
         self.current_index = index - 1
         self.start()
-        time.sleep(0.05)
+        self.wait_ready()
+
+    def wait_ready(self, timeout=None) -> bool:
+        """Waits until the pre-fetch buffer holds the next frame or the end of the video is reached.
+
+        :param timeout: Maximum waiting time in seconds, waits indefinitely by default.
+        :type timeout: float
+        :return: True if the next frame is available.
+        :rtype: bool
+        """
+        return True
+
+    def get_keyframe_index(self):
+        """Returns the keyframe index of the video used for frame accurate seeking. It is built on first use and cached in
+        a sidecar file next to :py:attr:`base_file_path`.
+
+        :return: Keyframe index or None if the video cannot be indexed.
+        :rtype: :py:class:`~cvkit.video_readers.keyframe_index.KeyframeIndex`
+        """
+        if self._keyframe_index is None:
+            from cvkit.video_readers.keyframe_index import KeyframeIndex
+            try:
+                self._keyframe_index = KeyframeIndex.get(self.video_path, self.base_file_path)
+            except Exception:
+                self._keyframe_index = False
+        return self._keyframe_index or None
+
+    def _can_decode_forward(self, position):
+        # Seeking has a considerable fixed cost, short gaps are always decoded forward. Longer gaps are decoded forward as
+        # long as there is no keyframe between both positions, i.e. seeking would not skip any decoding.
+        if self._random_access_position is None or position < self._random_access_position:
+            return False
+        if position - self._random_access_position <= self.MAX_FORWARD_DECODE:
+            return True
+        keyframe_index = self.get_keyframe_index()
+        return keyframe_index is not None and position < len(keyframe_index) and keyframe_index.get_keyframe(
+            position) <= self._random_access_position
 
     def get_current_frame(self) -> np.ndarray:
         """Returns previously fetched frame.
@@ -58,6 +104,31 @@ class BaseVideoReaderInterface(ABC):
         """
         pass
 
+    def next_frame_view(self) -> np.ndarray:
+        """Returns the next frame without copying it out of the pre-fetch buffer. The view stays valid until it is returned
+        with :py:meth:`release_frame`, the buffer cannot reuse its memory before. Views are released in the order they
+        were received and become invalid when the reader seeks, stops or is released.
+
+        .. highlight:: python
+        .. code-block:: python
+
+            frame = reader.next_frame_view()
+            while frame is not None:
+                writer.write(frame)
+                reader.release_frame()
+                frame = reader.next_frame_view()
+
+        :return: Numpy array representing the newly fetched frame.
+        :rtype: Numpy.ndarray
+        """
+        return self.next_frame()
+
+    def release_frame(self) -> None:
+        """Returns the oldest frame received from :py:meth:`next_frame_view` to the pre-fetch buffer.
+
+        """
+        pass
+
     def get_current_index(self) -> int:
         """Get the frame number of the newest frame fetched from the buffer.
 
@@ -91,6 +162,7 @@ class BaseVideoReaderInterface(ABC):
     @abstractmethod
     def random_access_image(self, position) -> np.ndarray:
         """Fetch frame from the video at random position without affecting the current buffer. It is different from the seek function since it does not reset the internal buffer and does not change the current frame number.
+        Implementations keep a separate decoder open, decode forward for nearby positions and cache decoded frames in :py:attr:`frame_cache`.
 
         :param position: index of the desired frame.
         :type position: int
@@ -99,6 +171,52 @@ class BaseVideoReaderInterface(ABC):
         """
         pass
 
+    def _decode_random_access(self, position, cache_skipped=True):
+        # Decodes a frame with the random access decoder, implementations reuse an open decoder.
+        return self.random_access_image(position)
+
+    def generate_frames(self, indices):
+        """Decodes multiple frames in a single forward pass and yields them one at a time, i.e. only the current frame is
+        held in memory. The indices are sorted and decoded in order, the decoder only seeks if a keyframe lies between two
+        requested frames. Frames that are skipped are not cached.
+
+        .. highlight:: python
+        .. code-block:: python
+
+            for index, frame in reader.generate_frames(labeled_frames):
+                cv2.imwrite(f'{index}.png', cv2.cvtColor(frame, cv2.COLOR_RGB2BGR))
+
+        :param indices: Indices of the desired frames, in any order and possibly repeated.
+        :type indices: list[int]
+        :return: Generator of (index, frame) tuples in decoding order, every index is yielded once. The frame is None if it could not be read.
+        """
+        for index in sorted(set(int(index) for index in indices)):
+            # The lock is not held while the caller processes a frame, random access remains possible in between.
+            with self._random_access_lock:
+                frame = self.frame_cache.get(index)
+                if frame is None and 0 <= index < self.get_number_of_frames():
+                    frame = self._decode_random_access(index, cache_skipped=False)
+            yield index, None if frame is None else frame.copy()
+
+    def get_frames(self, indices) -> list:
+        """Fetches multiple frames in a single forward pass, see :py:meth:`generate_frames`.
+
+        :param indices: Indices of the desired frames, in any order and possibly repeated.
+        :type indices: list[int]
+        :return: Frames in the requested order, None for frames that could not be read.
+        :rtype: list[numpy.ndarray]
+        """
+        indices = [int(index) for index in indices]
+        frames = dict(self.generate_frames(indices))
+        output = []
+        returned = set()
+        for index in indices:
+            frame = frames[index]
+            # Repeated indices receive separate copies.
+            output.append(frame.copy() if frame is not None and index in returned else frame)
+            returned.add(index)
+        return output
+
     def delete_frame(self,position):
         raise NotImplementedError("Frame Deletion not supported")
 
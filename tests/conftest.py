@@ -0,0 +1,13 @@
+import cv2
+import numpy as np
+import pytest
+
+
+@pytest.fixture(scope='session')
+def video_path(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp('video') / 'video.avi')
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'MJPG'), 30, (64, 48))
+    for index in range(120):
+        writer.write(np.full((48, 64, 3), index * 2, dtype=np.uint8))
+    writer.release()
+    return path
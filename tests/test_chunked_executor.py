@@ -0,0 +1,84 @@
+import numpy as np
+import pytest
+
+from cvkit.pose_estimation.data_readers import DeeplabcutDataStore
+from cvkit.pose_estimation.pipeline import FrameChunkExecutor, Pipeline, PipelineStage
+from cvkit.pose_estimation.processors.processor_interface import Processor, ProcessorMetaData
+
+BODY_PARTS = ['a', 'b']
+
+
+def build_data_store(index):
+    data_store = DeeplabcutDataStore(BODY_PARTS, None)
+    for part in BODY_PARTS:
+        data_store.set_part_array(part, np.c_[index, index], np.ones(len(index)), index=np.asarray(index))
+    return data_store
+
+
+class ShiftProcessor(Processor):
+    PROCESSOR_ID = 'test_shift'
+    META_DATA = {}
+    FRAME_INDEPENDENT = True
+
+    def process(self, data_store):
+        for part in data_store.body_parts:
+            index, positions, likelihoods = data_store.get_part_array(part)
+            positions[:, :2] += 1
+            data_store.set_part_array(part, positions, likelihoods, index=index)
+        self._data_store = data_store
+        self._data_ready = True
+
+    def get_output(self):
+        return self._data_store if self._data_ready else None
+
+
+class CopyReaderProcessor(Processor):
+    PROCESSOR_ID = 'test_copy_reader'
+    META_DATA = {'data_readers': ProcessorMetaData('DataReaders', ProcessorMetaData.FILE_MAP)}
+    FRAME_INDEPENDENT = True
+    USES_INPUT = False
+
+    def __init__(self, data_readers):
+        super().__init__()
+        self.data_readers = data_readers
+
+    def process(self, data_store):
+        assert data_store is None
+        begin, end = self._frame_range
+        self._output = build_data_store(np.arange(begin, end))
+        self._data_ready = True
+
+    def get_frame_count(self, data_store):
+        return len(self.data_readers['Cam1'])
+
+    def get_output(self):
+        return self._output if self._data_ready else None
+
+
+def test_input_chunks_follow_frame_indices():
+    index = np.r_[100:140, 200:230]
+    data_store = build_data_store(index)
+    executor = FrameChunkExecutor(ShiftProcessor(), workers=2, chunk_size=16)
+    executor.process(data_store)
+    output = executor.get_output()
+    part_index, positions, _ = output.get_part_array('a')
+    np.testing.assert_array_equal(part_index, index)
+    np.testing.assert_array_equal(positions[:, 0], index + 1)
+
+
+def test_generative_chunks_ignore_shorter_input():
+    processor = CopyReaderProcessor({'Cam1': build_data_store(np.arange(100))})
+    executor = FrameChunkExecutor(processor, workers=2, chunk_size=30)
+    executor.process(build_data_store(np.arange(10)))
+    part_index, positions, _ = executor.get_output().get_part_array('a')
+    np.testing.assert_array_equal(part_index, np.arange(100))
+    np.testing.assert_array_equal(positions[:, 0], np.arange(100))
+
+
+def test_frame_dependent_instance_runs_serially():
+    stage = PipelineStage('undistort', 'cvkit_undistort_pts', executor='chunked')
+    processor = ShiftProcessor()
+    processor.FRAME_INDEPENDENT = False
+    with pytest.warns(UserWarning):
+        output = Pipeline([stage])._execute(stage, [processor], build_data_store(np.arange(5)))
+    np.testing.assert_array_equal(output.get_part_array('a')[1][:, 0], np.arange(5) + 1)
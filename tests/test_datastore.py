@@ -0,0 +1,17 @@
+import numpy as np
+
+from cvkit.pose_estimation.data_readers import DeeplabcutDataStore
+from cvkit.pose_estimation.data_readers.datastore_interface import DataStoreStats
+from cvkit.pose_estimation.processors.util import ClusterAnalysis
+
+BODY_PARTS = ['a', 'b']
+
+
+def test_replaced_stats_are_verified_again():
+    data_store = DeeplabcutDataStore(BODY_PARTS, None)
+    for part in BODY_PARTS:
+        data_store.set_part_array(part, np.ones((10, 2)), np.ones(10), index=np.arange(10))
+    ClusterAnalysis(0.6).process(data_store)
+    assert data_store.verify_stats()
+    data_store.stats = DataStoreStats(BODY_PARTS)
+    assert not data_store.verify_stats()
@@ -0,0 +1,55 @@
+import shutil
+
+import numpy as np
+import pytest
+
+from cvkit.video_readers.frame_ring_buffer import FrameRingBuffer
+
+
+def test_preallocated_slots_are_reused():
+    ring = FrameRingBuffer(2)
+    ring.allocate((4, 4, 3))
+    slots = []
+    for index in range(4):
+        slot = ring.acquire_write(timeout=1)
+        ring.get(slot)[:] = index
+        ring.commit(slot, index)
+        slot, received = ring.acquire_read(timeout=1)
+        assert received == index and np.all(ring.get(slot) == index)
+        assert np.shares_memory(ring.get(slot), ring.frames)
+        ring.release(slot)
+        slots.append(slot)
+    assert slots == [0, 1, 0, 1]
+
+
+def test_references_are_not_copied():
+    ring = FrameRingBuffer(2)
+    frame = np.zeros((4, 4, 3), dtype=np.uint8)
+    slot = ring.acquire_write(timeout=1)
+    ring.set(slot, frame)
+    ring.commit(slot, 0)
+    ring.finish()
+    slot, _ = ring.acquire_read(timeout=1)
+    assert ring.get(slot) is frame
+    ring.release(slot)
+    assert ring.acquire_read(timeout=1) is None
+
+
+def test_full_buffer_blocks_writer():
+    ring = FrameRingBuffer(1)
+    ring.set(ring.acquire_write(timeout=1), np.zeros(1))
+    ring.commit(0, 0)
+    assert ring.acquire_write(timeout=0.01) is None
+
+
+@pytest.mark.skipif(shutil.which('ffmpeg') is None, reason='FFmpeg is not installed')
+def test_deffcode_reader(video_path):
+    pytest.importorskip('deffcode')
+    from cvkit.video_readers.deffcode_reader import DeffcodeVideoReader
+    reader = DeffcodeVideoReader(video_path, 30, 8)
+    frames = [reader.next_frame() for _ in range(20)]
+    reader.seek_pos(60)
+    frame = reader.next_frame()
+    reader.release()
+    assert [int(np.rint(frame.mean() / 2)) for frame in frames] == list(range(20))
+    assert int(np.rint(frame.mean() / 2)) == 60
@@ -0,0 +1,32 @@
+import numpy as np
+
+from cvkit.pose_estimation.data_readers import DeeplabcutDataStore
+from cvkit.pose_estimation.instrumentation import Instrumentation
+
+BODY_PARTS = ['a', 'b']
+
+
+def build_data_store(frames):
+    data_store = DeeplabcutDataStore(BODY_PARTS, None)
+    for part in BODY_PARTS:
+        data_store.set_part_array(part, np.ones((frames, 2)), np.ones(frames), index=np.arange(frames))
+    return data_store
+
+
+def count_reads(read):
+    data_store = build_data_store(10)
+    with Instrumentation() as instrumentation:
+        with instrumentation.span('read') as record:
+            read(data_store)
+    return record['reads']
+
+
+def test_iterators_count_every_item():
+    random_access = count_reads(lambda data_store: [data_store.get_skeleton(index) for index in range(10)])
+    assert random_access == 10
+    assert count_reads(lambda data_store: list(data_store.row_iterator())) == random_access
+    assert count_reads(lambda data_store: list(data_store.part_iterator('a'))) == random_access
+
+
+def test_partial_iteration():
+    assert count_reads(lambda data_store: next(data_store.row_iterator())) == 1
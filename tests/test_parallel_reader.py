@@ -0,0 +1,31 @@
+import numpy as np
+
+from cvkit.video_readers.parallel_reader import ParallelVideoReader
+
+
+class TrackingReader(ParallelVideoReader):
+    max_pending = 0
+
+    def _receive(self, timeout=None):
+        received = super()._receive(timeout)
+        self.max_pending = max(self.max_pending, len(self._pending) + (received is not None))
+        return received
+
+
+def test_pending_frames_bounded_by_slots(video_path):
+    reader = TrackingReader(video_path, 30, buffer_size=8, workers=4, segments_per_worker=1)
+    assert len(reader.get_segments()) == 4
+    indices = [index for index, _ in reader.iter_frames()]
+    slots = reader._slots_per_worker * len(reader._free_slots)
+    reader.release()
+    assert indices == list(range(120))
+    assert slots == 8
+    assert reader.max_pending <= slots
+
+
+def test_ordered_frames(video_path):
+    reader = ParallelVideoReader(video_path, 30, buffer_size=8, workers=2)
+    reader.seek_pos(50)
+    frames = [reader.next_frame() for _ in range(10)]
+    reader.release()
+    assert [int(np.rint(frame.mean() / 2)) for frame in frames] == list(range(50, 60))
@@ -0,0 +1,32 @@
+import numpy as np
+import pytest
+
+from cvkit.pose_estimation.reconstruction.synchronization import estimate_offset, estimate_offset_drift
+
+
+def build_signals(length, offset, drift, seed=0):
+    rng = np.random.default_rng(seed)
+    # Smoothed noise, sampled at shifted and stretched frames for the second view.
+    source = np.convolve(rng.normal(size=int(length * 1.1) + 200), np.ones(5) / 5, mode='same')
+    frames = np.arange(length)
+    reference = source[frames + 100]
+    signal = np.interp((frames - offset) / (1 + drift) + 100, np.arange(len(source)), source)
+    return reference, signal
+
+
+@pytest.mark.parametrize('length, segments', [(30000, 11), (26000, 4)])
+def test_offset_of_late_segments(length, segments):
+    reference, signal = build_signals(length, -7, 0.0)
+    bounds = np.linspace(0, length, segments + 1).astype(int)
+    for begin, end in zip(bounds[:-1], bounds[1:]):
+        offset, score = estimate_offset(reference, signal, 50, begin, end)
+        assert offset == pytest.approx(-7, abs=0.2)
+        assert score > 0
+
+
+@pytest.mark.parametrize('max_offset', [50, None])
+def test_offset_drift(max_offset):
+    reference, signal = build_signals(30000, -7, 2e-4)
+    offset, drift = estimate_offset_drift(reference, signal, max_offset, segments=11)
+    assert offset == pytest.approx(-7, abs=0.5)
+    assert drift == pytest.approx(2e-4, abs=2e-5)
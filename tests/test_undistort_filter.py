@@ -0,0 +1,69 @@
+import copy
+
+import cv2
+import numpy as np
+import pytest
+import yaml
+
+from cvkit.pose_estimation.config import PoseEstimationConfig
+from cvkit.pose_estimation.data_readers import DeeplabcutDataStore
+from cvkit.pose_estimation.processors.filter.undistort_filter import UndistortFilter
+
+BODY_PARTS = ['a', 'b', 'c']
+
+
+@pytest.fixture
+def config(tmp_path):
+    data = {'name': 'test', 'output_folder': str(tmp_path), 'body_parts': BODY_PARTS,
+            'skeleton': [['a', 'b']], 'Reconstruction': {'framerate': 60},
+            'views': {'Cam1': {'resolution': [640, 480], 'f_px': 500, 'principal_point': [320, 240],
+                               'distortion': [-0.3, 0.12, 0.001, -0.001, -0.02]}}}
+    path = tmp_path / 'config.yaml'
+    yaml.safe_dump(data, open(path, 'w'))
+    return PoseEstimationConfig(str(path))
+
+
+def test_push_matches_process(config):
+    rng = np.random.default_rng(0)
+    frames = 50
+    data_store = DeeplabcutDataStore(BODY_PARTS, None)
+    for part in BODY_PARTS:
+        likelihoods = rng.uniform(0.1, 1, frames) * (rng.uniform(0, 1, frames) > 0.3)
+        positions = np.c_[rng.uniform(0, 640, frames), rng.uniform(0, 480, frames)]
+        positions[likelihoods == 0] = -1
+        data_store.set_part_array(part, positions, likelihoods, index=np.arange(frames))
+    expected = copy.deepcopy(data_store)
+    UndistortFilter(config, 'Cam1').process(expected)
+    streaming = UndistortFilter(config, 'Cam1')
+    for index in range(frames):
+        skeleton = streaming.push(index, data_store.get_skeleton(index))
+        reference = expected.get_skeleton(index)
+        for part in BODY_PARTS:
+            assert skeleton[part].likelihood == reference[part].likelihood
+            np.testing.assert_allclose(skeleton[part].numpy()[:2], reference[part].numpy()[:2], atol=1e-6)
+
+
+def test_push_keeps_missing_parts(config):
+    data_store = DeeplabcutDataStore(BODY_PARTS, None)
+    for part in BODY_PARTS:
+        data_store.set_part_array(part, np.array([[100.0, 100.0]]), np.array([0.0 if part == 'b' else 0.9]),
+                                  index=np.arange(1))
+    skeleton = UndistortFilter(config, 'Cam1').push(0, data_store.get_skeleton(0))
+    np.testing.assert_array_equal(skeleton['b'].numpy()[:2], [100.0, 100.0])
+    assert not np.allclose(skeleton['a'].numpy()[:2], [100.0, 100.0])
+
+
+def test_process_keeps_missing_parts(config):
+    positions = np.array([[100.0, 100.0], [-1.0, -1.0], [500.0, 400.0]])
+    likelihoods = np.array([0.9, 0.0, 0.3])
+    data_store = DeeplabcutDataStore(BODY_PARTS, None)
+    for part in BODY_PARTS:
+        data_store.set_part_array(part, positions.copy(), likelihoods, index=np.arange(3))
+    UndistortFilter(config, 'Cam1').process(data_store)
+    camera = config.views['Cam1']
+    expected = cv2.undistortPoints(positions.reshape(-1, 1, 2), camera.get_intrinsic(), camera.distortion, None,
+                                   P=camera.get_intrinsic()).reshape(-1, 2)
+    _, output, output_likelihoods = data_store.get_part_array('a')
+    np.testing.assert_array_equal(output_likelihoods, likelihoods)
+    np.testing.assert_array_equal(output[1, :2], [-1.0, -1.0])
+    np.testing.assert_allclose(output[[0, 2], :2], expected[[0, 2]], atol=1e-6)
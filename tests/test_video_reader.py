@@ -0,0 +1,28 @@
+import types
+
+import numpy as np
+
+from cvkit.video_readers.cv2_reader import CV2VideoReader
+
+
+def frame_number(frame):
+    return int(np.rint(frame.mean() / 2))
+
+
+def test_generate_frames_yields_in_decoding_order(video_path):
+    reader = CV2VideoReader(video_path, 30)
+    frames = reader.generate_frames([90, 3, 40, 3, 500])
+    assert isinstance(frames, types.GeneratorType)
+    frames = list(frames)
+    reader.release()
+    assert [index for index, _ in frames] == [3, 40, 90, 500]
+    assert [frame_number(frame) for _, frame in frames[:-1]] == [3, 40, 90]
+    assert frames[-1][1] is None
+
+
+def test_get_frames_keeps_requested_order(video_path):
+    reader = CV2VideoReader(video_path, 30)
+    frames = reader.get_frames([90, 3, 40, 3])
+    reader.release()
+    assert [frame_number(frame) for frame in frames] == [90, 3, 40, 3]
+    assert frames[1] is not frames[3]